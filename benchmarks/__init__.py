@@ -0,0 +1,9 @@
+"""
+Benchmark Suite
+
+Offline, reproducible performance benchmarks for each pipeline stage and
+the full pipeline, using synthetic audio and tiny randomly initialized
+stand-in models.
+
+Run with ``python -m benchmarks.run --help``.
+"""
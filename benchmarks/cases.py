@@ -0,0 +1,400 @@
+"""
+Benchmark Cases
+
+One case per pipeline stage plus the end-to-end pipeline.
+"""
+
+from benchmarks.harness import BenchmarkResult, benchmark, measure
+
+
+@benchmark("stage.decode")
+def bench_decode(ctx):
+    """FFmpeg decode and resample of the synthetic file."""
+    handler = ctx.pipeline.audio_handler
+    return measure(
+        "stage.decode",
+        lambda: handler.load_audio_file(ctx.audio_file),
+        repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+        audio_seconds=ctx.settings.duration
+    )
+
+
+@benchmark("stage.features")
+def bench_features(ctx):
+    """Log-mel features: computing them vs. loading them from the feature cache."""
+    import shutil
+    from pathlib import Path
+    
+    from src.audio_processing.features import FeatureCache
+    
+    audio = ctx.audio
+    cache_dir = Path(ctx.workdir) / "features"
+    
+    def cold():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        FeatureCache(str(cache_dir)).features(audio)
+    
+    def warm():
+        # Touch every frame so the memory-mapped pages are actually read
+        float(FeatureCache(str(cache_dir)).features(audio).mel.sum())
+    
+    computed = measure("stage.features.compute", cold,
+                       repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                       audio_seconds=ctx.settings.duration)
+    cached = measure("stage.features.cached", warm,
+                     repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                     audio_seconds=ctx.settings.duration)
+    return [computed, cached]
+
+
+@benchmark("stage.asr")
+def bench_asr(ctx):
+    """Whisper transcription of pre-decoded audio."""
+    import torch
+    
+    speech_to_text = ctx.pipeline.speech_to_text
+    audio = ctx.audio
+    
+    def run():
+        # Temperature fallback samples randomly; keep iterations comparable
+        torch.manual_seed(ctx.settings.seed)
+        speech_to_text.transcribe_audio(audio)
+    
+    return measure(
+        "stage.asr", run,
+        repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+        audio_seconds=ctx.settings.duration
+    )
+
+
+@benchmark("stage.asr.cascade")
+def bench_asr_cascade(ctx):
+    """Cascaded ASR (small first pass + escalation) vs. the larger model alone."""
+    import torch
+    from benchmarks.stand_ins import tiny_whisper
+    from src.audio_processing.speech_to_text import SpeechToText
+    
+    models = ctx.config.models
+    small = ctx.pipeline.speech_to_text.model
+    large = tiny_whisper(ctx.settings.seed, width=256, layers=4)
+    audio = ctx.audio
+    
+    direct = SpeechToText(model_size="large")
+    direct.model = large
+    cascade = SpeechToText(
+        model_size="large", first_pass_size="tiny",
+        logprob_threshold=models.cascade_logprob_threshold,
+        no_speech_threshold=models.cascade_no_speech_threshold,
+        compression_ratio_threshold=models.cascade_compression_ratio_threshold
+    )
+    cascade.first_pass_model = small
+    cascade.model = large
+    
+    def run(speech_to_text):
+        torch.manual_seed(ctx.settings.seed)
+        return speech_to_text.transcribe_segments(audio)
+    
+    baseline = measure("stage.asr.cascade.large_only", lambda: run(direct),
+                       repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                       audio_seconds=ctx.settings.duration)
+    stats = run(cascade)["cascade"]
+    result = measure("stage.asr.cascade", lambda: run(cascade),
+                     repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                     audio_seconds=ctx.settings.duration,
+                     extra={"escalation_rate": stats["escalation_rate"],
+                            "escalated_seconds": stats["escalated_seconds"]})
+    result.extra["speedup"] = baseline.latency_s / result.latency_s if result.latency_s else None
+    return [baseline, result]
+
+
+@benchmark("stage.summarize")
+def bench_summarize(ctx):
+    """Summarization of a synthetic transcript."""
+    summarizer = ctx.pipeline.summarizer
+    processing = ctx.config.processing
+    transcript = ctx.transcript
+    
+    return measure(
+        "stage.summarize",
+        lambda: summarizer.summarize_text(
+            transcript,
+            max_length=processing.max_summary_length,
+            min_length=processing.min_summary_length
+        ),
+        repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+        extra={"transcript_words": len(transcript.split())}
+    )
+
+
+@benchmark("stage.summarize.extractive")
+def bench_summarize_extractive(ctx):
+    """Extractive pre-compression + summarization vs. the full abstractive path."""
+    from benchmarks.quality import rouge
+    from src.text_processing.extractive import ExtractiveCompressor, count_tokens
+    
+    summarizer = ctx.pipeline.summarizer
+    processing = ctx.config.processing
+    transcript = ctx.transcript
+    
+    def summarize(text):
+        return summarizer.summarize_text(
+            text, max_length=processing.max_summary_length, min_length=processing.min_summary_length
+        )
+    
+    reference = summarize(transcript)
+    full = measure("stage.summarize.extractive.full", lambda: summarize(transcript),
+                   repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                   extra={"tokens": count_tokens(transcript)})
+    results = [full]
+    
+    for ratio in (0.5, 0.25):
+        compressor = ExtractiveCompressor(ratio=ratio)
+        compressed = compressor.compress(transcript)
+        result = measure(
+            f"stage.summarize.extractive.r{ratio:g}",
+            lambda: summarize(compressor.compress(transcript)),
+            repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+            extra=dict(
+                rouge(summarize(compressed), reference),
+                ratio=ratio,
+                tokens=count_tokens(compressed)
+            )
+        )
+        result.extra["latency_saved_s"] = full.latency_s - result.latency_s
+        results.append(result)
+    return results
+
+
+@benchmark("stage.summarize.normalize")
+def bench_summarize_normalize(ctx):
+    """Summarization with vs. without filler and repetition removal."""
+    from benchmarks.synthetic import generate_transcript
+    from src.text_processing.extractive import count_tokens
+    
+    summarizer = ctx.pipeline.summarizer
+    processing = ctx.config.processing
+    # The shared transcript has fillers but no loops; add the looping Whisper produces
+    transcript = generate_transcript(ctx.settings.transcript_words, ctx.settings.seed, loop_rate=0.05)
+    raw_tokens = count_tokens(transcript)
+    normalized_tokens = count_tokens(summarizer.preprocess_text(transcript))
+    
+    def summarize(normalize):
+        previous, summarizer.normalize = summarizer.normalize, normalize
+        try:
+            return summarizer.summarize_text(
+                transcript, max_length=processing.max_summary_length,
+                min_length=processing.min_summary_length
+            )
+        finally:
+            summarizer.normalize = previous
+    
+    preprocess = measure("stage.summarize.normalize.preprocess",
+                         lambda: summarizer.preprocess_text(transcript),
+                         repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                         extra={"tokens": raw_tokens})
+    raw = measure("stage.summarize.normalize.off", lambda: summarize(False),
+                  repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                  extra={"tokens": raw_tokens})
+    normalized = measure("stage.summarize.normalize.on", lambda: summarize(True),
+                         repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                         extra={"tokens": normalized_tokens,
+                                "token_reduction": 1 - normalized_tokens / raw_tokens})
+    normalized.extra["latency_saved_s"] = raw.latency_s - normalized.latency_s
+    return [preprocess, raw, normalized]
+
+
+@benchmark("stage.summarize.buckets")
+def bench_summarize_buckets(ctx):
+    """Many transcripts summarized together: length-bucketed vs. naive batches."""
+    from benchmarks.synthetic import generate_transcript
+    from src.text_processing.summarizer import CHARS_PER_TOKEN
+    
+    summarizer = ctx.pipeline.summarizer
+    processing = ctx.config.processing
+    # Short calls with a few long meetings, as in a mixed batch directory
+    lengths = [60, 120, 200, 350, 600, ctx.settings.transcript_words] * 3
+    corpus = [generate_transcript(words, ctx.settings.seed + i) for i, words in enumerate(lengths)]
+    
+    def shape(length_buckets):
+        """Batch shapes of one run: padded input tokens and decode budget."""
+        batches = []
+        generate_batch = summarizer._generate_batch
+        
+        def recording(texts, max_length, min_length):
+            batches.append(([len(text) // CHARS_PER_TOKEN for text in texts], max_length))
+            return generate_batch(texts, max_length, min_length)
+        
+        summarizer._generate_batch = recording
+        try:
+            summarize(length_buckets)
+        finally:
+            del summarizer._generate_batch
+        padded = sum(max(tokens) * len(tokens) for tokens, _ in batches)
+        return {
+            "batches": len(batches),
+            "padding_ratio": 1 - sum(sum(tokens) for tokens, _ in batches) / padded,
+            "decode_budget_tokens": sum(max_length * len(tokens) for tokens, max_length in batches)
+        }
+    
+    def summarize(length_buckets):
+        previous, summarizer.length_buckets = summarizer.length_buckets, length_buckets
+        try:
+            return summarizer.summarize_texts(corpus, max_length=processing.max_summary_length,
+                                              min_length=processing.min_summary_length)
+        finally:
+            summarizer.length_buckets = previous
+    
+    naive = measure("stage.summarize.buckets.naive", lambda: summarize(False),
+                    repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                    items=len(corpus), extra=shape(False))
+    bucketed = measure("stage.summarize.buckets.bucketed", lambda: summarize(True),
+                       repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                       items=len(corpus), extra=shape(True))
+    bucketed.extra["speedup"] = naive.latency_s / bucketed.latency_s if bucketed.latency_s else None
+    return [naive, bucketed]
+
+
+@benchmark("stage.classify")
+def bench_classify(ctx):
+    """Zero-shot topic classification of a synthetic transcript."""
+    classifier = ctx.pipeline.classifier
+    transcript = ctx.transcript
+    
+    return measure(
+        "stage.classify",
+        lambda: classifier.classify_topic(transcript),
+        repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+        extra={"labels": len(classifier.predefined_topics)}
+    )
+
+
+@benchmark("stage.fingerprint")
+def bench_fingerprint(ctx):
+    """Fingerprinting decoded audio and looking it up in a large fingerprint index."""
+    import random
+    from pathlib import Path
+    
+    import numpy as np
+    
+    from src.audio_processing.fingerprint import AudioFingerprint, compute_fingerprint
+    from src.utils.fingerprint_index import FingerprintIndex
+    
+    audio = ctx.audio
+    fingerprint = compute_fingerprint(audio)
+    
+    # Recordings of 1-60 minutes; random codes and frames never pass the similarity check,
+    # so every lookup pays for the full duration band and shortlist
+    index_size = 200_000
+    rng = random.Random(ctx.settings.seed)
+    frames = np.zeros(len(fingerprint), dtype=np.uint32)
+    index = FingerprintIndex(str(Path(ctx.workdir) / "fingerprints.db"))
+    for start in range(0, index_size, 10_000):
+        index.add_many([
+            (f"synthetic/{i}.wav", AudioFingerprint(frames, rng.uniform(60, 3600), rng.getrandbits(64)))
+            for i in range(start, start + 10_000)
+        ])
+    # Mark them all as processed in one statement rather than 200k attach() calls
+    with index._conn:
+        index._conn.execute("UPDATE fingerprints SET results = '{}'")
+    probe = AudioFingerprint(fingerprint.frames, 1800.0, fingerprint.summary)
+    
+    computed = measure("stage.fingerprint.compute", lambda: compute_fingerprint(audio),
+                       repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+                       audio_seconds=ctx.settings.duration)
+    lookup = measure("stage.fingerprint.lookup", lambda: index.lookup(probe),
+                     repeat=max(ctx.settings.repeat, 20), warmup=ctx.settings.warmup,
+                     extra={"index_size": index.count()})
+    index.close()
+    return [computed, lookup]
+
+
+@benchmark("models.load")
+def bench_model_load(ctx):
+    """Model loading: deserializing a checkpoint vs. memory-mapping its safetensors copy."""
+    from functools import partial
+    from pathlib import Path
+    
+    from benchmarks.stand_ins import tiny_whisper
+    from benchmarks.weights import (drop_page_cache, load_checkpoint, run_memory_point,
+                                    save_checkpoint, touch)
+    from src.models.weight_cache import WeightCache
+    
+    # Large enough (~250 MB) that page sharing and disk reads dominate over Python overhead
+    model = tiny_whisper(ctx.settings.seed, width=512, layers=6)
+    checkpoint = str(Path(ctx.workdir) / "whisper-stand-in.pt")
+    save_checkpoint(model, checkpoint)
+    cache = WeightCache(str(Path(ctx.workdir) / "safetensors"))
+    key = "whisper:stand-in"
+    converted = measure("models.load.convert", partial(cache.save, key, model), repeat=1, warmup=0,
+                        extra={"file_mb": 0.0})
+    converted.extra["file_mb"] = cache.path(key).stat().st_size / 1e6
+    del model
+    mapped = str(cache.path(key))
+    
+    def checkpoint_cold():
+        drop_page_cache(checkpoint)
+        touch(load_checkpoint(checkpoint))
+    
+    def mapped_cold():
+        drop_page_cache(mapped)
+        touch(cache.load(key))
+    
+    # Every load reads all weights once, as the first inference would
+    results = [converted]
+    for name, fn in (("checkpoint.cold", checkpoint_cold),
+                     ("checkpoint.warm", lambda: touch(load_checkpoint(checkpoint))),
+                     ("mmap.cold", mapped_cold),
+                     ("mmap.warm", lambda: touch(cache.load(key)))):
+        results.append(measure(f"models.load.{name}", fn,
+                               repeat=ctx.settings.repeat, warmup=ctx.settings.warmup))
+    
+    for result, mode in ((results[2], "checkpoint"), (results[4], "mmap")):
+        result.extra.update(run_memory_point(mode, checkpoint, str(cache.cache_dir), key, workers=4))
+    return results
+
+
+@benchmark("pipeline.file")
+def bench_pipeline(ctx):
+    """End-to-end processing of the synthetic file."""
+    import torch
+    
+    pipeline = ctx.pipeline
+    audio_file = ctx.audio_file
+    
+    def run():
+        torch.manual_seed(ctx.settings.seed)
+        pipeline.process_audio_file(audio_file)
+    
+    return measure(
+        "pipeline.file", run,
+        repeat=ctx.settings.repeat, warmup=ctx.settings.warmup,
+        audio_seconds=ctx.settings.duration
+    )
+
+
+@benchmark("scaling.workers")
+def bench_scaling(ctx):
+    """Concurrent throughput for worker x thread splits of the available cores."""
+    from benchmarks.scaling import run_scaling_point, scaling_grid
+    from src.utils.runtime import available_cores
+    
+    cores = len(available_cores())
+    results = []
+    for workers, threads in scaling_grid(cores):
+        point = run_scaling_point(
+            ctx.settings.to_dict(), ctx.audio_file, workers, threads,
+            files_per_worker=ctx.settings.repeat
+        )
+        files_per_second = point["files_per_second"]
+        results.append(BenchmarkResult(
+            name=f"scaling.workers.w{workers}xt{threads}",
+            latency_s=point["wall_time"] / ctx.settings.repeat,
+            latency_p95_s=point["wall_time"] / ctx.settings.repeat,
+            throughput=files_per_second,
+            rtf=1.0 / (files_per_second * ctx.settings.duration) if files_per_second else None,
+            peak_rss_mb=point["peak_rss_mb"],
+            repeat=ctx.settings.repeat,
+            extra={"workers": workers, "threads": threads, "cores": cores,
+                   "oversubscribed": workers * threads > cores}
+        ))
+    return results
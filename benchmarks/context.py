@@ -0,0 +1,87 @@
+"""
+Benchmark Context
+
+Lazily created inputs and models shared by the benchmark cases.
+"""
+
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Dict
+
+from benchmarks import synthetic
+
+
+@dataclass
+class BenchmarkSettings:
+    """Settings for one benchmark run."""
+    duration: float = 30.0
+    audio_format: str = "wav"
+    sample_rate: int = 16000
+    transcript_words: int = 1500
+    repeat: int = 3
+    warmup: int = 1
+    seed: int = 0
+    
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+@dataclass
+class BenchmarkContext:
+    """
+    Inputs and stand-in models for benchmark cases.
+    
+    Everything is created on first use and reused across cases, so a case
+    only pays for the work it measures.
+    """
+    settings: BenchmarkSettings = field(default_factory=BenchmarkSettings)
+    workdir: str = None
+    
+    def __post_init__(self):
+        self._owns_workdir = self.workdir is None
+        if self.workdir is None:
+            self.workdir = tempfile.mkdtemp(prefix="acs-bench-")
+    
+    @cached_property
+    def audio(self):
+        """Synthetic speech-like samples for the configured duration."""
+        return synthetic.generate_speech_like_audio(
+            self.settings.duration, self.settings.sample_rate, self.settings.seed
+        )
+    
+    @cached_property
+    def audio_file(self) -> str:
+        """The synthetic audio written in the configured format."""
+        path = Path(self.workdir) / f"synthetic_{self.settings.duration:g}s.{self.settings.audio_format}"
+        return synthetic.write_audio(self.audio, str(path), self.settings.sample_rate)
+    
+    @cached_property
+    def transcript(self) -> str:
+        """A synthetic conversation transcript."""
+        return synthetic.generate_transcript(self.settings.transcript_words, self.settings.seed)
+    
+    @cached_property
+    def config(self):
+        """Application config that keeps benchmark runs out of the results index."""
+        from config.settings import AppConfig
+        
+        config = AppConfig()
+        config.storage.index_results = False
+        config.audio.sample_rate = self.settings.sample_rate
+        return config
+    
+    @cached_property
+    def pipeline(self):
+        """A pipeline wired to the stand-in models."""
+        from benchmarks.stand_ins import install_stand_ins
+        from src.pipeline import AudioProcessingPipeline
+        
+        return install_stand_ins(AudioProcessingPipeline(self.config), seed=self.settings.seed)
+    
+    def cleanup(self):
+        """Remove the temporary working directory."""
+        if self._owns_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
@@ -0,0 +1,188 @@
+"""
+Benchmark Harness
+
+Measurement, case registration and baseline comparison.
+"""
+
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.resources import RSSMonitor
+
+# Metrics where a larger value is a regression; every other metric regresses when it shrinks
+LOWER_IS_BETTER = {"latency_s", "latency_p95_s", "rtf", "peak_rss_mb"}
+
+# Metrics compared against the baseline
+COMPARED_METRICS = ("latency_s", "throughput", "rtf", "peak_rss_mb")
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one benchmark case."""
+    name: str
+    latency_s: float
+    latency_p95_s: float
+    throughput: float
+    rtf: Optional[float]
+    peak_rss_mb: float
+    repeat: int
+    extra: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int = 3, warmup: int = 1,
+            items: int = 1, audio_seconds: float = None,
+            extra: Dict[str, Any] = None) -> BenchmarkResult:
+    """
+    Time a callable and record its peak memory.
+    
+    ``peak_rss_mb`` is the peak RSS above the level when the case started
+    (warm-up included, so models it loads count), so earlier cases and
+    whatever the process already holds do not inflate later ones. The
+    absolute peak is kept as ``extra["peak_rss_total_mb"]``.
+    
+    Args:
+        name (str): Benchmark case name
+        fn (Callable): Work to measure (one call = one iteration)
+        repeat (int): Measured iterations
+        warmup (int): Unmeasured iterations run first
+        items (int): Work items per iteration (files, chunks...) for throughput
+        audio_seconds (float): Audio processed per iteration, for the real-time factor
+        extra (Dict[str, Any]): Additional values to store with the result
+    
+    Returns:
+        BenchmarkResult: Median latency, p95 latency, throughput, RTF and peak RSS increase
+    """
+    latencies = []
+    with RSSMonitor() as monitor:
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+    
+    latency = statistics.median(latencies)
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    
+    return BenchmarkResult(
+        name=name,
+        latency_s=latency,
+        latency_p95_s=p95,
+        throughput=items / latency if latency > 0 else 0.0,
+        rtf=latency / audio_seconds if audio_seconds else None,
+        peak_rss_mb=monitor.peak_increase_bytes / 1e6,
+        repeat=repeat,
+        extra=dict(extra or {}, peak_rss_total_mb=monitor.peak_bytes / 1e6)
+    )
+
+
+_CASES: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark case.
+    
+    The decorated function receives a ``BenchmarkContext`` and returns a
+    ``BenchmarkResult`` (or a list of them).
+    
+    Args:
+        name (str): Unique case name, e.g. ``stage.asr``
+    """
+    def decorator(fn: Callable) -> Callable:
+        if name in _CASES:
+            raise ValueError(f"Duplicate benchmark case: {name}")
+        _CASES[name] = fn
+        return fn
+    return decorator
+
+
+def registered_cases() -> Dict[str, Callable]:
+    """
+    Get all registered benchmark cases.
+    
+    Returns:
+        Dict[str, Callable]: Case functions by name
+    """
+    return dict(_CASES)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load a JSON baseline written by ``save_baseline``.
+    
+    Args:
+        path (str): Baseline file
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: Result dictionaries by case name (empty if missing)
+    """
+    baseline = Path(path)
+    if not baseline.exists():
+        return {}
+    with open(baseline, "r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(path: str, results: List[BenchmarkResult], settings: Dict[str, Any]):
+    """
+    Write results as the new baseline.
+    
+    Args:
+        path (str): Baseline file
+        results (List[BenchmarkResult]): Measured results
+        settings (Dict[str, Any]): Settings the results were measured with
+    """
+    baseline = Path(path)
+    baseline.parent.mkdir(parents=True, exist_ok=True)
+    with open(baseline, "w", encoding="utf-8") as f:
+        json.dump({
+            "settings": settings,
+            "results": {result.name: result.to_dict() for result in results}
+        }, f, indent=2, sort_keys=True)
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Find metrics that regressed beyond a relative threshold.
+    
+    Args:
+        results (List[BenchmarkResult]): Current results
+        baseline (Dict[str, Dict[str, Any]]): Baseline results by case name
+        threshold (float): Allowed relative change (0.2 = 20%)
+    
+    Returns:
+        List[Dict[str, Any]]: One entry per regressed metric
+    """
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        
+        current = result.to_dict()
+        for metric in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            
+            change = (new - old) / old
+            regressed = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            if regressed:
+                regressions.append({
+                    "case": result.name,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change
+                })
+    return regressions
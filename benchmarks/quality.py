@@ -0,0 +1,77 @@
+"""
+Quality Metrics
+
+ROUGE scores for comparing summaries produced by different pipeline variants.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _f1(overlap: float, candidate: int, reference: int) -> float:
+    if not overlap or not candidate or not reference:
+        return 0.0
+    precision, recall = overlap / candidate, overlap / reference
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate: str, reference: str, n: int = 1) -> float:
+    """
+    ROUGE-N F1 between two texts.
+    
+    Args:
+        candidate (str): Text being evaluated
+        reference (str): Reference text
+        n (int): N-gram size
+    
+    Returns:
+        float: F1 of overlapping n-grams (0-1)
+    """
+    def ngrams(tokens):
+        return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    
+    cand, ref = ngrams(_tokens(candidate)), ngrams(_tokens(reference))
+    overlap = sum((cand & ref).values())
+    return _f1(overlap, sum(cand.values()), sum(ref.values()))
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """
+    ROUGE-L F1 (longest common subsequence) between two texts.
+    
+    Args:
+        candidate (str): Text being evaluated
+        reference (str): Reference text
+    
+    Returns:
+        float: LCS-based F1 (0-1)
+    """
+    cand, ref = _tokens(candidate), _tokens(reference)
+    previous = [0] * (len(ref) + 1)
+    for word in cand:
+        current = [0]
+        for j, ref_word in enumerate(ref):
+            current.append(previous[j] + 1 if word == ref_word else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(cand), len(ref))
+
+
+def rouge(candidate: str, reference: str) -> Dict[str, float]:
+    """
+    ROUGE-1, ROUGE-2 and ROUGE-L F1 between two texts.
+    
+    Returns:
+        Dict[str, float]: ``rouge1``, ``rouge2`` and ``rougeL``
+    """
+    return {
+        "rouge1": rouge_n(candidate, reference, 1),
+        "rouge2": rouge_n(candidate, reference, 2),
+        "rougeL": rouge_l(candidate, reference)
+    }
@@ -0,0 +1,112 @@
+"""
+Benchmark Runner
+
+Usage:
+    python -m benchmarks.run                          # run and compare with the baseline
+    python -m benchmarks.run --update-baseline        # record a new baseline
+    python -m benchmarks.run --only stage. --duration 120 --format mp3
+
+Exits with status 1 when any metric regresses beyond ``--threshold``
+relative to the baseline.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Make the project root importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import cases  # noqa: F401  (registers the cases)
+from benchmarks.context import BenchmarkContext, BenchmarkSettings
+from benchmarks.harness import compare, load_baseline, registered_cases, save_baseline
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def create_parser():
+    """Create command line argument parser."""
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("--only", action="append", default=[],
+                        help="Run cases whose name starts with this prefix (repeatable)")
+    parser.add_argument("--list", action="store_true", help="List benchmark cases and exit")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Synthetic audio length in seconds (default: 30)")
+    parser.add_argument("--format", type=str, default="wav",
+                        choices=["wav", "mp3", "flac", "ogg", "m4a"],
+                        help="Synthetic audio format (default: wav)")
+    parser.add_argument("--words", type=int, default=1500,
+                        help="Synthetic transcript length in words (default: 1500)")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured iterations (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="Warm-up iterations (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--baseline", type=str, default=str(DEFAULT_BASELINE),
+                        help="Baseline JSON file (default: benchmarks/baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative regression per metric (default: 0.2)")
+    parser.add_argument("--output", type=str, help="Also write the results to this JSON file")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Run the selected benchmark cases."""
+    args = create_parser().parse_args(argv)
+    
+    selected = {
+        name: fn for name, fn in sorted(registered_cases().items())
+        if not args.only or any(name.startswith(prefix) for prefix in args.only)
+    }
+    if args.list:
+        for name, fn in selected.items():
+            print(f"{name:32s} {(fn.__doc__ or '').strip()}")
+        return 0
+    
+    settings = BenchmarkSettings(
+        duration=args.duration, audio_format=args.format, transcript_words=args.words,
+        repeat=args.repeat, warmup=args.warmup, seed=args.seed
+    )
+    ctx = BenchmarkContext(settings)
+    
+    results = []
+    try:
+        for name, fn in selected.items():
+            print(f"⏱️  {name} ...", flush=True)
+            outcome = fn(ctx)
+            for result in outcome if isinstance(outcome, list) else [outcome]:
+                results.append(result)
+                rtf = f"{result.rtf:.3f}" if result.rtf is not None else "-"
+                print(f"   {result.name:32s} latency {result.latency_s * 1000:9.1f} ms  "
+                      f"throughput {result.throughput:8.2f}/s  RTF {rtf:>7s}  "
+                      f"peak RSS +{result.peak_rss_mb:8.1f} MB")
+    finally:
+        ctx.cleanup()
+    
+    if args.output:
+        save_baseline(args.output, results, settings.to_dict())
+    
+    if args.update_baseline:
+        save_baseline(args.baseline, results, settings.to_dict())
+        print(f"💾 Baseline written to {args.baseline}")
+        return 0
+    
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"❌ {regression['case']} {regression['metric']}: "
+              f"{regression['baseline']:.4g} -> {regression['current']:.4g} "
+              f"({regression['change']:+.0%})")
+    if regressions:
+        return 1
+    
+    print(f"✅ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
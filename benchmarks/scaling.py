@@ -0,0 +1,134 @@
+"""
+Worker Scaling
+
+Throughput of concurrent pipeline processes for different worker × thread splits.
+"""
+
+import multiprocessing
+import queue
+import time
+from typing import Any, Dict, List, Tuple
+
+from src.utils.resources import RSSMonitor
+from src.utils.runtime import RuntimePlan, apply_runtime, available_cores, resolve_device
+
+
+def scaling_grid(cores: int) -> List[Tuple[int, int]]:
+    """
+    Pick worker × thread splits to compare on a machine.
+    
+    Every power-of-two worker count up to the core count gets the balanced
+    split (``cores // workers`` threads). Multi-worker counts also get an
+    oversubscribed run where every worker uses all cores, the torch default.
+    
+    Args:
+        cores (int): Available cores
+    
+    Returns:
+        List[Tuple[int, int]]: ``(workers, threads_per_worker)`` pairs
+    """
+    grid = []
+    workers = 1
+    while workers <= cores:
+        grid.append((workers, max(1, cores // workers)))
+        if workers > 1:
+            grid.append((workers, cores))
+        workers *= 2
+    return grid
+
+
+def _worker(settings: Dict[str, Any], audio_file: str, plan: RuntimePlan, files: int,
+            ready, start, results):
+    apply_runtime(plan)
+    
+    import torch
+    from benchmarks.context import BenchmarkContext, BenchmarkSettings
+    
+    ctx = BenchmarkContext(BenchmarkSettings(**settings))
+    pipeline = ctx.pipeline
+    torch.manual_seed(ctx.settings.seed)
+    pipeline.process_audio_file(audio_file)  # warm-up
+    
+    ready.put(None)
+    start.wait()
+    
+    begin = time.perf_counter()
+    with RSSMonitor() as monitor:
+        for _ in range(files):
+            torch.manual_seed(ctx.settings.seed)
+            pipeline.process_audio_file(audio_file)
+    results.put({"elapsed": time.perf_counter() - begin, "peak_rss_mb": monitor.peak_bytes / 1e6})
+    ctx.cleanup()
+
+
+def run_scaling_point(settings: Dict[str, Any], audio_file: str, workers: int, threads: int,
+                      files_per_worker: int = 2, pin_cpus: bool = False) -> Dict[str, Any]:
+    """
+    Process a file concurrently in several worker processes.
+    
+    Workers load their stand-in models and warm up first; timing starts when
+    all of them are ready, so model loading is not measured.
+    
+    Args:
+        settings (Dict[str, Any]): ``BenchmarkSettings`` values for each worker
+        audio_file (str): File every worker processes
+        workers (int): Worker processes
+        threads (int): Intra-op threads per worker
+        files_per_worker (int): Measured files per worker
+        pin_cpus (bool): Pin each worker to its own cores
+    
+    Returns:
+        Dict[str, Any]: Wall time, files processed, files per second and the
+            highest per-worker peak RSS
+    """
+    # Fresh interpreters: forked children would inherit the parent's thread pools
+    mp = multiprocessing.get_context("spawn")
+    ready, results, start = mp.Queue(), mp.Queue(), mp.Event()
+    cores = available_cores()
+    device = resolve_device("cpu")
+    
+    processes = []
+    for index in range(workers):
+        cpu_ids = None
+        if pin_cpus:
+            first = index * threads
+            cpu_ids = [cores[(first + i) % len(cores)] for i in range(threads)]
+        plan = RuntimePlan(device=device, threads=threads, interop_threads=1, cpu_ids=cpu_ids)
+        process = mp.Process(
+            target=_worker,
+            args=(settings, audio_file, plan, files_per_worker, ready, start, results)
+        )
+        process.start()
+        processes.append(process)
+    
+    _collect(ready, processes)
+    begin = time.perf_counter()
+    start.set()
+    reports = _collect(results, processes)
+    wall_time = time.perf_counter() - begin
+    
+    for process in processes:
+        process.join()
+    
+    files = workers * files_per_worker
+    return {
+        "wall_time": wall_time,
+        "files": files,
+        "files_per_second": files / wall_time if wall_time > 0 else 0.0,
+        "peak_rss_mb": max(report["peak_rss_mb"] for report in reports)
+    }
+
+
+def _collect(messages, processes) -> List[Any]:
+    """Read one message per process, failing instead of hanging if a worker dies."""
+    received = []
+    while len(received) < len(processes):
+        try:
+            received.append(messages.get(timeout=1.0))
+        except queue.Empty:
+            dead = [p for p in processes if p.exitcode not in (None, 0)]
+            if dead:
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError(f"Scaling worker exited with code {dead[0].exitcode}")
+    return received
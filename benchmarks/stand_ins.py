@@ -0,0 +1,157 @@
+"""
+Stand-in Models
+
+Tiny randomly initialized models with the same architectures and call
+interfaces as the production checkpoints. They need no network access and
+no downloaded weights, so benchmarks measure the pipeline's own overheads
+(decoding, chunking, batching, generation loops) reproducibly.
+"""
+
+from benchmarks.synthetic import transcript_vocabulary
+
+_SPECIAL_TOKENS = ["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+
+
+def build_tokenizer():
+    """
+    Build an offline word-level tokenizer covering the synthetic vocabulary.
+    
+    Returns:
+        transformers.PreTrainedTokenizerFast: Tokenizer with BART-style special tokens
+    """
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+    
+    vocab = {token: i for i, token in enumerate(_SPECIAL_TOKENS)}
+    for word in transcript_vocabulary() + [".", ",", "?", "!"]:
+        vocab.setdefault(word, len(vocab))
+    
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>",
+        pair="<s> $A </s> </s> $B </s>",
+        special_tokens=[("<s>", vocab["<s>"]), ("</s>", vocab["</s>"])]
+    )
+    
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        bos_token="<s>", eos_token="</s>", unk_token="<unk>",
+        pad_token="<pad>", mask_token="<mask>",
+        model_max_length=1024
+    )
+
+
+def _bart_config(vocab_size: int, **kwargs):
+    from transformers import BartConfig
+    
+    return BartConfig(
+        vocab_size=vocab_size,
+        d_model=64,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+        max_position_embeddings=1024,
+        pad_token_id=1, bos_token_id=0, eos_token_id=2,
+        decoder_start_token_id=2, forced_bos_token_id=0,
+        **kwargs
+    )
+
+
+def tiny_whisper(seed: int = 0, width: int = 64, layers: int = 1):
+    """
+    Build a randomly initialized Whisper model with a single small layer.
+    
+    The vocabulary matches the multilingual tokenizer shipped with the
+    ``whisper`` package, so transcription runs the real decoding loop.
+    
+    Args:
+        seed (int): Random seed for the weights
+        width (int): Hidden size; larger values stand in for larger checkpoints
+        layers (int): Encoder and decoder layers
+    
+    Returns:
+        whisper.model.Whisper: Stand-in model
+    """
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    
+    torch.manual_seed(seed)
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=width, n_audio_head=2, n_audio_layer=layers,
+        n_vocab=51865, n_text_ctx=448, n_text_state=width, n_text_head=2, n_text_layer=layers
+    )
+    return Whisper(dims).eval()
+
+
+def tiny_summarizer(seed: int = 0):
+    """
+    Build a summarization pipeline around a tiny random BART model.
+    
+    Args:
+        seed (int): Random seed for the weights
+    
+    Returns:
+        transformers.Pipeline: ``summarization`` pipeline
+    """
+    import torch
+    from transformers import BartForConditionalGeneration, pipeline
+    
+    torch.manual_seed(seed)
+    tokenizer = build_tokenizer()
+    model = BartForConditionalGeneration(_bart_config(len(tokenizer))).eval()
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=-1)
+
+
+def tiny_classifier(seed: int = 0):
+    """
+    Build a zero-shot classification pipeline around a tiny random BART NLI model.
+    
+    Args:
+        seed (int): Random seed for the weights
+    
+    Returns:
+        transformers.Pipeline: ``zero-shot-classification`` pipeline
+    """
+    import torch
+    from transformers import BartForSequenceClassification, pipeline
+    
+    torch.manual_seed(seed)
+    tokenizer = build_tokenizer()
+    config = _bart_config(
+        len(tokenizer),
+        num_labels=3,
+        id2label={0: "contradiction", 1: "neutral", 2: "entailment"},
+        label2id={"contradiction": 0, "neutral": 1, "entailment": 2}
+    )
+    model = BartForSequenceClassification(config).eval()
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer, device=-1)
+
+
+def install_stand_ins(pipeline, seed: int = 0):
+    """
+    Replace a pipeline's models with stand-ins without loading any checkpoint.
+    
+    Args:
+        pipeline (AudioProcessingPipeline): Pipeline to prepare
+        seed (int): Random seed for the weights
+    
+    Returns:
+        AudioProcessingPipeline: The same pipeline, ready to process files
+    """
+    pipeline.build_components()
+    
+    pipeline.speech_to_text.model = tiny_whisper(seed)
+    
+    summarizer = tiny_summarizer(seed)
+    pipeline.summarizer.summarizer = summarizer
+    pipeline.summarizer.model = summarizer.model
+    pipeline.summarizer.tokenizer = summarizer.tokenizer
+    
+    pipeline.classifier.classifier = tiny_classifier(seed)
+    
+    pipeline.load_models()
+    return pipeline
@@ -0,0 +1,160 @@
+"""
+Synthetic Inputs
+
+Deterministic speech-like audio and conversation-like transcripts.
+"""
+
+import shutil
+import subprocess
+import wave
+from pathlib import Path
+
+# Words used for synthetic transcripts; a mix of filler and content words
+_VOCABULARY = (
+    "the customer called about a refund for the order that arrived late and the agent "
+    "checked the account history before offering a credit on the next invoice while "
+    "explaining the updated shipping policy and the team agreed to review the budget "
+    "for the quarter including hiring plans travel costs and the new product launch "
+    "schedule with marketing support from the regional office next week"
+).split()
+
+_FILLERS = ["um", "uh", "you know", "like", "I mean", "so"]
+
+
+def generate_speech_like_audio(duration: float, sample_rate: int = 16000, seed: int = 0):
+    """
+    Generate a speech-like signal.
+    
+    Voiced "syllables" (a harmonic series on a drifting pitch, shaped by
+    two formant-like resonances) alternate with short pauses and a low
+    noise floor, giving energy and spectral dynamics similar to speech.
+    
+    Args:
+        duration (float): Length in seconds
+        sample_rate (int): Sample rate in Hz
+        seed (int): Random seed
+    
+    Returns:
+        numpy.ndarray: Mono float32 samples in [-1, 1]
+    """
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    n_samples = int(duration * sample_rate)
+    t = np.arange(n_samples, dtype=np.float64) / sample_rate
+    
+    # Pitch contour: slow drift between 100 and 220 Hz
+    pitch = 160 + 60 * np.sin(2 * np.pi * 0.2 * t + rng.uniform(0, 2 * np.pi))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    
+    voiced = np.zeros(n_samples)
+    for harmonic in range(1, 16):
+        frequency = pitch * harmonic
+        # Formant-like emphasis around ~500 Hz and ~1500 Hz
+        gain = np.exp(-((frequency - 500) / 300) ** 2) + 0.6 * np.exp(-((frequency - 1500) / 500) ** 2)
+        voiced += gain * np.sin(harmonic * phase) / harmonic
+    
+    # Syllable envelope (~4 Hz) with random pauses between "words"
+    envelope = np.zeros(n_samples)
+    position = 0
+    while position < n_samples:
+        syllable = int(rng.uniform(0.15, 0.35) * sample_rate)
+        pause = int(rng.choice([0.05, 0.1, 0.4]) * sample_rate)
+        end = min(position + syllable, n_samples)
+        envelope[position:end] = np.hanning(syllable)[: end - position]
+        position = end + pause
+    
+    signal = voiced * envelope + 0.01 * rng.standard_normal(n_samples)
+    signal = 0.8 * signal / max(np.max(np.abs(signal)), 1e-9)
+    return signal.astype(np.float32)
+
+
+def write_audio(samples, path: str, sample_rate: int = 16000) -> str:
+    """
+    Write samples to an audio file; the format follows the file extension.
+    
+    WAV is written directly; other formats (mp3, flac, ogg, m4a) are
+    transcoded with FFmpeg.
+    
+    Args:
+        samples (numpy.ndarray): Mono float32 samples in [-1, 1]
+        path (str): Output path
+        sample_rate (int): Sample rate in Hz
+    
+    Returns:
+        str: Path of the written file
+    """
+    import numpy as np
+    
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    wav_path = output if output.suffix.lower() == ".wav" else output.with_suffix(".tmp.wav")
+    
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(str(wav_path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+    
+    if wav_path != output:
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError(f"FFmpeg is required to write {output.suffix} files")
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", str(wav_path), str(output)],
+            check=True
+        )
+        wav_path.unlink()
+    
+    return str(output)
+
+
+def generate_transcript(n_words: int, seed: int = 0, filler_rate: float = 0.1,
+                        loop_rate: float = 0.0) -> str:
+    """
+    Generate a conversation-like transcript.
+    
+    Args:
+        n_words (int): Approximate number of words
+        seed (int): Random seed
+        filler_rate (float): Fraction of words that are disfluencies
+        loop_rate (float): Fraction of sentences repeated 3-8 times in a row,
+            as in Whisper's looping hallucinations (repeats are not counted)
+    
+    Returns:
+        str: Transcript made of sentences of 8-20 words
+    """
+    import random
+    
+    rng = random.Random(seed)
+    sentences = []
+    count = 0
+    while count < n_words:
+        length = rng.randint(8, 20)
+        words = []
+        for _ in range(length):
+            if rng.random() < filler_rate:
+                words.append(rng.choice(_FILLERS))
+            else:
+                words.append(rng.choice(_VOCABULARY))
+        sentences.append(" ".join(words).capitalize() + ".")
+        if loop_rate and rng.random() < loop_rate:
+            sentences.extend([sentences[-1]] * rng.randint(2, 7))
+        count += length
+    return " ".join(sentences)
+
+
+def transcript_vocabulary() -> list:
+    """
+    Get every word that can appear in a synthetic transcript.
+    
+    Returns:
+        list: Unique words, in a stable order
+    """
+    words = []
+    for phrase in list(_VOCABULARY) + _FILLERS:
+        for word in phrase.split():
+            for variant in (word, word.capitalize()):
+                if variant not in words:
+                    words.append(variant)
+    return words
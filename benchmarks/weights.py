@@ -0,0 +1,126 @@
+"""
+Weight Loading
+
+Load time and per-process memory of deserialized vs. memory-mapped checkpoints.
+"""
+
+import multiprocessing
+import os
+import queue
+from typing import Any, Dict
+
+
+def drop_page_cache(path: str) -> bool:
+    """
+    Evict a file from the page cache so the next read comes from disk.
+    
+    Args:
+        path (str): File to evict
+    
+    Returns:
+        bool: Whether the platform supports it (it is best effort even then)
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def save_checkpoint(model, path: str):
+    """Save a Whisper model the way the ``whisper`` package ships its checkpoints."""
+    from dataclasses import asdict
+    
+    import torch
+    
+    torch.save({"dims": asdict(model.dims), "model_state_dict": model.state_dict()}, path)
+
+
+def load_checkpoint(path: str):
+    """Deserialize a Whisper checkpoint into a freshly built model (``whisper.load_model``'s path)."""
+    import torch
+    from whisper.model import ModelDimensions, Whisper
+    
+    checkpoint = torch.load(path, map_location="cpu")
+    model = Whisper(ModelDimensions(**checkpoint["dims"]))
+    model.load_state_dict(checkpoint["model_state_dict"])
+    return model.eval()
+
+
+def touch(model) -> float:
+    """Read every weight once, as the first inference would."""
+    import torch
+    
+    with torch.no_grad():
+        return sum(float(parameter.sum()) for parameter in model.parameters())
+
+
+def _worker(mode: str, checkpoint: str, weights_dir: str, key: str, barrier, reports):
+    # Import torch before the baseline so only the weights are counted
+    import torch
+    from src.models.weight_cache import WeightCache
+    from src.utils.resources import memory_breakdown
+    
+    torch.set_num_threads(1)
+    before = memory_breakdown()
+    model = load_checkpoint(checkpoint) if mode == "checkpoint" else WeightCache(weights_dir).load(key)
+    touch(model)
+    
+    # Measure while every worker holds its model, then keep it until all have measured
+    barrier.wait()
+    after = memory_breakdown()
+    reports.put({name: after[name] - before[name] for name in after})
+    barrier.wait()
+
+
+def run_memory_point(mode: str, checkpoint: str, weights_dir: str, key: str,
+                     workers: int) -> Dict[str, Any]:
+    """
+    Load the same model in several processes at once and measure their memory.
+    
+    Args:
+        mode (str): ``checkpoint`` (deserialize) or ``mmap`` (weight cache)
+        checkpoint (str): Checkpoint file for ``checkpoint`` mode
+        weights_dir (str): Weight cache directory for ``mmap`` mode
+        key (str): Weight cache key
+        workers (int): Concurrent processes
+    
+    Returns:
+        Dict[str, Any]: Mean RSS and private memory per worker added by the
+            model, and the physical memory all workers need together
+    """
+    mp = multiprocessing.get_context("spawn")
+    barrier, reports = mp.Barrier(workers), mp.Queue()
+    processes = [
+        mp.Process(target=_worker, args=(mode, checkpoint, weights_dir, key, barrier, reports))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    
+    measured = []
+    try:
+        while len(measured) < workers:
+            try:
+                measured.append(reports.get(timeout=1.0))
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError(f"Weight loading worker failed in {mode} mode")
+    finally:
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+    
+    rss = sum(report["rss"] for report in measured) / workers
+    private = sum(report["private"] for report in measured) / workers
+    shared = max(report["shared"] for report in measured)
+    return {
+        "workers": workers,
+        "per_worker_rss_mb": rss / 1e6,
+        "per_worker_private_mb": private / 1e6,
+        "total_physical_mb": (private * workers + shared) / 1e6
+    }
@@ -16,6 +16,8 @@ class AudioConfig:
     chunk_size: int = 1024
     max_file_size_mb: int = 100
     supported_formats: List[str] = None
+    feature_cache_dir: str = ""  # reuse log-mel features across runs ("" = off)
+    feature_cache_max_mb: int = 10240  # least recently used features beyond this are deleted (0 = unbounded)
     
     def __post_init__(self):
         if self.supported_formats is None:
@@ -28,8 +30,34 @@ class ModelConfig:
     whisper_model_size: str = "base"
     summarizer_model: str = "facebook/bart-large-cnn"
     classifier_model: str = "facebook/bart-large-mnli"
-    device: str = "auto"  # auto, cpu, cuda
+    device: str = "auto"  # auto, cpu, cuda, mps
     cache_dir: str = "./models_cache"
+    mmap_weights: bool = True  # convert checkpoints to safetensors in cache_dir and memory-map them
+    offline: bool = False  # load models only from cache_dir, never download
+    cpu_cores: int = 0  # cores shared by all worker processes (0 = all available)
+    interop_threads: int = 1
+    pin_cpus: bool = False  # pin each worker process to its own cores
+    # Cascaded ASR: transcribe with this smaller model first ("" = off) and
+    # re-run low-confidence segments with whisper_model_size
+    cascade_first_pass_size: str = ""
+    cascade_logprob_threshold: float = -1.0
+    cascade_no_speech_threshold: float = 0.6
+    cascade_compression_ratio_threshold: float = 2.4
+    # Latency budget: with a deadline, each file uses the largest Whisper size and
+    # summarizer predicted (from measured real-time factors) to finish in time
+    deadline_seconds: float = 0.0  # 0 = always whisper_model_size and summarizer_model
+    budget_model_sizes: str = "tiny,base,small,medium"  # candidates, smallest first
+    budget_summarizers: str = ""  # candidates, smallest first ("" = summarizer_model only)
+    latency_profile: str = "data/state/latency_profile.json"  # measured RTFs ("" = in memory)
+    # Language routing: detect the language from the first 30 s (or take the hint),
+    # send English to the .en Whisper checkpoints and skip text models without support
+    route_language: bool = False
+    language: str = ""  # language hint passed to Whisper ("" = detect)
+    language_detect_size: str = "tiny"  # multilingual Whisper size that detects the language
+    summarizer_languages: str = "en"  # languages summarizer_model supports ("*" = all)
+    classifier_languages: str = "en"  # languages classifier_model supports ("*" = all)
+    memory_budget_mb: int = 0  # 0 = keep every model loaded
+    stagewise_batch: bool = False  # with a budget, run batches one stage at a time
 
 
 @dataclass
@@ -39,6 +67,18 @@ class ProcessingConfig:
     min_summary_length: int = 50
     topic_confidence_threshold: float = 0.5
     predefined_topics: List[str] = None
+    topic_window_tokens: int = 256  # words per classification window
+    topic_aggregation: str = "mean"  # mean, max
+    topic_cache_size: int = 1024  # predictions memoized in memory (0 = off)
+    topic_cache_path: str = ""  # SQLite cache shared by worker processes ("" = off)
+    topic_cache_disk_entries: int = 100000  # oldest SQLite cache entries beyond this are dropped (0 = unbounded)
+    # Extractive pre-compression before summarization (both 0 = disabled)
+    extractive_ratio: float = 0.0
+    extractive_max_tokens: int = 0
+    extractive_min_tokens: int = 1000
+    extractive_method: str = "textrank"  # textrank, centroid
+    # Remove fillers and repeated words/phrases before summarizing
+    normalize_transcript: bool = False
     
     def __post_init__(self):
         if self.predefined_topics is None:
@@ -48,12 +88,38 @@ class ProcessingConfig:
             ]
 
 
+@dataclass
+class StorageConfig:
+    """Results storage configuration."""
+    output_dir: str = "data/output"
+    results_db: str = "data/output/results.db"
+    index_results: bool = True
+    incremental_state_dir: str = "data/state"
+    fingerprint_db: str = ""  # reuse results across re-encoded copies ("" = off)
+    fingerprint_threshold: float = 0.75
+    write_queue_size: int = 64  # results waiting for the background writer before processing blocks
+    fsync_results: bool = True  # flush result files to disk before renaming them into place
+
+
 @dataclass
 class UIConfig:
     """User interface configuration."""
     streamlit_port: int = 8501
     theme: str = "light"
     max_upload_size_mb: int = 50
+    max_concurrent_jobs: int = 2  # web jobs processed at once on the shared models
+
+
+@dataclass
+class ServiceConfig:
+    """Background service configuration."""
+    zygote_socket: str = ""  # warm worker daemon socket ("" = per-user socket in the temp dir)
+    zygote_max_children: int = 2  # jobs the daemon runs at once
+    # Admission control: files wait (then are rejected) while this much decoded audio is in flight
+    max_inflight_audio_seconds: float = 0  # 0 = no duration limit
+    max_inflight_audio_mb: float = 0  # float32 at 16 kHz is about 230 MB per hour (0 = no limit)
+    admission_queue_size: int = 8  # files waiting at most; more are rejected
+    admission_timeout: float = 0  # seconds a file waits before it is rejected (0 = no limit)
 
 
 @dataclass
@@ -62,7 +128,9 @@ class AppConfig:
     audio: AudioConfig = None
     models: ModelConfig = None
     processing: ProcessingConfig = None
+    storage: StorageConfig = None
     ui: UIConfig = None
+    service: ServiceConfig = None
     debug: bool = False
     log_level: str = "INFO"
     
@@ -73,8 +141,12 @@ class AppConfig:
             self.models = ModelConfig()
         if self.processing is None:
             self.processing = ProcessingConfig()
+        if self.storage is None:
+            self.storage = StorageConfig()
         if self.ui is None:
             self.ui = UIConfig()
+        if self.service is None:
+            self.service = ServiceConfig()
 
 
 def load_config() -> AppConfig:
@@ -85,6 +157,60 @@ def load_config() -> AppConfig:
         AppConfig: Application configuration
     """
     return AppConfig(
+        audio=AudioConfig(
+            feature_cache_dir=os.getenv("FEATURE_CACHE_DIR", ""),
+            feature_cache_max_mb=int(os.getenv("FEATURE_CACHE_MAX_MB", "10240"))
+        ),
+        models=ModelConfig(
+            cascade_first_pass_size=os.getenv("CASCADE_FIRST_PASS_SIZE", ""),
+            device=os.getenv("DEVICE", "auto"),
+            cache_dir=os.getenv("MODELS_CACHE_DIR", ModelConfig.cache_dir),
+            mmap_weights=os.getenv("MMAP_WEIGHTS", "true").lower() == "true",
+            offline=os.getenv("MODELS_OFFLINE", "false").lower() == "true",
+            cpu_cores=int(os.getenv("CPU_CORES", "0")),
+            pin_cpus=os.getenv("PIN_CPUS", "false").lower() == "true",
+            deadline_seconds=float(os.getenv("DEADLINE_SECONDS", "0")),
+            budget_model_sizes=os.getenv("BUDGET_MODEL_SIZES", ModelConfig.budget_model_sizes),
+            budget_summarizers=os.getenv("BUDGET_SUMMARIZERS", ""),
+            latency_profile=os.getenv("LATENCY_PROFILE", ModelConfig.latency_profile),
+            route_language=os.getenv("ROUTE_LANGUAGE", "false").lower() == "true",
+            language=os.getenv("AUDIO_LANGUAGE", ""),
+            language_detect_size=os.getenv("LANGUAGE_DETECT_SIZE", ModelConfig.language_detect_size),
+            summarizer_languages=os.getenv("SUMMARIZER_LANGUAGES", ModelConfig.summarizer_languages),
+            classifier_languages=os.getenv("CLASSIFIER_LANGUAGES", ModelConfig.classifier_languages),
+            memory_budget_mb=int(os.getenv("MEMORY_BUDGET_MB", "0")),
+            stagewise_batch=os.getenv("STAGEWISE_BATCH", "false").lower() == "true"
+        ),
+        processing=ProcessingConfig(
+            extractive_ratio=float(os.getenv("EXTRACTIVE_RATIO", "0")),
+            extractive_max_tokens=int(os.getenv("EXTRACTIVE_MAX_TOKENS", "0")),
+            normalize_transcript=os.getenv("NORMALIZE_TRANSCRIPT", "false").lower() == "true",
+            topic_cache_path=os.getenv("TOPIC_CACHE_PATH", ""),
+            topic_cache_disk_entries=int(os.getenv("TOPIC_CACHE_DISK_ENTRIES", "100000"))
+        ),
+        storage=StorageConfig(
+            results_db=os.getenv("RESULTS_DB", StorageConfig.results_db),
+            index_results=os.getenv("INDEX_RESULTS", "true").lower() == "true",
+            incremental_state_dir=os.getenv("INCREMENTAL_STATE_DIR", StorageConfig.incremental_state_dir),
+            fingerprint_db=os.getenv("FINGERPRINT_DB", ""),
+            fingerprint_threshold=float(os.getenv("FINGERPRINT_THRESHOLD", "0.75")),
+            write_queue_size=int(os.getenv("RESULT_WRITE_QUEUE", "64")),
+            fsync_results=os.getenv("FSYNC_RESULTS", "true").lower() == "true"
+        ),
+        ui=UIConfig(
+            streamlit_port=int(os.getenv("STREAMLIT_PORT", "8501")),
+            theme=os.getenv("THEME", "light"),
+            max_upload_size_mb=int(os.getenv("MAX_UPLOAD_SIZE_MB", "50")),
+            max_concurrent_jobs=int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+        ),
+        service=ServiceConfig(
+            zygote_socket=os.getenv("ZYGOTE_SOCKET", ""),
+            zygote_max_children=int(os.getenv("ZYGOTE_MAX_CHILDREN", "2")),
+            max_inflight_audio_seconds=float(os.getenv("MAX_INFLIGHT_AUDIO_SECONDS", "0")),
+            max_inflight_audio_mb=float(os.getenv("MAX_INFLIGHT_AUDIO_MB", "0")),
+            admission_queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "8")),
+            admission_timeout=float(os.getenv("ADMISSION_TIMEOUT", "0"))
+        ),
         debug=os.getenv("DEBUG", "false").lower() == "true",
         log_level=os.getenv("LOG_LEVEL", "INFO")
     )
\ No newline at end of file
@@ -12,6 +12,8 @@ sys.path.append(str(Path(__file__).parent / "src"))
 from pipeline import AudioProcessingPipeline
 from config.settings import load_config
 from src.utils.logger import setup_logging, get_logger
+from src.utils.metrics import get_registry
+from src.utils.runtime import configure_runtime
 
 
 def create_parser():
@@ -24,6 +26,11 @@ Examples:
   python main.py --audio data/input_audio/meeting.wav
   python main.py --record --duration 30
   python main.py --batch data/input_audio data/output
+  python main.py --coordinator data/input_audio data/output --listen 0.0.0.0:8765
+  python main.py --worker coordinator-host:8765 --workers 4
+  python main.py --query "refund" --topic finance --since 2024-01-08
+  python main.py --serve-daemon
+  python main.py --pack-models models.bundle
   python main.py --setup
         """
     )
@@ -46,6 +53,59 @@ Examples:
         metavar=("INPUT_DIR", "OUTPUT_DIR"),
         help="Batch process audio files in directory"
     )
+    input_group.add_argument(
+        "--coordinator",
+        nargs=2,
+        metavar=("INPUT_DIR", "OUTPUT_DIR"),
+        help="Distribute a batch to workers connecting to --listen"
+    )
+    input_group.add_argument(
+        "--worker",
+        type=str,
+        metavar="ADDRESS",
+        help="Process leases from the coordinator at ADDRESS (host:port or unix:/path)"
+    )
+    input_group.add_argument(
+        "--query", "-q",
+        type=str,
+        metavar="TEXT",
+        help="Full-text search over indexed results (use \"\" to filter by --topic/--since only)"
+    )
+    input_group.add_argument(
+        "--serve-daemon",
+        action="store_true",
+        help="Load models once and serve --audio runs from other invocations over a Unix socket"
+    )
+    input_group.add_argument(
+        "--stop-daemon",
+        action="store_true",
+        help="Stop a running --serve-daemon process"
+    )
+    input_group.add_argument(
+        "--calibrate-latency",
+        type=str,
+        metavar="AUDIO",
+        help="Measure the real-time factor of every --deadline candidate model on AUDIO"
+    )
+    input_group.add_argument(
+        "--pack-models",
+        type=str,
+        metavar="BUNDLE",
+        help="Fetch the configured models and pack them into a single verified bundle file"
+    )
+    input_group.add_argument(
+        "--unpack-models",
+        type=str,
+        metavar="BUNDLE",
+        help="Install a model bundle into the model cache for offline use"
+    )
+    input_group.add_argument(
+        "--verify-models",
+        nargs="?",
+        const="",
+        metavar="BUNDLE",
+        help="Check a bundle, or the unpacked model cache if none is given, against its manifest"
+    )
     input_group.add_argument(
         "--setup", "-s",
         action="store_true",
@@ -60,6 +120,27 @@ Examples:
         help="Recording duration in seconds (default: 10)"
     )
     
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Per-file deadline: use the largest models predicted to finish in time"
+    )
+    
+    parser.add_argument(
+        "--language",
+        type=str,
+        metavar="CODE",
+        help="Spoken language (e.g. en, de); skips language detection"
+    )
+    
+    parser.add_argument(
+        "--route-language",
+        action="store_true",
+        help="Use English-only Whisper models for English audio and skip text models "
+             "that do not support the language"
+    )
+    
     parser.add_argument(
         "--output", "-o",
         type=str,
@@ -82,6 +163,124 @@ Examples:
         help="Output format (default: json)"
     )
     
+    parser.add_argument(
+        "--listen",
+        type=str,
+        default="127.0.0.1:8765",
+        help="Coordinator listen address, host:port or unix:/path (default: 127.0.0.1:8765)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of local worker processes to start with --worker (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--heartbeat-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds without a worker heartbeat before its lease is reassigned (default: 30)"
+    )
+    
+    parser.add_argument(
+        "--topic",
+        type=str,
+        help="Only return query results with this topic label"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=str,
+        help="Only return query results processed at or after this ISO date (e.g. 2024-01-08)"
+    )
+    
+    parser.add_argument(
+        "--until",
+        type=str,
+        help="Only return query results processed before this ISO date"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of query results (default: 20)"
+    )
+    
+    parser.add_argument(
+        "--source-id",
+        type=str,
+        help="With --audio, treat the file as a growing recording with this id and "
+             "only process audio added since the last run"
+    )
+    
+    parser.add_argument(
+        "--daemon-socket",
+        type=str,
+        metavar="PATH",
+        help="Unix socket of the warm worker daemon (default: ZYGOTE_SOCKET or a per-user temp path)"
+    )
+    
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Process --audio in this process even if a warm worker daemon is running"
+    )
+    
+    parser.add_argument(
+        "--cascade-from",
+        type=str,
+        choices=["tiny", "base", "small", "medium"],
+        help="Cascaded ASR: transcribe with this smaller model first and re-transcribe "
+             "only low-confidence segments with --model-size"
+    )
+    
+    parser.add_argument(
+        "--device",
+        type=str,
+        choices=["auto", "cpu", "cuda", "mps"],
+        help="Device for model inference (default: auto)"
+    )
+    
+    parser.add_argument(
+        "--cpu-cores",
+        type=int,
+        help="Cores shared by all worker processes; each gets cores/workers threads (default: all)"
+    )
+    
+    parser.add_argument(
+        "--pin-cpus",
+        action="store_true",
+        help="Pin each worker process to its own cores"
+    )
+    
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        metavar="MB",
+        help="Low-memory mode: load each model only for its stage and keep RSS within MB"
+    )
+    
+    parser.add_argument(
+        "--stagewise",
+        action="store_true",
+        help="With --memory-budget, batch one stage at a time so each model loads once"
+    )
+    
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        help="Write Prometheus-format metrics to this file when the run finishes"
+    )
+    
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus-format metrics on http://127.0.0.1:PORT/metrics while running"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -106,6 +305,65 @@ def run_setup():
     return True
 
 
+def run_query(args, config) -> int:
+    """Search the results store and print ranked matches."""
+    from src.utils.results_store import ResultsStore
+    
+    db_path = Path(config.storage.results_db)
+    if not db_path.exists():
+        print(f"❌ No results index at {db_path}. Process some audio first.")
+        return 1
+    
+    store = ResultsStore(str(db_path))
+    matches = store.search(
+        args.query, topic=args.topic, since=args.since, until=args.until, limit=args.limit
+    )
+    store.close()
+    
+    print(f"\n🔎 {len(matches)} result(s)")
+    for match in matches:
+        print("-" * 50)
+        print(f"📁 {match['audio_file']}")
+        print(f"🕒 {match['processed_at']}   🏷️  {match['topic']} ({(match['confidence'] or 0):.2f})")
+        if match.get("snippet"):
+            print(f"   {match['snippet']}")
+    return 0
+
+
+def run_models_command(args, config) -> int:
+    """Pack, unpack or verify an offline model bundle and print the report."""
+    import os
+    
+    from src.models.model_manager import ModelManager
+    from src.utils.runtime import resolve_device
+    
+    models = config.models
+    manager = ModelManager(
+        cache_dir=models.cache_dir, device=resolve_device(models.device),
+        weights_dir=os.path.join(models.cache_dir, "safetensors") if models.mmap_weights else None,
+        offline=models.offline
+    )
+    
+    if args.pack_models:
+        manifest = manager.pack_bundle(args.pack_models, models)
+        total = sum(entry["size"] for entry in manifest["files"])
+        print(f"📦 Packed {len(manifest['files'])} files ({total / 1e6:.1f} MB) into {args.pack_models}")
+        return 0
+    
+    if args.unpack_models:
+        report = manager.unpack_bundle(args.unpack_models)
+        action = f"Unpacked into {models.cache_dir}"
+    else:
+        report = manager.verify_bundle(args.verify_models or None)
+        action = f"Verified {args.verify_models or models.cache_dir}"
+    
+    print(f"📦 {action}: {report['files']} files, {report['bytes'] / 1e6:.1f} MB "
+          f"at {report['mb_per_second']:.0f} MB/s")
+    for failure in report["failures"]:
+        print(f"❌ {failure['path']}: {failure['error']}")
+    return 1 if report["failures"] else 0
+
+
 def main():
     """
     Main function to orchestrate the audio processing pipeline
@@ -128,17 +386,91 @@ def main():
     # Update config with command line arguments
     if hasattr(config.models, 'whisper_model_size'):
         config.models.whisper_model_size = args.model_size
+    if args.cascade_from:
+        config.models.cascade_first_pass_size = args.cascade_from
+    if args.device:
+        config.models.device = args.device
+    if args.cpu_cores is not None:
+        config.models.cpu_cores = args.cpu_cores
+    if args.pin_cpus:
+        config.models.pin_cpus = True
+    if args.memory_budget is not None:
+        config.models.memory_budget_mb = args.memory_budget
+    if args.stagewise:
+        config.models.stagewise_batch = True
+    if args.deadline is not None:
+        config.models.deadline_seconds = args.deadline
+    if args.language:
+        config.models.language = args.language
+    if args.route_language:
+        config.models.route_language = True
     
     logger.info("🎤 Starting Audio Conversation Summarizer")
     
+    if args.metrics_port:
+        get_registry().start_http_server(args.metrics_port)
+        logger.info(f"📈 Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    
     try:
-        # Initialize pipeline
-        pipeline = AudioProcessingPipeline(config)
+        if args.coordinator:
+            # Distribute a batch to remote workers
+            from src.service.coordinator import Coordinator
+            
+            input_dir, output_dir = args.coordinator
+            coordinator = Coordinator.from_directory(
+                input_dir, output_dir, heartbeat_timeout=args.heartbeat_timeout
+            )
+            results = coordinator.serve(args.listen)
+            
+            print("\n" + "="*50)
+            print("🌐 DISTRIBUTED BATCH RESULTS")
+            print("="*50)
+            print(f"✅ Processed: {results['processed']} files")
+            print(f"❌ Failed: {results['failed']} files")
+            print(f"🔁 Reassigned leases: {results['reassigned']}")
+            print(f"⏱️  Total time: {results['total_duration']:.2f}s")
+            print(f"📄 Results: {results['results_path']}")
+            return 0
         
-        if args.audio:
-            # Process single audio file
-            logger.info(f"Processing audio file: {args.audio}")
+        if args.query is not None:
+            return run_query(args, config)
+        
+        if args.worker:
+            # Serve leases from a coordinator with warm models
+            from src.service.worker import run_workers
+            
+            logger.info(f"Starting {args.workers} worker(s) for coordinator {args.worker}")
+            failed_workers = run_workers(args.worker, count=args.workers, config=config)
+            return 1 if failed_workers else 0
+        
+        if args.pack_models or args.unpack_models or args.verify_models is not None:
+            return run_models_command(args, config)
+        
+        if args.serve_daemon:
+            # Keep models warm and fork a child per job submitted by other invocations
+            from src.service.zygote import WarmWorkerDaemon
+            
+            WarmWorkerDaemon(config, socket_path=args.daemon_socket).serve()
+            return 0
+        
+        if args.stop_daemon:
+            from src.service.zygote import request_daemon
             
+            stopped = request_daemon("shutdown", config, args.daemon_socket)
+            print("🛑 Warm worker daemon stopped" if stopped else "No warm worker daemon is running")
+            return 0
+        
+        if args.calibrate_latency:
+            configure_runtime(config.models)
+            profile = AudioProcessingPipeline(config).calibrate_latency(args.calibrate_latency)
+            print("\n⏱️  Real-time factors on this machine")
+            for stage, variants in profile.items():
+                for variant, entry in variants.items():
+                    print(f"   {stage:10s} {variant:32s} {entry['rtf']:.3f} ({entry['samples']} runs)")
+            return 0
+        
+        results = None
+        if args.audio:
             # Generate output path if not provided
             output_path = args.output
             if not output_path:
@@ -151,19 +483,68 @@ def main():
                 else:
                     output_path = output_dir / f"{input_file.stem}_results.txt"
             
-            results = pipeline.process_audio_file(args.audio, str(output_path))
+            if not args.no_daemon:
+                # A running daemon has torch imported and the models loaded already
+                from src.service.zygote import submit_job
+                
+                results = submit_job(config, args.audio, str(output_path),
+                                     source_id=args.source_id, socket_path=args.daemon_socket)
+        
+        if results is None:
+            # Initialize pipeline
+            configure_runtime(config.models)
+            pipeline = AudioProcessingPipeline(config)
+        
+        if args.audio:
+            # Process single audio file (unless the daemon already did)
+            if results is None:
+                logger.info(f"Processing audio file: {args.audio}")
+                if args.source_id:
+                    results = pipeline.process_incremental(args.audio, args.source_id, str(output_path))
+                else:
+                    results = pipeline.process_audio_file(args.audio, str(output_path))
             
             # Display results
             print("\n" + "="*50)
             print("🎵 PROCESSING RESULTS")
             print("="*50)
             print(f"📁 File: {results['audio_file']}")
-            print(f"⏱️  Time: {results['processing_time']:.2f}s")
+            print(f"⏱️  Time: {results['processing_time']:.2f}s "
+                  f"(RTF {results['metrics']['rtf']:.3f}, "
+                  f"peak RSS {results['metrics']['peak_rss_mb']:.0f} MB)")
+            print("   " + ", ".join(
+                f"{name} {entry['wall_time']:.2f}s"
+                for name, entry in results['metrics']['stages'].items()
+            ))
+            if results.get("asr_cascade"):
+                cascade = results["asr_cascade"]
+                print(f"🪜 Cascade: {cascade['escalated_segments']}/{cascade['segments']} segments "
+                      f"escalated ({cascade['escalation_rate']:.0%})")
+            if results.get("model_selection", {}).get("whisper_model_size"):
+                selection = results["model_selection"]
+                print(f"⏳ Deadline {selection['deadline_seconds']:.1f}s: Whisper "
+                      f"{selection['whisper_model_size']} + {selection['summarizer_model']}, "
+                      f"{'met' if selection['met_deadline'] else 'missed'}")
+            if results.get("language_routing", {}).get("whisper_model_size"):
+                routing = results["language_routing"]
+                print(f"🌐 Language {routing['language'] or 'unknown'} ({routing['source']}): Whisper "
+                      f"{routing['whisper_model_size']}"
+                      + (f", skipped {', '.join(routing['skipped'])}" if routing["skipped"] else "")
+                      + f", ~{routing['estimated_saved_seconds']:.1f}s saved")
+            if results.get("duplicate_of"):
+                duplicate = results["duplicate_of"]
+                print(f"♻️  Copy of {duplicate['audio_file']} "
+                      f"(similarity {duplicate['similarity']:.2f}); results reused")
+            if results.get("incremental"):
+                incremental = results["incremental"]
+                print(f"➕ Incremental: {incremental['new_seconds']:.1f}s new, "
+                      f"{incremental['reused_seconds']:.1f}s reused"
+                      + (" (reprocessed from the start)" if incremental["reset"] else ""))
             print(f"🏷️  Topic: {results['topic'].get('label', 'unknown')} "
                   f"({results['topic'].get('confidence', 0):.2f})")
             print(f"\n📝 Transcript:\n{results['transcript']}")
             print(f"\n📋 Summary:\n{results['summary']}")
-            
+        
         elif args.record:
             # Record from microphone
             logger.info(f"Recording from microphone for {args.duration} seconds")
@@ -177,7 +558,7 @@ def main():
             print(f"🏷️  Topic: {results['topic']['label']} ({results['topic']['confidence']:.2f})")
             print(f"\n📝 Transcript:\n{results['transcript']}")
             print(f"\n📋 Summary:\n{results['summary']}")
-            
+        
         elif args.batch:
             # Batch process directory
             input_dir, output_dir = args.batch
@@ -191,7 +572,10 @@ def main():
             print(f"✅ Processed: {results['processed']} files")
             print(f"❌ Failed: {results['failed']} files") 
             print(f"⏱️  Total time: {results['total_duration']:.2f}s")
-            
+            print(f"🧠 Peak RSS: {results['metrics']['peak_rss_mb']:.0f} MB")
+            if results.get("results_path"):
+                print(f"📄 Results: {results['results_path']}")
+        
         else:
             # No input specified, show help
             parser.print_help()
@@ -199,7 +583,7 @@ def main():
             print("  python main.py --setup              # Run setup first")
             print("  python main.py --audio sample.wav   # Process audio file")
             print("  python main.py --record --duration 15  # Record for 15 seconds")
-            
+    
     except KeyboardInterrupt:
         logger.info("❌ Operation cancelled by user")
         return 1
@@ -209,6 +593,9 @@ def main():
             import traceback
             traceback.print_exc()
         return 1
+    finally:
+        if args.metrics_file:
+            get_registry().write_textfile(args.metrics_file)
     
     logger.info("✅ Operation completed successfully")
     return 0
@@ -4,27 +4,99 @@ Audio Input Handler
 Manages audio file loading and microphone recording functionality.
 """
 
+import subprocess
+from typing import Optional
+
 
 class AudioInputHandler:
     """
     Handles various audio input sources including files and microphone.
     """
     
-    def __init__(self):
-        """Initialize the audio input handler."""
-        pass
+    def __init__(self, sample_rate: int = 16000):
+        """
+        Initialize the audio input handler.
+        
+        Args:
+            sample_rate (int): Sample rate audio is resampled to
+        """
+        self.sample_rate = sample_rate
     
-    def load_audio_file(self, file_path: str):
+    def load_audio_file(self, file_path: str, start: float = 0.0, duration: float = None):
         """
         Load audio from file.
         
+        The file is decoded with FFmpeg and resampled to mono float32 PCM
+        in [-1, 1], the format Whisper expects.
+        
         Args:
             file_path (str): Path to the audio file
-            
+            start (float): Seek to this many seconds before decoding
+            duration (float): Decode at most this many seconds (None = to the end)
+        
         Returns:
             Audio data and sample rate
         """
-        pass
+        cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+        if start:
+            # Input seeking: FFmpeg skips ahead instead of decoding the prefix
+            cmd += ["-ss", f"{start:.3f}"]
+        if duration is not None:
+            cmd += ["-t", f"{duration:.3f}"]
+        return self._decode(cmd + ["-i", file_path], file_path)
+    
+    def load_audio_bytes(self, data: bytes, name: str = "<buffer>"):
+        """
+        Load audio from an encoded in-memory buffer (e.g. an upload).
+        
+        The bytes are piped to FFmpeg's stdin, so nothing is written to disk.
+        Containers that need seeking to parse (some MP4/M4A files) may fail
+        to decode this way.
+        
+        Args:
+            data (bytes): Encoded audio file contents
+            name (str): Name used in error messages
+        
+        Returns:
+            Audio data and sample rate
+        """
+        return self._decode(["ffmpeg", "-threads", "0", "-i", "pipe:0"], name, data)
+    
+    def probe_duration(self, file_path: str = None, data: bytes = None) -> Optional[float]:
+        """
+        Read an audio file's duration from its container without decoding it.
+        
+        Args:
+            file_path (str): Path to the audio file
+            data (bytes): Encoded audio file contents (instead of ``file_path``)
+        
+        Returns:
+            Optional[float]: Duration in seconds (None if FFprobe cannot tell)
+        """
+        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0",
+               "-i", file_path if data is None else "pipe:0"]
+        try:
+            output = subprocess.run(cmd, input=data, capture_output=True, check=True, timeout=30).stdout
+            return float(output.decode().strip())
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return None
+    
+    def _decode(self, cmd: list, source: str, data: bytes = None):
+        """Run an FFmpeg input command and convert its output to float32 PCM."""
+        import numpy as np
+        
+        cmd = cmd + [
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+            "-ar", str(self.sample_rate),
+            "-"
+        ]
+        try:
+            output = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to load audio {source}: {e.stderr.decode(errors='replace')}") from e
+        
+        audio = np.frombuffer(output, np.int16).astype(np.float32) / 32768.0
+        return audio, self.sample_rate
     
     def record_from_microphone(self, duration: int = 10):
         """
@@ -32,7 +104,7 @@ class AudioInputHandler:
         
         Args:
             duration (int): Recording duration in seconds
-            
+        
         Returns:
             Recorded audio data
         """
@@ -44,8 +116,8 @@ class AudioInputHandler:
         
         Args:
             file_path (str): Path to the audio file
-            
+        
         Returns:
             bool: True if format is supported
         """
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,356 @@
+"""
+Feature Cache
+
+Computes Whisper's log-mel features once per recording and reuses them from disk.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Whisper's front end: 16 kHz audio, 10 ms hop, 30 s of padding frames appended
+SAMPLE_RATE = 16000
+FRAMES_PER_SECOND = 100
+PADDING_SAMPLES = 30 * SAMPLE_RATE
+PADDING_FRAMES = 30 * FRAMES_PER_SECOND
+
+
+def n_mels_for(model_size: str) -> int:
+    """
+    Get the number of mel bins a Whisper checkpoint expects.
+    
+    Args:
+        model_size (str): Whisper model size
+    
+    Returns:
+        int: 128 for large-v3 (which ``large`` aliases), otherwise 80
+    """
+    return 128 if model_size in ("large", "large-v3", "turbo", "large-v3-turbo") else 80
+
+
+def compute_log_mel(audio, n_mels: int = 80):
+    """
+    Compute Whisper's normalized log-mel spectrogram, including the 30 s of
+    trailing silence frames that ``whisper.transcribe`` appends.
+    
+    Args:
+        audio: 16 kHz mono float32 samples
+        n_mels (int): Mel bins
+    
+    Returns:
+        numpy.ndarray: ``(n_mels, frames)`` float32 features
+    """
+    from whisper.audio import log_mel_spectrogram
+    
+    return log_mel_spectrogram(audio, n_mels, padding=PADDING_SAMPLES).cpu().numpy()
+
+
+class LogMelFeatures:
+    """
+    Precomputed log-mel features that ``SpeechToText`` accepts in place of audio.
+    """
+    
+    def __init__(self, mel, key: str, audio=None):
+        """
+        Wrap a feature array.
+        
+        Args:
+            mel (numpy.ndarray): ``(n_mels, frames)`` features ending in padding frames
+            key (str): Hash of the audio the features were computed from
+            audio: Source samples, kept so a model needing another mel size can recompute
+        """
+        self.mel = mel
+        self.key = key
+        self.audio = audio
+    
+    @property
+    def n_mels(self) -> int:
+        return self.mel.shape[0]
+    
+    @property
+    def duration(self) -> float:
+        """Audio length in seconds (padding excluded)."""
+        return (self.mel.shape[1] - PADDING_FRAMES) / FRAMES_PER_SECOND
+    
+    def __len__(self) -> int:
+        """Length in samples, so duration arithmetic matches raw audio."""
+        return int(round(self.duration * SAMPLE_RATE))
+    
+    def clip(self, start: float, end: float) -> "LogMelFeatures":
+        """
+        Cut the features for a time range, keeping the trailing padding frames.
+        
+        Args:
+            start (float): Start in seconds
+            end (float): End in seconds
+        
+        Returns:
+            LogMelFeatures: Features for the range
+        """
+        import numpy as np
+        
+        first = int(start * FRAMES_PER_SECOND)
+        last = min(int(end * FRAMES_PER_SECOND), self.mel.shape[1] - PADDING_FRAMES)
+        mel = np.concatenate([self.mel[:, first:last], self.mel[:, -PADDING_FRAMES:]], axis=1)
+        audio = None
+        if self.audio is not None:
+            audio = self.audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+        return LogMelFeatures(mel, f"{self.key}[{start:.2f}:{end:.2f}]", audio)
+    
+    def tensor(self, n_mels: int, device=None):
+        """
+        Get the features as a torch tensor for a model expecting ``n_mels`` bins.
+        
+        Args:
+            n_mels (int): Mel bins the model expects
+            device: Torch device to move the tensor to
+        
+        Returns:
+            torch.Tensor: ``(n_mels, frames)`` features
+        """
+        import torch
+        
+        mel = self.mel
+        if n_mels != self.n_mels:
+            if self.audio is None:
+                raise ValueError(f"Features have {self.n_mels} mel bins but the model needs {n_mels}")
+            mel = compute_log_mel(self.audio, n_mels)
+        tensor = torch.from_numpy(mel)
+        return tensor.to(device) if device is not None else tensor
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    audio_key TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+"""
+
+
+class FeatureCache:
+    """
+    Stores log-mel features as ``.npy`` files named by a hash of the audio content.
+    
+    A SQLite table maps each source file (absolute path, size and modification
+    time) to the hash and duration of its decoded audio, so features for a
+    file seen before are found without decoding or hashing it again. Cached
+    files are opened memory-mapped, so reusing features for another model
+    size, a retry or a cascade pass only pages in the frames actually read.
+    With a byte budget, the least recently used feature files (by access
+    time, refreshed on every hit) are deleted once the cache outgrows it.
+    """
+    
+    def __init__(self, cache_dir: str, compute: Callable = None, max_bytes: int = 0):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir (str): Directory for feature files
+            compute (Callable): ``compute(audio, n_mels)`` feature function
+                (defaults to Whisper's log-mel front end)
+            max_bytes (int): Keep feature files within this many bytes (0 = unbounded)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.compute = compute or compute_log_mel
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / "files.db"), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+    
+    @staticmethod
+    def audio_key(audio) -> str:
+        """
+        Hash audio samples.
+        
+        Args:
+            audio: 16 kHz mono float32 samples
+        
+        Returns:
+            str: Hex digest identifying the audio
+        """
+        import numpy as np
+        
+        digest = hashlib.sha256(f"audio:{SAMPLE_RATE}:".encode("utf-8"))
+        digest.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+    
+    def _path(self, audio_key: str, n_mels: int) -> Path:
+        return self.cache_dir / f"{audio_key}-{n_mels}.npy"
+    
+    def identify(self, file_path: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a source file whose features were cached before.
+        
+        Args:
+            file_path (str): Path to the audio file
+        
+        Returns:
+            Optional[Tuple[str, float]]: Audio hash and duration in seconds, or
+                None if the file is unknown or changed since
+        """
+        path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT audio_key, duration FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)
+            ).fetchone()
+        return tuple(row) if row else None
+    
+    def load(self, audio_key: str, n_mels: int = 80) -> Optional[LogMelFeatures]:
+        """
+        Open cached features without the source samples.
+        
+        Args:
+            audio_key (str): Audio hash from ``identify``
+            n_mels (int): Mel bins
+        
+        Returns:
+            Optional[LogMelFeatures]: Memory-mapped features, or None if they are not cached
+        """
+        import numpy as np
+        
+        path = self._path(audio_key, n_mels)
+        try:
+            mel = np.load(path, mmap_mode="c")
+        except FileNotFoundError:
+            return None
+        self.hits += 1
+        self._touch(path)
+        return LogMelFeatures(mel, audio_key)
+    
+    def features(self, audio, n_mels: int = 80, keep_audio: bool = True,
+                 file_path: str = None) -> LogMelFeatures:
+        """
+        Load features for audio from the cache, computing and storing them on a miss.
+        
+        Args:
+            audio: 16 kHz mono float32 samples
+            n_mels (int): Mel bins
+            keep_audio (bool): Keep a reference to the samples in the result
+            file_path (str): File the samples were decoded from, recorded so
+                ``identify`` recognizes it next time
+        
+        Returns:
+            LogMelFeatures: Memory-mapped features
+        """
+        import numpy as np
+        
+        key = self.audio_key(audio)
+        path = self._path(key, n_mels)
+        
+        if path.exists():
+            self.hits += 1
+            self._touch(path)
+        else:
+            self.misses += 1
+            mel = np.ascontiguousarray(self.compute(audio, n_mels), dtype=np.float32)
+            # Write under a unique name and rename, so concurrent workers never read a partial file
+            tmp = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+            np.save(tmp, mel)
+            os.replace(tmp, path)
+            logger.debug(f"Cached log-mel features {key[:12]} ({mel.shape[1]} frames)")
+            if self.max_bytes:
+                self._prune(keep=path)
+        
+        if file_path is not None:
+            self._record(file_path, key, len(audio) / SAMPLE_RATE)
+        
+        mel = np.load(path, mmap_mode="c")
+        return LogMelFeatures(mel, key, audio if keep_audio else None)
+    
+    def _record(self, file_path: str, audio_key: str, duration: float):
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, audio_key, duration) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, audio_key, duration)
+            )
+    
+    @staticmethod
+    def _touch(path: Path):
+        # Mounts with relatime/noatime do not update access times on reads
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except FileNotFoundError:
+            pass
+    
+    def _prune(self, keep: Path):
+        """Delete the least recently used feature files, except ``keep``, until the cache fits ``max_bytes``."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npy") and not entry.name.startswith(".") and entry.name != keep.name:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+        
+        total = keep.stat().st_size + sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted cached log-mel features {Path(path).name}")
+    
+    def close(self):
+        """Close the file table."""
+        with self._lock:
+            self._conn.close()
+
+
+_original_log_mel: Optional[Callable] = None
+_hook_lock = threading.Lock()
+
+
+def install_whisper_hook():
+    """
+    Let ``whisper.transcribe`` accept ``LogMelFeatures`` in place of audio.
+    
+    ``whisper.transcribe`` computes the spectrogram itself with
+    ``log_mel_spectrogram(audio, n_mels, padding=...)``. The hook wraps that
+    function once per process: features pass through unchanged and
+    everything else goes to the original.
+    """
+    global _original_log_mel
+    
+    with _hook_lock:
+        if _original_log_mel is not None:
+            return
+        
+        import importlib
+        
+        # ``whisper.transcribe`` the attribute is the function; the module must come from the import system
+        whisper_transcribe = importlib.import_module("whisper.transcribe")
+        original = whisper_transcribe.log_mel_spectrogram
+        
+        def log_mel_spectrogram(audio, n_mels: int = 80, padding: int = 0, device=None):
+            if isinstance(audio, LogMelFeatures):
+                return audio.tensor(n_mels, device)
+            return original(audio, n_mels, padding=padding, device=device)
+        
+        whisper_transcribe.log_mel_spectrogram = log_mel_spectrogram
+        _original_log_mel = original
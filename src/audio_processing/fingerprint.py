@@ -0,0 +1,181 @@
+"""
+Acoustic Fingerprints
+
+Compact spectral fingerprints that survive re-encoding, for finding duplicate recordings.
+"""
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Decoded audio is averaged down to ~5.3 kHz; the bands only reach 2 kHz
+SAMPLE_RATE = 16000
+DECIMATION = 3
+
+# 384 ms frames every 24 ms: the heavy overlap keeps fingerprints of
+# differently aligned decodes (e.g. MP3 encoder delay) close
+FRAME_SIZE = 2048
+HOP = 128
+
+# 33 logarithmically spaced bands give 32 bits per frame
+BANDS = 33
+MIN_FREQUENCY = 300.0
+MAX_FREQUENCY = 2000.0
+
+# Frames transformed at once, bounding the spectrum buffer
+CHUNK_FRAMES = 1024
+
+# Time slices in the coarse loudness code used to narrow index lookups
+SUMMARY_BITS = 64
+
+# Frame offsets searched when comparing two fingerprints (±0.2 s)
+MAX_SHIFT = 8
+
+# Frames used to find the best offset before the full comparison
+ALIGN_FRAMES = 2048
+
+
+class AudioFingerprint:
+    """
+    One 32-bit sub-fingerprint per frame, plus a 64-bit summary code.
+    
+    Bit ``m`` of a sub-fingerprint is the sign of the change over time of
+    the energy difference between bands ``m`` and ``m + 1``. Those signs are
+    unaffected by volume and barely affected by codecs, so re-encoded copies
+    of a recording differ in a small fraction of bits while unrelated audio
+    differs in about half.
+    
+    Noise flips too many bits for exact sub-fingerprint lookups, so the
+    summary code sets bit ``i`` when slice ``i`` of ``SUMMARY_BITS`` equal
+    time slices is louder than the median slice. Copies share all but a
+    few of those bits, which is enough to shortlist candidates cheaply.
+    """
+    
+    def __init__(self, frames, duration: float, summary: int = 0):
+        """
+        Wrap sub-fingerprints.
+        
+        Args:
+            frames (numpy.ndarray): ``uint32`` sub-fingerprints, one per frame
+            duration (float): Audio length in seconds
+            summary (int): Loudness contour code
+        """
+        self.frames = frames
+        self.duration = duration
+        self.summary = summary
+    
+    def __len__(self) -> int:
+        return len(self.frames)
+    
+    def to_bytes(self) -> bytes:
+        return self.frames.astype("<u4", copy=False).tobytes()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes, duration: float, summary: int = 0) -> "AudioFingerprint":
+        import numpy as np
+        
+        return cls(np.frombuffer(data, dtype="<u4").astype(np.uint32), duration, summary)
+    
+    def similarity(self, other: "AudioFingerprint", max_shift: int = MAX_SHIFT) -> float:
+        """
+        Compare two fingerprints at their best alignment.
+        
+        Args:
+            other (AudioFingerprint): Fingerprint to compare with
+            max_shift (int): Largest frame offset tried
+        
+        Returns:
+            float: 1 - bit error rate over the overlapping frames (about 0.5
+                for unrelated audio, close to 1 for copies)
+        """
+        if not len(self) or not len(other):
+            return 0.0
+        
+        head = min(len(self), len(other), ALIGN_FRAMES)
+        shifts = range(-max_shift, max_shift + 1)
+        best_shift = min(shifts, key=lambda shift: _bit_error_rate(
+            self.frames[:head + max_shift], other.frames[:head + max_shift], shift
+        ))
+        return 1.0 - _bit_error_rate(self.frames, other.frames, best_shift)
+
+
+def compute_fingerprint(audio, sample_rate: int = SAMPLE_RATE) -> AudioFingerprint:
+    """
+    Fingerprint decoded audio.
+    
+    Args:
+        audio: Mono float32 samples
+        sample_rate (int): Sample rate of ``audio``
+    
+    Returns:
+        AudioFingerprint: Sub-fingerprints (none for audio shorter than a frame)
+    """
+    import numpy as np
+    
+    audio = np.asarray(audio, dtype=np.float32)
+    duration = len(audio) / sample_rate
+    
+    # Box-filter decimation: crude, but identical for every copy, which is all a fingerprint needs
+    usable = len(audio) - len(audio) % DECIMATION
+    signal = audio[:usable].reshape(-1, DECIMATION).mean(axis=1)
+    rate = sample_rate / DECIMATION
+    if len(signal) < FRAME_SIZE + HOP:
+        return AudioFingerprint(np.zeros(0, dtype=np.uint32), duration)
+    
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    bands = _band_matrix(rate)
+    windows = np.lib.stride_tricks.sliding_window_view(signal, FRAME_SIZE)[::HOP]
+    
+    energies = np.empty((len(windows), BANDS), dtype=np.float32)
+    for start in range(0, len(windows), CHUNK_FRAMES):
+        spectrum = np.fft.rfft(windows[start:start + CHUNK_FRAMES] * window, axis=1)
+        energies[start:start + CHUNK_FRAMES] = (spectrum.real ** 2 + spectrum.imag ** 2) @ bands
+    
+    band_difference = energies[:, :-1] - energies[:, 1:]
+    bits = (band_difference[1:] - band_difference[:-1]) > 0
+    weights = (1 << np.arange(BANDS - 1, dtype=np.uint64)).astype(np.uint64)
+    frames = (bits.astype(np.uint64) @ weights).astype(np.uint32)
+    return AudioFingerprint(frames, duration, _summary_code(energies.sum(axis=1)))
+
+
+def _band_matrix(rate: float):
+    """``(bins, BANDS)`` 0/1 matrix summing FFT power bins into log-spaced bands."""
+    import numpy as np
+    
+    frequencies = np.fft.rfftfreq(FRAME_SIZE, d=1.0 / rate)
+    edges = np.geomspace(MIN_FREQUENCY, MAX_FREQUENCY, BANDS + 1)
+    band = np.searchsorted(edges, frequencies, side="right") - 1
+    matrix = np.zeros((len(frequencies), BANDS), dtype=np.float32)
+    inside = (band >= 0) & (band < BANDS)
+    matrix[np.nonzero(inside)[0], band[inside]] = 1.0
+    return matrix
+
+
+def _summary_code(loudness) -> int:
+    """Bit ``i`` set when time slice ``i`` is louder than the median slice."""
+    import numpy as np
+    
+    if len(loudness) < SUMMARY_BITS:
+        return 0
+    slices = np.array([part.mean() for part in np.array_split(loudness, SUMMARY_BITS)])
+    return sum(1 << i for i, loud in enumerate(slices > np.median(slices)) if loud)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two summary codes."""
+    return bin(a ^ b).count("1")
+
+
+def _bit_error_rate(a, b, shift: int) -> float:
+    """Fraction of differing bits with ``b`` delayed by ``shift`` frames relative to ``a``."""
+    import numpy as np
+    
+    if shift >= 0:
+        a, b = a[shift:], b
+    else:
+        a, b = a, b[-shift:]
+    n = min(len(a), len(b))
+    if n == 0:
+        return 1.0
+    differing = np.unpackbits(np.bitwise_xor(a[:n], b[:n]).view(np.uint8)).sum()
+    return float(differing) / (32 * n)
@@ -4,38 +4,264 @@ Speech-to-Text Module
 Converts audio to text using OpenAI Whisper model.
 """
 
+from src.audio_processing.features import LogMelFeatures, install_whisper_hook
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Audio sample rate Whisper expects
+SAMPLE_RATE = 16000
+
+# Padding (seconds) around re-transcribed spans, and the largest gap merged into one span
+ESCALATION_PADDING = 0.2
+ESCALATION_MERGE_GAP = 1.0
+
 
 class SpeechToText:
     """
     Handles speech-to-text conversion using Whisper model.
+    
+    In cascade mode a small first-pass model transcribes everything and only
+    the segments it is unsure about are re-transcribed with ``model_size``.
     """
     
-    def __init__(self, model_size: str = "base"):
+    def __init__(self, model_size: str = "base", model_manager=None,
+                 first_pass_size: str = None, logprob_threshold: float = -1.0,
+                 no_speech_threshold: float = 0.6, compression_ratio_threshold: float = 2.4):
         """
         Initialize the speech-to-text converter.
         
         Args:
             model_size (str): Whisper model size (tiny, base, small, medium, large)
+            model_manager (ModelManager): Optional shared manager that owns the model
+            first_pass_size (str): Smaller model for a cascade first pass (None = no cascade)
+            logprob_threshold (float): Escalate segments with a lower average log-probability
+            no_speech_threshold (float): Segments above this no-speech probability that
+                also fail the log-probability test are silence and are not escalated
+            compression_ratio_threshold (float): Escalate segments whose text compresses
+                better than this (repetition loops)
         """
         self.model_size = model_size
+        self.model_manager = model_manager
         self.model = None
+        self.first_pass_size = first_pass_size if first_pass_size != model_size else None
+        self.first_pass_model = None
+        self.logprob_threshold = logprob_threshold
+        self.no_speech_threshold = no_speech_threshold
+        self.compression_ratio_threshold = compression_ratio_threshold
+    
+    @property
+    def cascade(self) -> bool:
+        """Whether a small first-pass model runs before ``model_size``."""
+        return bool(self.first_pass_size)
     
     def load_model(self):
-        """Load the Whisper model."""
-        pass
+        """Load the Whisper model (the first-pass model in cascade mode)."""
+        if self.cascade:
+            if self.first_pass_model is None:
+                self.first_pass_model = self._load(self.first_pass_size)
+            return
+        
+        if self.model is None:
+            self.model = self._load(self.model_size)
+    
+    def _load(self, size: str):
+        if self.model_manager is not None:
+            return self.model_manager.load_whisper_model(size)
+        
+        import whisper
+        
+        logger.info(f"Loading Whisper {size} model...")
+        return whisper.load_model(size)
+    
+    def release_model(self):
+        """Drop this component's references to the models so its manager can evict them."""
+        if self.model_manager is not None:
+            self.model = None
+            self.first_pass_model = None
+    
+    def detect_language(self, audio_data):
+        """
+        Detect the spoken language from the first 30 s of log-mel features.
+        
+        Needs a multilingual model; English-only (``.en``) models cannot detect.
+        
+        Args:
+            audio_data: 16 kHz mono float32 array or precomputed ``LogMelFeatures``
+        
+        Returns:
+            tuple: Most likely language code and its probability
+        """
+        import whisper
+        
+        self.load_model()
+        model = self.first_pass_model if self.cascade else self.model
+        if isinstance(audio_data, LogMelFeatures):
+            mel = audio_data.tensor(model.dims.n_mels)
+        else:
+            mel = whisper.log_mel_spectrogram(audio_data[:whisper.audio.N_SAMPLES], model.dims.n_mels)
+        mel = whisper.pad_or_trim(mel, whisper.audio.N_FRAMES).to(model.device)
+        
+        _, probs = model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
     
     def transcribe_audio(self, audio_data, language: str = None):
         """
         Transcribe audio to text.
         
         Args:
-            audio_data: Audio data to transcribe
+            audio_data: Audio data to transcribe (16 kHz mono float32 array or file path)
             language (str): Target language for transcription
-            
+        
         Returns:
             str: Transcribed text
         """
-        pass
+        return self.transcribe_segments(audio_data, language=language)["text"]
+    
+    def transcribe_segments(self, audio_data, language: str = None):
+        """
+        Transcribe audio to text with Whisper's timestamped segments.
+        
+        Args:
+            audio_data: Audio data to transcribe (16 kHz mono float32 array, file path
+                or precomputed ``LogMelFeatures``)
+            language (str): Target language for transcription
+        
+        Returns:
+            dict: ``text``, detected ``language`` and ``segments`` (``start``,
+                ``end`` in seconds and ``text``)
+        """
+        self.load_model()
+        if isinstance(audio_data, LogMelFeatures):
+            install_whisper_hook()
+        if self.cascade:
+            return self._transcribe_cascade(audio_data, language)
+        
+        result = self.model.transcribe(audio_data, language=language)
+        return {
+            "text": result["text"].strip(),
+            "language": result.get("language", language),
+            "segments": self._segments(result)
+        }
+    
+    def _transcribe_cascade(self, audio_data, language: str = None):
+        """
+        Transcribe with the first-pass model and re-transcribe unsure spans.
+        
+        Adjacent low-confidence segments are merged into spans; each span is
+        cut from the audio, transcribed with the full-size model and spliced
+        back in place of the first-pass segments it covers.
+        
+        Returns:
+            dict: As ``transcribe_segments``, plus ``cascade`` statistics
+        """
+        if isinstance(audio_data, str):
+            import whisper
+            audio_data = whisper.load_audio(audio_data)
+        
+        first = self.first_pass_model.transcribe(audio_data, language=language)
+        language = language or first.get("language")
+        segments = self._segments(first)
+        
+        spans = self._escalation_spans(segments)
+        escalated_segments = sum(len(indices) for _, _, indices in spans)
+        escalated_seconds = 0.0
+        
+        if spans:
+            if self.model is None:
+                self.model = self._load(self.model_size)
+            
+            duration = len(audio_data) / SAMPLE_RATE
+            replacements = {}
+            for start, end, indices in spans:
+                start = max(0.0, start - ESCALATION_PADDING)
+                end = min(duration, end + ESCALATION_PADDING)
+                escalated_seconds += end - start
+                if isinstance(audio_data, LogMelFeatures):
+                    clip = audio_data.clip(start, end)
+                else:
+                    clip = audio_data[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+                result = self.model.transcribe(clip, language=language, condition_on_previous_text=False)
+                replacements[indices[0]] = [
+                    dict(segment, start=segment["start"] + start, end=min(segment["end"] + start, end),
+                         escalated=True)
+                    for segment in self._segments(result)
+                ]
+                for index in indices[1:]:
+                    replacements[index] = []
+            
+            segments = [
+                piece
+                for index, segment in enumerate(segments)
+                for piece in replacements.get(index, [segment])
+            ]
+        
+        stats = {
+            "first_pass_model": self.first_pass_size,
+            "model": self.model_size,
+            "segments": len(first.get("segments", [])),
+            "escalated_segments": escalated_segments,
+            "escalated_seconds": escalated_seconds,
+            "escalation_rate": escalated_segments / max(1, len(first.get("segments", [])))
+        }
+        logger.info(f"🪜 Cascade: escalated {escalated_segments}/{stats['segments']} segments "
+                    f"({escalated_seconds:.1f}s of audio) to Whisper {self.model_size}")
+        
+        return {
+            "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+            "language": language,
+            "segments": segments,
+            "cascade": stats
+        }
+    
+    def needs_escalation(self, segment: dict) -> bool:
+        """
+        Decide whether a first-pass segment should be re-transcribed.
+        
+        Mirrors Whisper's own fallback rules: low average log-probability or a
+        high compression ratio (repetition) means low confidence, unless the
+        segment is judged to be silence.
+        
+        Args:
+            segment (dict): Segment with ``avg_logprob``, ``no_speech_prob`` and ``compression_ratio``
+        
+        Returns:
+            bool: True if the segment is low-confidence speech
+        """
+        low_logprob = (segment.get("avg_logprob") or 0.0) < self.logprob_threshold
+        if low_logprob and (segment.get("no_speech_prob") or 0.0) > self.no_speech_threshold:
+            return False
+        return low_logprob or (segment.get("compression_ratio") or 0.0) > self.compression_ratio_threshold
+    
+    def _escalation_spans(self, segments: list) -> list:
+        """Merge low-confidence segments closer than ``ESCALATION_MERGE_GAP`` into spans."""
+        spans = []
+        for index, segment in enumerate(segments):
+            if not self.needs_escalation(segment):
+                continue
+            previous = spans[-1] if spans else None
+            if (previous is not None and previous[2][-1] == index - 1
+                    and segment["start"] - previous[1] <= ESCALATION_MERGE_GAP):
+                spans[-1] = (previous[0], segment["end"], previous[2] + [index])
+            else:
+                spans.append((segment["start"], segment["end"], [index]))
+        return spans
+    
+    @staticmethod
+    def _segments(result: dict) -> list:
+        return [
+            {
+                "start": segment["start"],
+                "end": segment["end"],
+                "text": segment["text"].strip(),
+                "avg_logprob": segment.get("avg_logprob"),
+                "no_speech_prob": segment.get("no_speech_prob"),
+                "compression_ratio": segment.get("compression_ratio")
+            }
+            for segment in result.get("segments", [])
+        ]
     
     def transcribe_file(self, file_path: str, language: str = None):
         """
@@ -44,8 +270,8 @@ class SpeechToText:
         Args:
             file_path (str): Path to audio file
             language (str): Target language for transcription
-            
+        
         Returns:
             str: Transcribed text
         """
-        pass
\ No newline at end of file
+        return self.transcribe_audio(file_path, language=language)
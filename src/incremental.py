@@ -0,0 +1,398 @@
+"""
+Incremental Processing
+
+Re-processes growing (append-only) recordings by transcribing only the new tail.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.logger import get_logger
+from src.utils.metrics import StageTimer, get_registry
+from src.utils.resources import RSSMonitor
+
+logger = get_logger(__name__)
+
+# Length of the audio blocks whose hashes identify a recording's prefix
+BLOCK_SECONDS = 10.0
+
+# Segments ending this close to the end of the audio may still change as the
+# recording grows, so they are re-transcribed on the next update
+HOLDBACK_SECONDS = 5.0
+
+STATE_VERSION = 2
+
+# Settings the saved segments and chunk summaries were produced with; a change
+# to any of them invalidates the state
+STATE_SETTINGS = (
+    ("models", "whisper_model_size"),
+    ("models", "summarizer_model"),
+    ("processing", "normalize_transcript"),
+    ("processing", "extractive_ratio"),
+    ("processing", "extractive_max_tokens"),
+    ("processing", "extractive_min_tokens"),
+    ("processing", "extractive_method")
+)
+
+
+class IncrementalStateStore:
+    """
+    One JSON state file per source id, replaced atomically on every update.
+    """
+    
+    def __init__(self, state_dir: str):
+        """
+        Initialize the store.
+        
+        Args:
+            state_dir (str): Directory for state files
+        """
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, source_id: str) -> Path:
+        digest = hashlib.sha256(source_id.encode("utf-8")).hexdigest()[:32]
+        return self.state_dir / f"{digest}.json"
+    
+    def load(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the saved state for a source.
+        
+        Args:
+            source_id (str): Stable identifier of the recording
+        
+        Returns:
+            Optional[Dict[str, Any]]: Saved state, or None if there is none
+        """
+        path = self._path(source_id)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION or state.get("source_id") != source_id:
+            return None
+        return state
+    
+    def save(self, source_id: str, state: Dict[str, Any]):
+        """
+        Save the state for a source.
+        
+        Args:
+            source_id (str): Stable identifier of the recording
+            state (Dict[str, Any]): State to save
+        """
+        path = self._path(source_id)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    
+    def delete(self, source_id: str):
+        """Forget a source."""
+        self._path(source_id).unlink(missing_ok=True)
+
+
+class IncrementalProcessor:
+    """
+    Processes successive versions of an append-only recording.
+    
+    The state kept per source holds the transcript segments that can no
+    longer change, map summaries of complete transcript chunks and scored
+    topic windows. An update checks that the file still starts with the
+    audio seen before by hashing its first and last known blocks, decodes
+    only the audio after the last stable segment, and re-runs the models
+    on that tail. Everything up to there is reused from the state. If the
+    check fails, or a setting in ``STATE_SETTINGS`` changed since the state
+    was saved, the file is processed from scratch.
+    """
+    
+    def __init__(self, pipeline, state_dir: str):
+        """
+        Initialize the processor.
+        
+        Args:
+            pipeline (AudioProcessingPipeline): Pipeline providing components and result handling
+            state_dir (str): Directory for per-source state
+        """
+        self.pipeline = pipeline
+        self.store = IncrementalStateStore(state_dir)
+    
+    def process(self, file_path: str, source_id: str, output_path: str = None) -> Dict[str, Any]:
+        """
+        Process the latest version of a recording.
+        
+        Args:
+            file_path (str): Path to the current audio file
+            source_id (str): Stable identifier of the recording
+            output_path (str): Optional output file path
+        
+        Returns:
+            Dict[str, Any]: Processing results for the whole recording, with an
+                ``incremental`` entry describing how much was reused
+        """
+        pipeline = self.pipeline
+        start_time = time.time()
+        stages = StageTimer(track_memory=True)
+        
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+        
+        if not pipeline._models_loaded:
+            with stages.stage("model_load"):
+                pipeline.load_models()
+        
+        results = pipeline._new_results(file_path)
+        
+        try:
+            with RSSMonitor() as monitor:
+                with stages.stage("verify"):
+                    state = self.store.load(source_id)
+                    reset = state is None or not self._extends(file_path, state)
+                    if reset:
+                        state = self._new_state(source_id)
+                
+                resume_at = state["resume_at"]
+                tail_duration = self._transcribe_tail(state, file_path, stages)
+                total_duration = resume_at + tail_duration
+                
+                segments = state["segments"] + state.pop("provisional")
+                results["transcript"] = " ".join(s["text"] for s in segments if s["text"]).strip()
+                results["segments"] = segments
+                
+                self._summarize(state, segments, results, stages)
+                self._classify(state, segments, results, stages)
+                
+                with stages.stage("verify"):
+                    self._record_blocks(state, file_path, total_duration)
+                self.store.save(source_id, state)
+            
+            results["incremental"] = {
+                "source_id": source_id,
+                "reset": reset,
+                "reused_seconds": 0.0 if reset else resume_at,
+                "new_seconds": tail_duration
+            }
+            pipeline._complete(results, stages, total_duration, time.time() - start_time,
+                               monitor.peak_bytes, output_path)
+            
+            registry = get_registry()
+            registry.inc("incremental_updates_total", labels={"reset": str(reset).lower()},
+                         help_text="Incremental updates by whether the prefix had to be redone")
+            registry.inc("incremental_reused_audio_seconds_total", results["incremental"]["reused_seconds"],
+                         help_text="Audio seconds reused from earlier incremental updates")
+        
+        except Exception as e:
+            pipeline._fail(results, e)
+            raise
+        
+        return results
+    
+    def _new_state(self, source_id: str) -> Dict[str, Any]:
+        pipeline = self.pipeline
+        return {
+            "version": STATE_VERSION,
+            "source_id": source_id,
+            "settings": self._settings(),
+            "labels": list(pipeline.classifier.predefined_topics),
+            "block_hashes": {},
+            "duration": 0.0,
+            "resume_at": 0.0,
+            "segments": [],
+            "provisional": [],
+            "summary_chunks": [],
+            "summarized_segments": 0,
+            "topic_windows": [],
+            "windowed_segments": 0
+        }
+    
+    def _settings(self) -> Dict[str, Any]:
+        config = self.pipeline.config
+        return {f"{section}.{name}": getattr(getattr(config, section), name)
+                for section, name in STATE_SETTINGS}
+    
+    def _block_hash(self, file_path: str, index: int, seconds: float) -> Optional[str]:
+        audio, _ = self.pipeline.audio_handler.load_audio_file(
+            file_path, start=index * BLOCK_SECONDS, duration=seconds
+        )
+        if len(audio) == 0:
+            return None
+        return hashlib.sha256(audio.tobytes()).hexdigest()
+    
+    def _extends(self, file_path: str, state: Dict[str, Any]) -> bool:
+        """Whether the file starts with the audio the state was built from."""
+        changed = [key for key, value in self._settings().items() if state["settings"].get(key) != value]
+        if changed:
+            logger.info(f"🔁 {', '.join(changed)} changed; reprocessing from the start")
+            return False
+        
+        if not state["block_hashes"]:
+            return False
+        for index, block in state["block_hashes"].items():
+            if self._block_hash(file_path, int(index), block["seconds"]) != block["hash"]:
+                logger.info(f"🔁 {file_path} does not extend the recording seen before; "
+                            f"reprocessing from the start")
+                return False
+        return True
+    
+    def _record_blocks(self, state: Dict[str, Any], file_path: str, duration: float):
+        """
+        Hash the first and last complete blocks so the next update can verify the prefix.
+        
+        The first block is hashed even when the recording is shorter than a
+        block, over the length the recording has.
+        """
+        blocks = {0: round(min(duration, BLOCK_SECONDS), 3)}
+        if duration >= 2 * BLOCK_SECONDS:
+            blocks[int(duration // BLOCK_SECONDS) - 1] = BLOCK_SECONDS
+        state["block_hashes"] = {
+            str(index): {"seconds": seconds, "hash": self._block_hash(file_path, index, seconds)}
+            for index, seconds in blocks.items()
+        }
+        state["duration"] = duration
+    
+    def _transcribe_tail(self, state: Dict[str, Any], file_path: str, stages: StageTimer) -> float:
+        """
+        Transcribe the audio after the last stable segment.
+        
+        Returns:
+            float: Seconds of audio decoded from ``resume_at`` to the end
+        """
+        pipeline = self.pipeline
+        resume_at = state["resume_at"]
+        
+        with stages.stage("decode"):
+            audio, sample_rate = pipeline.audio_handler.load_audio_file(file_path, start=resume_at)
+        tail_duration = len(audio) / sample_rate
+        end = resume_at + tail_duration
+        
+        logger.info(f"🎤 Transcribing {tail_duration:.1f}s of new audio from {resume_at:.1f}s...")
+        with pipeline._model_stage(stages, "asr", pipeline.speech_to_text):
+            transcription = pipeline.speech_to_text.transcribe_segments(audio)
+        
+        stable, provisional = [], []
+        for segment in transcription["segments"]:
+            segment = dict(segment, start=segment["start"] + resume_at, end=segment["end"] + resume_at)
+            (stable if segment["end"] <= end - HOLDBACK_SECONDS else provisional).append(segment)
+        
+        state["segments"].extend(stable)
+        state["provisional"] = provisional
+        if stable:
+            state["resume_at"] = stable[-1]["end"]
+        return tail_duration
+    
+    def _summarize(self, state: Dict[str, Any], segments: List[Dict], results: Dict[str, Any],
+                   stages: StageTimer):
+        """
+        Summarize from cached chunk summaries plus the chunks that changed.
+        
+        Complete chunks of stable segments are summarized once and kept; the
+        trailing partial chunk and the provisional segments are summarized on
+        every update.
+        """
+        from src.text_processing.summarizer import MAX_CHUNK_LENGTH, MIN_TEXT_LENGTH
+        
+        pipeline = self.pipeline
+        processing = pipeline.config.processing
+        summarizer = pipeline.summarizer
+        
+        if len(results["transcript"]) <= MAX_CHUNK_LENGTH:
+            with pipeline._model_stage(stages, "summarize", summarizer):
+                results["summary"] = summarizer.summarize_text(
+                    results["transcript"],
+                    max_length=processing.max_summary_length,
+                    min_length=processing.min_summary_length
+                )
+            return
+        
+        stable_count = len(state["segments"])
+        groups = _group_segments(segments[state["summarized_segments"]:], MAX_CHUNK_LENGTH, len)
+        
+        # Groups made only of stable segments, except the last one, will not change any more
+        offset = state["summarized_segments"]
+        complete = []
+        for group in groups[:-1]:
+            if offset + len(group) > stable_count:
+                break
+            complete.append(group)
+            offset += len(group)
+        live = groups[len(complete):]
+        
+        texts = [" ".join(s["text"] for s in group) for group in complete + live]
+        if summarizer.normalize:
+            texts = [summarizer.preprocess_text(text) for text in texts]
+        keep = [len(text.strip()) > MIN_TEXT_LENGTH for text in texts]
+        
+        with pipeline._model_stage(stages, "summarize", summarizer):
+            new_summaries = iter(summarizer.summarize_chunks([t for t, k in zip(texts, keep) if k]))
+            fresh = [next(new_summaries) if k else None for k in keep]
+            
+            state["summary_chunks"].extend(s for s in fresh[:len(complete)] if s is not None)
+            state["summarized_segments"] = offset
+            
+            summaries = state["summary_chunks"] + [s for s in fresh[len(complete):] if s is not None]
+            results["summary"] = summarizer.reduce_summaries(
+                summaries,
+                max_length=processing.max_summary_length,
+                min_length=processing.min_summary_length
+            ) if summaries else "Content too short for summarization"
+    
+    def _classify(self, state: Dict[str, Any], segments: List[Dict], results: Dict[str, Any],
+                  stages: StageTimer):
+        """Classify only windows that are not in the state yet and aggregate all of them."""
+        pipeline = self.pipeline
+        classifier = pipeline.classifier
+        
+        labels = list(classifier.predefined_topics)
+        if labels != state["labels"]:
+            state.update(labels=labels, topic_windows=[], windowed_segments=0)
+        
+        stable_count = len(state["segments"])
+        groups = _group_segments(segments[state["windowed_segments"]:], classifier.window_tokens,
+                                 lambda text: len(text.split()))
+        
+        offset = state["windowed_segments"]
+        complete = []
+        for group in groups[:-1]:
+            if offset + len(group) > stable_count:
+                break
+            complete.append(group)
+            offset += len(group)
+        live = groups[len(complete):]
+        
+        with pipeline._model_stage(stages, "classify", classifier):
+            scored_complete = classifier.score_windows(
+                [window for group in complete for window in classifier.build_windows(group)]
+            )
+            scored_live = classifier.score_windows(
+                [window for group in live for window in classifier.build_windows(group)]
+            )
+        
+        state["topic_windows"].extend(scored_complete)
+        state["windowed_segments"] = offset
+        
+        topic = classifier.combine_windows(state["topic_windows"] + scored_live)
+        results["topic_timeline"] = topic.pop("timeline")
+        results["topic"] = topic
+
+
+def _group_segments(segments: List[Dict], limit: int, measure) -> List[List[Dict]]:
+    """
+    Greedily group consecutive segments so each group's text measures at most ``limit``.
+    
+    A segment that alone exceeds the limit forms its own group.
+    """
+    groups, current, size = [], [], 0
+    for segment in segments:
+        length = measure(segment["text"])
+        if current and size + length > limit:
+            groups.append(current)
+            current, size = [], 0
+        current.append(segment)
+        size += length + 1
+    if current:
+        groups.append(current)
+    return groups
@@ -0,0 +1,264 @@
+"""
+Model Bundle
+
+Single-file archives of the model cache for provisioning nodes without network access.
+
+A bundle is an uncompressed tar archive (model weights do not compress)
+whose first member is a manifest listing every file with its size and
+SHA-256 digest, plus the model configuration it was packed for. Files are
+read at their offsets inside the archive, so verifying and unpacking hash
+many files in parallel and stream each one in fixed-size chunks: the time
+to provision a node is bounded by disk bandwidth, not by one core or by
+memory.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional
+
+# Name of the manifest inside a bundle
+MANIFEST_NAME = "manifest.json"
+
+# Copy of the manifest kept in the cache directory after unpacking
+INSTALLED_MANIFEST = "bundle-manifest.json"
+
+BUNDLE_VERSION = 1
+
+# Bytes read per step while hashing or copying
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def default_workers() -> int:
+    """Files hashed at once: enough to keep fast disks busy, hashlib releases the GIL."""
+    return min(8, os.cpu_count() or 1)
+
+
+def _stream(source, size: int, sink=None) -> str:
+    """Hash ``size`` bytes read from ``source`` in chunks, copying them to ``sink`` if given."""
+    digest = hashlib.sha256()
+    remaining = size
+    while remaining:
+        chunk = source.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise ValueError(f"truncated: {remaining} of {size} bytes missing")
+        digest.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+        remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def hash_file(path: str) -> Dict[str, Any]:
+    """
+    Hash a file in chunks.
+    
+    Args:
+        path (str): File to hash
+    
+    Returns:
+        Dict[str, Any]: ``size`` in bytes and ``sha256`` hex digest
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return {"size": size, "sha256": _stream(f, size)}
+
+
+def _safe_relative(name: str) -> str:
+    """Reject archive paths that would escape the target directory."""
+    path = PurePosixPath(name)
+    if path.is_absolute() or ".." in path.parts or not path.parts:
+        raise ValueError(f"unsafe path in bundle: {name}")
+    return str(path)
+
+
+def pack(root: str, files: List[str], output_path: str, models: Dict[str, Any] = None,
+         workers: int = None) -> Dict[str, Any]:
+    """
+    Write files below a directory into a bundle.
+    
+    Args:
+        root (str): Directory the files are relative to (the model cache)
+        files (List[str]): Relative paths of the files to include
+        output_path (str): Bundle file to write
+        models (Dict[str, Any]): Model configuration stored in the manifest
+        workers (int): Files hashed in parallel
+    
+    Returns:
+        Dict[str, Any]: The manifest
+    """
+    root_path = Path(root)
+    files = sorted({_safe_relative(Path(name).as_posix()) for name in files})
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        hashes = list(pool.map(lambda name: hash_file(str(root_path / name)), files))
+    
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "models": models or {},
+        "files": [dict(path=name, **info) for name, info in zip(files, hashes)]
+    }
+    payload = json.dumps(manifest, indent=2).encode("utf-8")
+    
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    with tarfile.open(tmp, "w", format=tarfile.PAX_FORMAT) as tar:
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(payload)
+        info.mtime = int(time.time())
+        tar.addfile(info, io.BytesIO(payload))
+        for name in files:
+            tar.add(str(root_path / name), arcname=name, recursive=False)
+    os.replace(tmp, output)
+    return manifest
+
+
+def read_manifest(bundle_path: str) -> Dict[str, Any]:
+    """
+    Read a bundle's manifest without reading the files.
+    
+    Args:
+        bundle_path (str): Bundle file
+    
+    Returns:
+        Dict[str, Any]: The manifest
+    """
+    with tarfile.open(bundle_path, "r:") as tar:
+        member = tar.next()
+        if member is None or member.name != MANIFEST_NAME:
+            raise ValueError(f"{bundle_path} is not a model bundle (no leading {MANIFEST_NAME})")
+        manifest = json.loads(tar.extractfile(member).read().decode("utf-8"))
+    if manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle version: {manifest.get('version')}")
+    return manifest
+
+
+def _members(bundle_path: str, manifest: Dict[str, Any]) -> Dict[str, tarfile.TarInfo]:
+    """Locate every manifest file inside the archive."""
+    with tarfile.open(bundle_path, "r:") as tar:
+        members = {member.name: member for member in tar.getmembers() if member.isfile()}
+    missing = [entry["path"] for entry in manifest["files"] if entry["path"] not in members]
+    if missing:
+        raise ValueError(f"Bundle is missing {len(missing)} file(s), e.g. {missing[0]}")
+    return members
+
+
+def _run_parallel(task, entries: List[Dict[str, Any]], workers: Optional[int]) -> Dict[str, Any]:
+    """Apply ``task`` to every manifest entry in parallel and collect failures."""
+    start = time.perf_counter()
+    failures = []
+    
+    def run(entry):
+        try:
+            task(entry)
+        except (OSError, ValueError) as e:
+            failures.append({"path": entry["path"], "error": str(e)})
+    
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        # Largest files first so one big file does not start last and run alone
+        list(pool.map(run, sorted(entries, key=lambda entry: -entry["size"])))
+    
+    elapsed = time.perf_counter() - start
+    total = sum(entry["size"] for entry in entries)
+    return {
+        "files": len(entries),
+        "bytes": total,
+        "seconds": elapsed,
+        "mb_per_second": total / 1e6 / elapsed if elapsed > 0 else 0.0,
+        "failures": sorted(failures, key=lambda failure: failure["path"])
+    }
+
+
+def verify(path: str, workers: int = None) -> Dict[str, Any]:
+    """
+    Check every file of a bundle, or of an unpacked model cache, against its manifest.
+    
+    Args:
+        path (str): Bundle file, or a cache directory a bundle was unpacked into
+        workers (int): Files hashed in parallel
+    
+    Returns:
+        Dict[str, Any]: ``files``, ``bytes``, ``seconds``, ``mb_per_second``
+            and ``failures`` (``path`` and ``error`` per bad file)
+    """
+    if os.path.isdir(path):
+        manifest_path = Path(path) / INSTALLED_MANIFEST
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No {INSTALLED_MANIFEST} in {path}; unpack a bundle first")
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        
+        def check(entry):
+            actual = hash_file(str(Path(path) / _safe_relative(entry["path"])))
+            if actual != {"size": entry["size"], "sha256": entry["sha256"]}:
+                raise ValueError("size or checksum does not match the manifest")
+        
+        return _run_parallel(check, manifest["files"], workers)
+    
+    manifest = read_manifest(path)
+    members = _members(path, manifest)
+    
+    def check_member(entry):
+        member = members[entry["path"]]
+        if member.size != entry["size"]:
+            raise ValueError(f"size {member.size} does not match the manifest ({entry['size']})")
+        with open(path, "rb") as f:
+            f.seek(member.offset_data)
+            if _stream(f, member.size) != entry["sha256"]:
+                raise ValueError("checksum does not match the manifest")
+    
+    return _run_parallel(check_member, manifest["files"], workers)
+
+
+def unpack(bundle_path: str, root: str, workers: int = None) -> Dict[str, Any]:
+    """
+    Extract a bundle into a directory, verifying each file as it is written.
+    
+    Files are written next to their destination and only renamed into place
+    once their checksum matches, so an interrupted or corrupt unpack never
+    leaves a partial model where a loader could pick it up. The manifest is
+    stored as ``bundle-manifest.json`` once every file is in place.
+    
+    Args:
+        bundle_path (str): Bundle file
+        root (str): Directory to extract into (the model cache)
+        workers (int): Files extracted in parallel
+    
+    Returns:
+        Dict[str, Any]: Report as returned by ``verify``, plus the ``manifest``
+    """
+    manifest = read_manifest(bundle_path)
+    members = _members(bundle_path, manifest)
+    root_path = Path(root)
+    
+    def extract(entry):
+        member = members[entry["path"]]
+        target = root_path / _safe_relative(entry["path"])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.{os.getpid()}.partial")
+        try:
+            with open(bundle_path, "rb") as source, open(partial, "wb") as sink:
+                source.seek(member.offset_data)
+                digest = _stream(source, member.size, sink)
+                if member.size != entry["size"] or digest != entry["sha256"]:
+                    raise ValueError("checksum does not match the manifest")
+                sink.flush()
+                os.fsync(sink.fileno())
+            os.replace(partial, target)
+        finally:
+            if partial.exists():
+                partial.unlink()
+    
+    report = _run_parallel(extract, manifest["files"], workers)
+    if not report["failures"]:
+        installed = root_path / INSTALLED_MANIFEST
+        tmp = installed.with_name(f".{installed.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, installed)
+    report["manifest"] = manifest
+    return report
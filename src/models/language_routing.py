@@ -0,0 +1,113 @@
+"""
+Language Routing
+
+Picks English-only or multilingual models per file from its spoken language.
+
+Whisper's ``.en`` checkpoints are more accurate on English than the
+multilingual ones of the same size and skip language detection, so
+English audio is routed to them; other languages keep the multilingual
+checkpoints. The language is detected once from the first 30 s (or taken
+from a hint) and passed on to Whisper, so it is not detected again while
+transcribing. Summarization and classification are skipped for languages
+their models were not trained on, instead of producing confident nonsense.
+"""
+
+from typing import Any, Dict, FrozenSet, Optional
+
+# Sizes that have an English-only checkpoint (``large`` and ``turbo`` do not)
+ENGLISH_ONLY_SIZES = ("tiny", "base", "small", "medium")
+
+
+def english_variant(model_size: str) -> str:
+    """
+    Get the English-only checkpoint of a Whisper size.
+    
+    Args:
+        model_size (str): Whisper size, with or without ``.en``
+    
+    Returns:
+        str: ``<size>.en``, or the size itself if it has no English-only checkpoint
+    """
+    base = multilingual_variant(model_size)
+    return f"{base}.en" if base in ENGLISH_ONLY_SIZES else base
+
+
+def multilingual_variant(model_size: str) -> str:
+    """
+    Get the multilingual checkpoint of a Whisper size.
+    
+    Args:
+        model_size (str): Whisper size, with or without ``.en``
+    
+    Returns:
+        str: The size without ``.en``
+    """
+    return model_size[:-3] if model_size.endswith(".en") else model_size
+
+
+def parse_languages(spec: str) -> Optional[FrozenSet[str]]:
+    """
+    Parse a comma-separated list of language codes.
+    
+    Args:
+        spec (str): Codes such as ``en,de``, or ``*`` for every language
+    
+    Returns:
+        Optional[FrozenSet[str]]: The codes (None = every language)
+    """
+    codes = frozenset(code.strip().lower() for code in spec.split(",") if code.strip())
+    return None if "*" in codes else codes
+
+
+class LanguageRouter:
+    """
+    Decides the Whisper checkpoints and the text stages for a file's language.
+    """
+    
+    def __init__(self, summarizer_languages: str = "en", classifier_languages: str = "en",
+                 min_probability: float = 0.5):
+        """
+        Initialize the router.
+        
+        Args:
+            summarizer_languages (str): Languages the summarizer supports (``*`` = all)
+            classifier_languages (str): Languages the topic classifier supports (``*`` = all)
+            min_probability (float): Detections less likely than this are treated as
+                unknown: multilingual models, and Whisper detects the language itself
+        """
+        self.summarizer_languages = parse_languages(summarizer_languages)
+        self.classifier_languages = parse_languages(classifier_languages)
+        self.min_probability = min_probability
+    
+    def route(self, language: str, probability: Optional[float], model_size: str,
+              first_pass_size: str = None) -> Dict[str, Any]:
+        """
+        Route a file.
+        
+        Args:
+            language (str): Detected or hinted language code
+            probability (Optional[float]): Detection probability (None for a hint)
+            model_size (str): Whisper size that would be used otherwise
+            first_pass_size (str): Cascade first-pass size that would be used otherwise
+        
+        Returns:
+            Dict[str, Any]: ``language`` (None when unsure), ``probability``,
+                ``whisper_model_size``, ``first_pass_size``, whether to
+                ``summarize`` and ``classify``, and the ``skipped`` stages
+        """
+        language = (language or "").lower()
+        known = bool(language) and (probability is None or probability >= self.min_probability)
+        variant = english_variant if known and language == "en" else multilingual_variant
+        
+        # An unknown language is no reason to skip: the text models may still cope
+        summarize = not known or self.summarizer_languages is None or language in self.summarizer_languages
+        classify = not known or self.classifier_languages is None or language in self.classifier_languages
+        return {
+            "language": language if known else None,
+            "probability": probability,
+            "whisper_model_size": variant(model_size),
+            "first_pass_size": variant(first_pass_size) if first_pass_size else None,
+            "summarize": summarize,
+            "classify": classify,
+            "skipped": [stage for stage, run in (("summarize", summarize), ("classify", classify)) if not run]
+        }
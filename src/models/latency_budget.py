@@ -0,0 +1,343 @@
+"""
+Latency Budget
+
+Picks, per file, the largest model configuration predicted to finish before its deadline.
+
+Predictions multiply the file's duration by real-time factors (RTF) for
+the Whisper size, the summarizer model and the remaining stages, plus the
+load time of models that are not resident. The factors and load times are
+measured on this machine, by a calibration run or from the stage timings
+of every processed file, and kept per hardware in a small JSON profile.
+Configurations that have not been measured yet use rough CPU priors until
+they have been.
+"""
+
+import atexit
+import json
+import os
+import platform
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_VERSION = 1
+
+# Rough CPU real-time factors for configurations that have not been measured
+DEFAULT_ASR_RTF = {"tiny": 0.06, "base": 0.12, "small": 0.35, "medium": 1.0, "large": 2.0, "turbo": 0.5}
+DEFAULT_SUMMARIZE_RTF = 0.05
+DEFAULT_OTHER_RTF = 0.03
+
+# Rough CPU load times (seconds) for models whose load has not been measured
+DEFAULT_WHISPER_LOAD_SECONDS = {"tiny": 1.0, "base": 2.0, "small": 5.0, "medium": 12.0, "large": 25.0,
+                                "turbo": 12.0}
+DEFAULT_MODEL_LOAD_SECONDS = 10.0
+
+# Seconds between saves of a profile that has new measurements (it is also saved on exit)
+SAVE_INTERVAL = 30.0
+
+# Weight of the newest measurement in a profile's moving average
+SMOOTHING = 0.3
+
+# Stages not counted in ``other``: predicted on their own, one-off, or queueing
+_SEPARATE_STAGES = {"asr", "summarize", "model_load", "select", "language", "admission"}
+
+
+def hardware_key(device: str = "cpu") -> str:
+    """
+    Identify the hardware a profile was measured on.
+    
+    Args:
+        device (str): Resolved device the models run on
+    
+    Returns:
+        str: CPU model, core count and device
+    """
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return f"{cpu} x{os.cpu_count() or 1} {device}"
+
+
+def _default_rtf(stage: str, variant: str) -> float:
+    if stage == "asr":
+        # tiny.en, large-v3 and the like run as fast as their base size
+        base = re.sub(r"(\.en|-v\d+)$", "", variant)
+        return DEFAULT_ASR_RTF.get(base, DEFAULT_ASR_RTF["large"])
+    if stage == "summarize":
+        return DEFAULT_SUMMARIZE_RTF
+    return DEFAULT_OTHER_RTF
+
+
+def _default_load_seconds(key: str) -> float:
+    kind, _, name = key.partition(":")
+    if kind == "whisper":
+        base = re.sub(r"(\.en|-v\d+)$", "", name)
+        return DEFAULT_WHISPER_LOAD_SECONDS.get(base, DEFAULT_WHISPER_LOAD_SECONDS["large"])
+    return DEFAULT_MODEL_LOAD_SECONDS
+
+
+class LatencyProfile:
+    """
+    Measured real-time factors per stage and model variant, for one machine.
+    
+    Profiles of other machines in the same file are kept but never used.
+    """
+    
+    def __init__(self, path: str = None, hardware: str = None):
+        """
+        Load the profile.
+        
+        Args:
+            path (str): JSON profile file (None = keep measurements in memory only)
+            hardware (str): Hardware key (defaults to ``hardware_key()``)
+        """
+        self.path = Path(path) if path else None
+        self.hardware = hardware or hardware_key()
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Any] = {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        if self.path is not None:
+            atexit.register(self.save_if_dirty)
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == PROFILE_VERSION:
+                    self._profiles = data.get("profiles", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable latency profile {self.path}: {e}")
+    
+    @property
+    def entries(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Measurements for this machine: ``{stage: {variant: {"rtf", "samples"}}}``.
+        
+        ``model_load`` entries are keyed by model cache key and hold ``seconds``
+        instead of ``rtf``.
+        """
+        return self._profiles.setdefault(self.hardware, {})
+    
+    def rtf(self, stage: str, variant: str) -> Tuple[float, bool]:
+        """
+        Get the real-time factor of a stage run with a model variant.
+        
+        Args:
+            stage (str): ``asr``, ``summarize`` or ``other``
+            variant (str): Whisper size, summarizer model name (``default`` for ``other``)
+        
+        Returns:
+            Tuple[float, bool]: The factor and whether it was measured here
+        """
+        with self._lock:
+            entry = self.entries.get(stage, {}).get(variant)
+        if entry is None:
+            return _default_rtf(stage, variant), False
+        return entry["rtf"], True
+    
+    def observe(self, stage: str, variant: str, seconds: float, audio_seconds: float):
+        """
+        Add a measured stage time to the moving average.
+        
+        Args:
+            stage (str): ``asr``, ``summarize`` or ``other``
+            variant (str): Model variant the stage ran with
+            seconds (float): Wall time of the stage
+            audio_seconds (float): Duration of the audio it processed
+        """
+        if audio_seconds <= 0:
+            return
+        rtf = seconds / audio_seconds
+        with self._lock:
+            entry = self.entries.setdefault(stage, {}).get(variant)
+            if entry is None:
+                entry = {"rtf": rtf, "samples": 0}
+            else:
+                entry = {"rtf": (1 - SMOOTHING) * entry["rtf"] + SMOOTHING * rtf, "samples": entry["samples"]}
+            entry["samples"] += 1
+            self.entries[stage][variant] = entry
+            self._dirty = True
+    
+    def load_seconds(self, key: str) -> Tuple[float, bool]:
+        """
+        Get the time it takes to load a model.
+        
+        Args:
+            key (str): Model cache key, ``<type>:<name>`` (e.g. ``whisper:base``)
+        
+        Returns:
+            Tuple[float, bool]: Seconds and whether they were measured here
+        """
+        with self._lock:
+            entry = self.entries.get("model_load", {}).get(key)
+        if entry is None:
+            return _default_load_seconds(key), False
+        return entry["seconds"], True
+    
+    def observe_load(self, key: str, seconds: float):
+        """
+        Add a measured model load to the moving average.
+        
+        Args:
+            key (str): Model cache key, ``<type>:<name>``
+            seconds (float): Wall time of the load
+        """
+        with self._lock:
+            entry = self.entries.setdefault("model_load", {}).get(key)
+            if entry is None:
+                entry = {"seconds": seconds, "samples": 0}
+            else:
+                entry = {"seconds": (1 - SMOOTHING) * entry["seconds"] + SMOOTHING * seconds,
+                         "samples": entry["samples"]}
+            entry["samples"] += 1
+            self.entries["model_load"][key] = entry
+            self._dirty = True
+    
+    def observe_stages(self, stages: Dict[str, Dict[str, float]], audio_seconds: float,
+                       model_size: str, summarizer_model: str):
+        """
+        Add the stage timings of one processed file.
+        
+        Args:
+            stages (Dict[str, Dict[str, float]]): Per-stage ``wall_time`` entries
+            audio_seconds (float): Duration of the file
+            model_size (str): Whisper size that transcribed it
+            summarizer_model (str): Summarizer that summarized it
+        """
+        if "asr" in stages:
+            self.observe("asr", model_size, stages["asr"]["wall_time"], audio_seconds)
+        if "summarize" in stages:
+            self.observe("summarize", summarizer_model, stages["summarize"]["wall_time"], audio_seconds)
+        other = sum(entry["wall_time"] for name, entry in stages.items() if name not in _SEPARATE_STAGES)
+        self.observe("other", "default", other, audio_seconds)
+    
+    def save_if_due(self, interval: float = SAVE_INTERVAL):
+        """
+        Save new measurements if the last save is at least ``interval`` seconds old.
+        
+        Processing calls this after every file, so a busy run writes the
+        profile every ``interval`` seconds instead of once per file.
+        """
+        if time.monotonic() - self._saved_at >= interval:
+            self.save_if_dirty()
+    
+    def save_if_dirty(self):
+        """Save the profile if it has measurements that are not on disk yet."""
+        if self._dirty:
+            self.save()
+    
+    def save(self):
+        """Write the profile atomically (no-op without a path)."""
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps({"version": PROFILE_VERSION, "profiles": self._profiles}, indent=2)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class LatencyBudgetSelector:
+    """
+    Chooses the Whisper size and summarizer for a file from its duration and deadline.
+    
+    Whisper sizes matter most for quality, so the largest size that fits is
+    chosen first and then the largest summarizer that still fits with it.
+    """
+    
+    def __init__(self, profile: LatencyProfile, model_sizes: List[str],
+                 summarizers: List[str], headroom: float = 0.9,
+                 is_loaded: Callable[[str], bool] = None):
+        """
+        Initialize the selector.
+        
+        Args:
+            profile (LatencyProfile): Measured real-time factors
+            model_sizes (List[str]): Candidate Whisper sizes, smallest first
+            summarizers (List[str]): Candidate summarizer models, smallest first
+            headroom (float): Fraction of the remaining budget predictions may use
+            is_loaded (Callable[[str], bool]): Whether a model (by cache key, e.g.
+                ``whisper:base``) is resident; others are charged their load time
+                (None = every model is resident)
+        """
+        if not model_sizes or not summarizers:
+            raise ValueError("A latency budget needs at least one Whisper size and one summarizer")
+        self.profile = profile
+        self.model_sizes = list(model_sizes)
+        self.summarizers = list(summarizers)
+        self.headroom = headroom
+        self.is_loaded = is_loaded
+    
+    def predict(self, audio_seconds: float, model_size: str, summarizer_model: str) -> Tuple[float, bool]:
+        """
+        Predict the processing time of a configuration, model loads included.
+        
+        Args:
+            audio_seconds (float): Duration of the file
+            model_size (str): Whisper size
+            summarizer_model (str): Summarizer model
+        
+        Returns:
+            Tuple[float, bool]: Seconds, and whether every factor was measured here
+        """
+        factors = [
+            self.profile.rtf("asr", model_size),
+            self.profile.rtf("summarize", summarizer_model),
+            self.profile.rtf("other", "default")
+        ]
+        loads = []
+        if self.is_loaded is not None:
+            loads = [self.profile.load_seconds(key)
+                     for key in (f"whisper:{model_size}", f"summarizer:{summarizer_model}")
+                     if not self.is_loaded(key)]
+        seconds = audio_seconds * sum(rtf for rtf, _ in factors) + sum(load for load, _ in loads)
+        return seconds, all(measured for _, measured in factors + loads)
+    
+    def select(self, audio_seconds: float, budget_seconds: float) -> Dict[str, Any]:
+        """
+        Pick the largest configuration predicted to finish within the budget.
+        
+        Args:
+            audio_seconds (float): Duration of the file
+            budget_seconds (float): Time left until the deadline
+        
+        Returns:
+            Dict[str, Any]: ``whisper_model_size``, ``summarizer_model``,
+                ``predicted_seconds``, ``measured`` and ``fits`` (False when even
+                the smallest configuration is predicted to miss the deadline)
+        """
+        allowed = budget_seconds * self.headroom
+        for model_size in reversed(self.model_sizes):
+            for summarizer_model in reversed(self.summarizers):
+                predicted, measured = self.predict(audio_seconds, model_size, summarizer_model)
+                if predicted <= allowed:
+                    return self._choice(model_size, summarizer_model, predicted, measured, True)
+        
+        # Nothing fits: the smallest configuration misses the deadline by the least
+        predicted, measured = self.predict(audio_seconds, self.model_sizes[0], self.summarizers[0])
+        return self._choice(self.model_sizes[0], self.summarizers[0], predicted, measured, False)
+    
+    @staticmethod
+    def _choice(model_size: str, summarizer_model: str, predicted: float, measured: bool,
+                fits: bool) -> Dict[str, Any]:
+        return {
+            "whisper_model_size": model_size,
+            "summarizer_model": summarizer_model,
+            "predicted_seconds": predicted,
+            "measured": measured,
+            "fits": fits
+        }
@@ -4,15 +4,88 @@ Model Manager
 Centralized model loading and management system.
 """
 
+import ctypes
+import gc
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.models import bundle
+from src.models.weight_cache import WeightCache
+from src.utils.logger import get_logger
+from src.utils.resources import RSSMonitor, current_rss_bytes
+
+logger = get_logger(__name__)
+
+# Rough resident size of each model, used to make room before the first load.
+# After a model has been loaded once its measured size is used instead.
+MODEL_MEMORY_ESTIMATES_MB = {
+    "whisper:tiny": 200,
+    "whisper:base": 350,
+    "whisper:small": 1100,
+    "whisper:medium": 3200,
+    "whisper:large": 6500,
+    "summarizer:facebook/bart-large-cnn": 1800,
+    "classifier:facebook/bart-large-mnli": 1800,
+}
+
+
+def _release_memory():
+    """Collect garbage and hand freed heap pages back to the operating system."""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+    try:
+        # glibc keeps freed arenas mapped; trimming makes the drop visible in RSS
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
 
 class ModelManager:
     """
     Manages loading and caching of all ML models used in the pipeline.
+    
+    With a memory budget, models are kept in least-recently-used order and
+    the oldest ones are evicted whenever loading another model would push
+    the process RSS over the budget.
     """
     
-    def __init__(self):
-        """Initialize the model manager."""
-        self.loaded_models = {}
+    def __init__(self, memory_budget_mb: int = 0, cache_dir: str = None, device: str = "cpu",
+                 weights_dir: str = None, offline: bool = False):
+        """
+        Initialize the model manager.
+        
+        Args:
+            memory_budget_mb (int): Peak RSS budget in MB (0 = unlimited)
+            cache_dir (str): Model cache holding Whisper checkpoints and transformers models
+                saved for offline use (library download locations if None)
+            device (str): Resolved device to load models on (``cpu``, ``cuda``, ``mps``)
+            weights_dir (str): Directory for memory-mapped safetensors copies of the
+                checkpoints (None = deserialize the checkpoints on every load)
+            offline (bool): Only load models found in ``cache_dir``; never download
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.cache_dir = cache_dir
+        self.device = device
+        self.weight_cache = WeightCache(weights_dir) if weights_dir else None
+        self.offline = offline
+        if offline:
+            # Also stops transformers from checking the hub for newer files
+            os.environ["HF_HUB_OFFLINE"] = "1"
+            os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        self.loaded_models: "OrderedDict[str, Any]" = OrderedDict()
+        self.model_memory_mb: Dict[str, float] = {}
+        self.peak_rss_bytes = current_rss_bytes()
+        self.evictions = 0
+        # Called with the cache key and seconds after every actual load (e.g. a latency profile)
+        self.load_listener: Optional[Callable[[str, float], None]] = None
         self.model_configs = {
             "whisper": {
                 "default_size": "base",
@@ -38,7 +111,22 @@ class ModelManager:
         Returns:
             Loaded Whisper model
         """
-        pass
+        key = f"whisper:{model_size}"
+        
+        def loader():
+            model = self._load_mapped(key)
+            if model is None:
+                import whisper
+                checkpoint = self.whisper_checkpoint(model_size)
+                if self.offline and not (checkpoint and checkpoint.exists()):
+                    raise FileNotFoundError(f"Whisper {model_size} is not in {self.cache_dir} "
+                                            f"and offline mode does not download models")
+                root = str(checkpoint.parent) if checkpoint else None
+                model = whisper.load_model(model_size, device=self.device, download_root=root)
+                model = self._convert(key, model)
+            return model
+        
+        return self._load(key, loader)
     
     def load_summarizer_model(self, model_name: str = None):
         """
@@ -50,7 +138,9 @@ class ModelManager:
         Returns:
             Loaded model and tokenizer
         """
-        pass
+        model_name = model_name or self.model_configs["summarizer"]["default_model"]
+        key = f"summarizer:{model_name}"
+        return self._load(key, lambda: self._load_pipeline("summarization", key, model_name))
     
     def load_classifier_model(self, model_name: str = None):
         """
@@ -62,16 +152,285 @@ class ModelManager:
         Returns:
             Loaded classifier
         """
-        pass
+        model_name = model_name or self.model_configs["classifier"]["default_model"]
+        key = f"classifier:{model_name}"
+        return self._load(key, lambda: self._load_pipeline("zero-shot-classification", key, model_name))
+    
+    def _load_pipeline(self, task: str, key: str, model_name: str):
+        """Build a transformers pipeline, around memory-mapped weights when they are cached."""
+        from transformers import pipeline
+        
+        source = model_name
+        local_dir = self.local_model_dir(model_name)
+        if local_dir is not None and (local_dir / "config.json").exists():
+            source = str(local_dir)
+        elif self.offline:
+            raise FileNotFoundError(f"{model_name} is not in {self.cache_dir} "
+                                    f"and offline mode does not download models")
+        
+        model = self._load_mapped(key)
+        if model is None:
+            loaded = pipeline(task, model=source, device=self.device)
+            model = self._convert(key, loaded.model)
+            if model is loaded.model:
+                return loaded
+        return pipeline(task, model=model, tokenizer=source, device=self.device)
+    
+    def _load_mapped(self, key: str):
+        """Rebuild a model from its safetensors copy, or None if it has not been converted."""
+        if self.weight_cache is None:
+            return None
+        model = self.weight_cache.load(key)
+        if model is None:
+            return None
+        logger.info(f"Memory-mapped {key} from {self.weight_cache.path(key)}")
+        return model.to(self.device)
+    
+    def _convert(self, key: str, model):
+        """
+        Store a freshly loaded model in the weight cache.
+        
+        On the CPU the memory-mapped copy replaces the loaded one, so even
+        the converting process shares its weights with later workers.
+        """
+        if self.weight_cache is None:
+            return model
+        try:
+            path = self.weight_cache.save(key, model)
+        except Exception as e:
+            logger.warning(f"Could not convert {key} to safetensors: {e}")
+            return model
+        logger.info(f"Converted {key} to {path}")
+        
+        if self.device != "cpu":
+            return model
+        mapped = self._load_mapped(key)
+        return mapped if mapped is not None else model
+    
+    def _load(self, key: str, loader: Callable[[], Any]):
+        """
+        Return a cached model or load it, evicting others to stay within the budget.
+        
+        Args:
+            key (str): Cache key, ``<type>:<name>``
+            loader (Callable): Loads the model when it is not cached
+        
+        Returns:
+            The loaded model
+        """
+        if key in self.loaded_models:
+            self.loaded_models.move_to_end(key)
+            return self.loaded_models[key]
+        
+        expected_mb = self.model_memory_mb.get(key, MODEL_MEMORY_ESTIMATES_MB.get(key, 0))
+        self._make_room(expected_mb, keep=key)
+        
+        logger.info(f"Loading {key}...")
+        start = time.perf_counter()
+        with RSSMonitor() as monitor:
+            model = loader()
+        if self.load_listener is not None:
+            self.load_listener(key, time.perf_counter() - start)
+        
+        self.loaded_models[key] = model
+        self.model_memory_mb[key] = (monitor.end_bytes - monitor.start_bytes) / 1e6
+        self._track_peak(monitor.peak_bytes)
+        
+        # The estimate may have been too low: evict older models after the fact
+        self._make_room(0, keep=key)
+        return model
+    
+    def whisper_checkpoint(self, model_size: str) -> Optional[Path]:
+        """
+        Get where a Whisper checkpoint is stored in the model cache.
+        
+        Args:
+            model_size (str): Whisper model size
+        
+        Returns:
+            Optional[Path]: Checkpoint path (None without a cache directory)
+        """
+        if not self.cache_dir:
+            return None
+        import whisper
+        url = whisper._MODELS.get(model_size, model_size)
+        return Path(self.cache_dir) / "whisper" / os.path.basename(url)
+    
+    def local_model_dir(self, model_name: str) -> Optional[Path]:
+        """
+        Get where a transformers model is saved in the model cache for offline use.
+        
+        Args:
+            model_name (str): Hub model name
+        
+        Returns:
+            Optional[Path]: Model directory (None without a cache directory)
+        """
+        if not self.cache_dir:
+            return None
+        return Path(self.cache_dir) / "transformers" / model_name.replace("/", "--")
+    
+    def fetch_models(self, models_config) -> List[str]:
+        """
+        Download the configured models into the model cache.
+        
+        Whisper checkpoints are stored where ``whisper`` looks for them,
+        transformers models are saved with their tokenizers, and with a weight
+        cache inside ``cache_dir`` the safetensors copies are created too.
+        Needs network access unless everything is cached already.
+        
+        Args:
+            models_config (ModelConfig): Models to fetch
+        
+        Returns:
+            List[str]: Files of those models, relative to ``cache_dir``
+        """
+        if not self.cache_dir:
+            raise ValueError("A cache directory is required to fetch models")
+        root = Path(self.cache_dir)
+        files = []
+        
+        sizes = [models_config.whisper_model_size]
+        if models_config.cascade_first_pass_size:
+            sizes.append(models_config.cascade_first_pass_size)
+        for size in sizes:
+            key = f"whisper:{size}"
+            self.load_whisper_model(size)
+            self.unload_model(key)
+            files += [self.whisper_checkpoint(size)] + self._weight_files(key)
+        
+        for kind, task, model_name in (
+            ("summarizer", "summarization", models_config.summarizer_model),
+            ("classifier", "zero-shot-classification", models_config.classifier_model)
+        ):
+            key = f"{kind}:{model_name}"
+            local_dir = self.local_model_dir(model_name)
+            if not (local_dir / "config.json").exists():
+                from transformers import pipeline
+                logger.info(f"Saving {model_name} to {local_dir}")
+                loaded = pipeline(task, model=model_name)
+                loaded.model.save_pretrained(str(local_dir))
+                loaded.tokenizer.save_pretrained(str(local_dir))
+                del loaded
+            self._load(key, lambda: self._load_pipeline(task, key, model_name))
+            self.unload_model(key)
+            files += [path for path in local_dir.rglob("*") if path.is_file()] + self._weight_files(key)
+        
+        return [path.relative_to(root).as_posix() for path in files]
+    
+    def _weight_files(self, key: str) -> List[Path]:
+        """The model's safetensors copy, if there is one inside the model cache."""
+        if self.weight_cache is None:
+            return []
+        path = self.weight_cache.path(key).resolve()
+        root = Path(self.cache_dir).resolve()
+        if not path.exists() or root not in path.parents:
+            return []
+        return [Path(self.cache_dir) / path.relative_to(root)]
+    
+    def pack_bundle(self, output_path: str, models_config, workers: int = None) -> Dict[str, Any]:
+        """
+        Pack the configured models into one verified bundle file.
+        
+        Args:
+            output_path (str): Bundle file to write
+            models_config (ModelConfig): Models to pack (fetched first if missing)
+            workers (int): Files hashed in parallel
+        
+        Returns:
+            Dict[str, Any]: The bundle manifest
+        """
+        files = self.fetch_models(models_config)
+        models = {
+            "whisper_model_size": models_config.whisper_model_size,
+            "cascade_first_pass_size": models_config.cascade_first_pass_size,
+            "summarizer_model": models_config.summarizer_model,
+            "classifier_model": models_config.classifier_model,
+            "weight_cache": self.weight_cache is not None
+        }
+        return bundle.pack(self.cache_dir, files, output_path, models=models, workers=workers)
+    
+    def unpack_bundle(self, bundle_path: str, workers: int = None) -> Dict[str, Any]:
+        """
+        Install a bundle into the model cache, verifying every file.
+        
+        Args:
+            bundle_path (str): Bundle file
+            workers (int): Files extracted in parallel
+        
+        Returns:
+            Dict[str, Any]: Report with ``failures`` and the bundle's ``manifest``
+        """
+        if not self.cache_dir:
+            raise ValueError("A cache directory is required to unpack models")
+        return bundle.unpack(bundle_path, self.cache_dir, workers=workers)
+    
+    def verify_bundle(self, path: str = None, workers: int = None) -> Dict[str, Any]:
+        """
+        Check a bundle file, or the unpacked model cache, against its manifest.
+        
+        Args:
+            path (str): Bundle file (defaults to the unpacked model cache)
+            workers (int): Files hashed in parallel
+        
+        Returns:
+            Dict[str, Any]: Report with ``failures``
+        """
+        return bundle.verify(path or self.cache_dir, workers=workers)
+    
+    def _make_room(self, needed_mb: float, keep: str = None):
+        if not self.memory_budget_mb:
+            return
+        
+        budget = self.memory_budget_mb * 1e6
+        while current_rss_bytes() + needed_mb * 1e6 > budget:
+            victims = [key for key in self.loaded_models if key != keep]
+            if not victims:
+                if needed_mb:
+                    logger.warning(
+                        f"Memory budget of {self.memory_budget_mb} MB is too small for {keep} "
+                        f"(~{needed_mb:.0f} MB); loading anyway"
+                    )
+                return
+            self._evict(victims[0])
+    
+    def _evict(self, key: str):
+        logger.info(f"Evicting {key} to stay within {self.memory_budget_mb} MB")
+        del self.loaded_models[key]
+        self.evictions += 1
+        _release_memory()
+    
+    def _track_peak(self, rss_bytes: int = None):
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes or current_rss_bytes())
     
     def unload_model(self, model_type: str):
         """
         Unload a specific model to free memory.
         
         Args:
-            model_type (str): Type of model to unload
+            model_type (str): Type of model to unload (``whisper``, ``summarizer``,
+                ``classifier``) or an exact cache key such as ``whisper:base``
         """
-        pass
+        keys = [
+            key for key in self.loaded_models
+            if key == model_type or key.split(":", 1)[0] == model_type
+        ]
+        for key in keys:
+            del self.loaded_models[key]
+        if keys:
+            _release_memory()
+    
+    def is_loaded(self, key: str) -> bool:
+        """
+        Check whether a model is resident, so using it needs no load.
+        
+        Args:
+            key (str): Cache key, ``<type>:<name>`` (e.g. ``whisper:base``)
+        
+        Returns:
+            bool: Whether the model is cached
+        """
+        return key in self.loaded_models
     
     def get_model_info(self):
         """
@@ -80,4 +439,13 @@ class ModelManager:
         Returns:
             dict: Information about currently loaded models
         """
-        pass
\ No newline at end of file
+        self._track_peak()
+        return {
+            "loaded": list(self.loaded_models),
+            "model_memory_mb": dict(self.model_memory_mb),
+            "memory_budget_mb": self.memory_budget_mb,
+            "device": self.device,
+            "rss_mb": current_rss_bytes() / 1e6,
+            "peak_rss_mb": self.peak_rss_bytes / 1e6,
+            "evictions": self.evictions
+        }
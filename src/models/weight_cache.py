@@ -0,0 +1,334 @@
+"""
+Weight Cache
+
+Safetensors copies of model checkpoints that are loaded by memory-mapping.
+
+A checkpoint is converted once. Later loads map the file copy-on-write and
+turn every parameter into a view of the mapping, so loading deserializes
+nothing, pages are only read when a weight is first used, and every worker
+process on a machine shares one physical copy of the weights through the
+page cache.
+
+Files use the standard safetensors layout (little-endian header length,
+JSON header, raw little-endian tensor data) and open with the
+``safetensors`` tools. Tensors are stored largest element size first, so
+each one starts at an offset aligned for its dtype.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stored with every file; files written in another layout are converted again
+FORMAT_VERSION = "1"
+
+# Bytes per element of the safetensors dtypes, and the matching torch dtype names
+DTYPES = {
+    "F64": (8, "float64"), "I64": (8, "int64"),
+    "F32": (4, "float32"), "I32": (4, "int32"),
+    "F16": (2, "float16"), "BF16": (2, "bfloat16"), "I16": (2, "int16"),
+    "I8": (1, "int8"), "U8": (1, "uint8"), "BOOL": (1, "bool"),
+}
+
+# Header lengths beyond this are treated as a corrupt file
+MAX_HEADER_BYTES = 100 * 1024 * 1024
+
+
+def write_safetensors(path: str, tensors: List[Tuple[str, str, List[int], Any]],
+                      metadata: Dict[str, str] = None):
+    """
+    Write tensors to a safetensors file, atomically.
+    
+    Args:
+        path (str): Output file
+        tensors (List[Tuple[str, str, List[int], Any]]): ``(name, dtype, shape, data)``
+            entries; ``dtype`` is a safetensors dtype (``F32``...) and ``data``
+            any bytes-like object holding the elements in little-endian order
+        metadata (Dict[str, str]): String metadata stored in the header
+    """
+    entries = sorted(tensors, key=lambda entry: (-DTYPES[entry[1]][0], entry[0]))
+    
+    header: Dict[str, Any] = {}
+    offset = 0
+    for name, dtype, shape, data in entries:
+        size = memoryview(data).nbytes
+        header[name] = {"dtype": dtype, "shape": list(shape), "data_offsets": [offset, offset + size]}
+        offset += size
+    if metadata:
+        header["__metadata__"] = dict(metadata)
+    
+    raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    # Pad so the data section starts 8-byte aligned
+    raw += b" " * (-len(raw) % 8)
+    
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(struct.pack("<Q", len(raw)))
+        f.write(raw)
+        for entry in entries:
+            f.write(entry[3])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, output)
+
+
+def read_safetensors_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """
+    Read the header of a safetensors file.
+    
+    Args:
+        path (str): Safetensors file
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: The header (tensor entries plus optional
+            ``__metadata__``) and the file offset where tensor data starts
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise ValueError(f"{path} is not a safetensors file")
+        (length,) = struct.unpack("<Q", prefix)
+        if length > MAX_HEADER_BYTES:
+            raise ValueError(f"{path} has an implausible header length ({length} bytes)")
+        header = json.loads(f.read(length).decode("utf-8"))
+    return header, 8 + length
+
+
+def map_safetensors(path: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Memory-map a safetensors file as torch tensors.
+    
+    The mapping is copy-on-write: tensors can be written to, but writes
+    stay private to the process and never reach the file.
+    
+    Args:
+        path (str): Safetensors file
+    
+    Returns:
+        Tuple[Dict[str, torch.Tensor], Dict[str, str]]: Tensors by name and the file's metadata
+    """
+    import torch
+    
+    header, data_start = read_safetensors_header(path)
+    metadata = header.pop("__metadata__", {})
+    with open(path, "rb") as f:
+        # The tensors keep the mapping alive after the file is closed
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    
+    tensors = {}
+    for name, info in header.items():
+        item_size, dtype_name = DTYPES[info["dtype"]]
+        dtype = getattr(torch, dtype_name)
+        begin, end = info["data_offsets"]
+        count = (end - begin) // item_size
+        if count == 0:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        flat = torch.frombuffer(mapping, dtype=dtype, count=count, offset=data_start + begin)
+        tensors[name] = flat.reshape(info["shape"])
+    return tensors, metadata
+
+
+def _named_tensors(model) -> Iterator[Tuple[str, Any]]:
+    """Every parameter and buffer under every name it is reachable by (tied weights included)."""
+    yield from model.named_parameters(remove_duplicate=False)
+    yield from model.named_buffers(remove_duplicate=False)
+
+
+def _build_empty(build: Callable[[], Any]):
+    """Build a model without allocating or initializing its weights where torch allows it."""
+    import torch
+    
+    try:
+        with torch.device("meta"):
+            return build()
+    except (AttributeError, TypeError, NotImplementedError, RuntimeError):
+        # torch < 2.0 has no device context, and a few layers cannot be built on meta
+        return build()
+
+
+def _whisper_metadata(model) -> Dict[str, str]:
+    return {"dims": json.dumps(asdict(model.dims))}
+
+
+def _build_whisper(metadata: Dict[str, str]):
+    from whisper.model import ModelDimensions, Whisper
+    
+    dims = ModelDimensions(**json.loads(metadata["dims"]))
+    return _build_empty(lambda: Whisper(dims))
+
+
+def _transformers_metadata(model) -> Dict[str, str]:
+    metadata = {
+        "model_class": type(model).__name__,
+        "config_class": type(model.config).__name__,
+        "config": model.config.to_json_string()
+    }
+    if getattr(model, "generation_config", None) is not None:
+        metadata["generation_config"] = model.generation_config.to_json_string()
+    return metadata
+
+
+def _build_transformers(metadata: Dict[str, str]):
+    import transformers
+    
+    config_class = getattr(transformers, metadata["config_class"])
+    config = config_class.from_dict(json.loads(metadata["config"]))
+    model_class = getattr(transformers, metadata["model_class"])
+    model = _build_empty(lambda: model_class(config))
+    if "generation_config" in metadata:
+        model.generation_config = transformers.GenerationConfig.from_dict(
+            json.loads(metadata["generation_config"])
+        )
+    return model
+
+
+# Library-specific description and reconstruction of a model's architecture
+BUILDERS = {
+    "whisper": (_whisper_metadata, _build_whisper),
+    "transformers": (_transformers_metadata, _build_transformers),
+}
+
+
+def _builder_for(model) -> str:
+    if type(model).__module__.startswith("whisper") and hasattr(model, "dims"):
+        return "whisper"
+    if hasattr(getattr(model, "config", None), "to_json_string"):
+        return "transformers"
+    raise ValueError(f"Don't know how to rebuild {type(model).__name__} from safetensors")
+
+
+class WeightCache:
+    """
+    Directory of safetensors copies of loaded models, keyed like the model manager's cache.
+    """
+    
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir (str): Directory for the safetensors files
+        """
+        self.cache_dir = Path(cache_dir)
+    
+    def path(self, key: str) -> Path:
+        """
+        Get the file that holds a model's weights.
+        
+        Args:
+            key (str): Model key such as ``whisper:base`` or ``summarizer:facebook/bart-large-cnn``
+        
+        Returns:
+            Path: Safetensors file path
+        """
+        return self.cache_dir / (re.sub(r"[^A-Za-z0-9._-]+", "--", key) + ".safetensors")
+    
+    def save(self, key: str, model) -> Path:
+        """
+        Convert a loaded model to a safetensors file.
+        
+        Tied weights are stored once, and buffers the model does not put in
+        its state dict are stored too, so the file alone rebuilds the model.
+        
+        Args:
+            key (str): Model key
+            model: Loaded ``whisper`` or ``transformers`` model
+        
+        Returns:
+            Path: The written file
+        """
+        import torch
+        
+        builder = _builder_for(model)
+        dtype_names = {getattr(torch, name): dtype for dtype, (_, name) in DTYPES.items()}
+        
+        entries, aliases, sparse = [], {}, []
+        stored: Dict[int, str] = {}
+        for name, tensor in _named_tensors(model):
+            if id(tensor) in stored:
+                aliases[name] = stored[id(tensor)]
+                continue
+            stored[id(tensor)] = name
+            
+            data = tensor.detach()
+            if data.is_sparse:
+                sparse.append(name)
+                data = data.to_dense()
+            data = data.cpu().contiguous()
+            raw = data.reshape(-1).view(torch.uint8).numpy()
+            entries.append((name, dtype_names[data.dtype], list(data.shape), raw))
+        
+        metadata = dict(BUILDERS[builder][0](model), builder=builder, format_version=FORMAT_VERSION,
+                        aliases=json.dumps(aliases), sparse=json.dumps(sparse))
+        path = self.path(key)
+        write_safetensors(str(path), entries, metadata)
+        return path
+    
+    def load(self, key: str):
+        """
+        Rebuild a model from its safetensors copy with memory-mapped weights.
+        
+        Args:
+            key (str): Model key
+        
+        Returns:
+            The model in eval mode on the CPU, or None if there is no usable copy
+        """
+        path = self.path(key)
+        if not path.exists():
+            return None
+        
+        try:
+            tensors, metadata = map_safetensors(str(path))
+            if metadata.get("format_version") != FORMAT_VERSION:
+                logger.info(f"Weight cache {path} has an old layout; converting again")
+                return None
+            model = BUILDERS[metadata["builder"]][1](metadata)
+            self._assign(model, tensors, metadata)
+        except Exception as e:
+            logger.warning(f"Ignoring unusable weight cache {path}: {e}")
+            return None
+        return model.eval()
+    
+    @staticmethod
+    def _assign(model, tensors: Dict[str, Any], metadata: Dict[str, str]):
+        """Make every parameter and buffer of ``model`` a view of the mapped tensors."""
+        import torch
+        
+        aliases = json.loads(metadata.get("aliases", "{}"))
+        sparse = set(json.loads(metadata.get("sparse", "[]")))
+        expected = {name for name, _ in _named_tensors(model)}
+        missing = expected - set(tensors) - set(aliases)
+        if missing:
+            raise ValueError(f"no weights for {sorted(missing)[:3]}")
+        
+        parameters: Dict[str, Any] = {}
+        for name in list(tensors) + list(aliases):
+            source = aliases.get(name, name)
+            tensor = tensors[source]
+            if source in sparse:
+                tensor = tensor.to_sparse()
+            
+            owner_name, _, attr = name.rpartition(".")
+            owner = model.get_submodule(owner_name) if owner_name else model
+            if attr in owner._parameters:
+                # Tied weights share one Parameter object, as they did before conversion
+                if source not in parameters:
+                    parameters[source] = torch.nn.Parameter(tensor, requires_grad=False)
+                owner._parameters[attr] = parameters[source]
+            elif attr in owner._buffers:
+                owner._buffers[attr] = tensor
+            else:
+                raise ValueError(f"{name} is not a parameter or buffer of {type(model).__name__}")
@@ -5,12 +5,22 @@ Orchestrates the complete audio-to-summary-to-topic workflow.
 """
 
 import json
+import os
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
-import whisper
-import torch
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from config.settings import load_config
+from src.utils.admission import UNKNOWN_SECONDS_PER_BYTE, AdmissionController
+from src.utils.logger import get_logger
+from src.utils.metrics import RTF_BUCKETS, StageTimer, get_registry
+from src.utils.resources import RSSMonitor
+
+logger = get_logger(__name__)
+
 
 class AudioProcessingPipeline:
     """
@@ -24,56 +34,280 @@ class AudioProcessingPipeline:
         Args:
             config: Configuration object
         """
-        self.config = config
+        self.config = config if config is not None else load_config()
+        self.model_manager = None
         self.audio_handler = None
         self.speech_to_text = None
+        self.feature_cache = None
+        self.extractor = None
         self.summarizer = None
         self.classifier = None
         self._models_loaded = False
+        self._results_store = None
+        self._fingerprint_index = None
+        self._result_writer = None
+        self.latency_profile = None
+        self.latency_selector = None
+        self.language_router = None
+        self._asr_variants = {}
+        self.admission = AdmissionController.from_config(self.config.service)
+        self._summarizer_variants = {}
+        # Models held per stage name until a stage-wise batch stage ends (None = not in one)
+        self._stage_models = None
+        self._load_lock = threading.Lock()
+        self._stage_locks = {}
     
-    def load_models(self):
-        """Load all required models."""
-        if self._models_loaded:
-            return
+    @property
+    def low_memory(self) -> bool:
+        """Whether models are loaded per stage under ``config.models.memory_budget_mb``."""
+        return bool(self.config.models.memory_budget_mb)
+    
+    def build_components(self):
+        """
+        Create the processing components from the configuration without loading any models.
+        
+        Callers that supply their own model objects (benchmarks, tests) can
+        assign them to the components before calling ``load_models``.
+        """
+        from src.audio_processing.audio_input import AudioInputHandler
+        from src.audio_processing.features import FeatureCache
+        from src.audio_processing.speech_to_text import SpeechToText
+        from src.models.language_routing import LanguageRouter
+        from src.models.latency_budget import LatencyBudgetSelector, LatencyProfile, hardware_key
+        from src.models.model_manager import ModelManager
+        from src.text_processing.extractive import ExtractiveCompressor
+        from src.text_processing.summarizer import TextSummarizer
+        from src.text_processing.topic_classifier import TopicClassifier
+        from src.utils.runtime import resolve_device
         
-        print("🔄 Loading models...")
+        models = self.config.models
+        processing = self.config.processing
+        device = resolve_device(models.device)
         
-        # Initialize components (will be implemented later)
-        # from src.audio_processing.audio_input import AudioInputHandler
-        # from src.audio_processing.speech_to_text import SpeechToText
-        # from src.text_processing.summarizer import TextSummarizer
-        # from src.text_processing.topic_classifier import TopicClassifier
+        self.model_manager = ModelManager(
+            memory_budget_mb=models.memory_budget_mb, cache_dir=models.cache_dir,
+            device=device,
+            weights_dir=os.path.join(models.cache_dir, "safetensors") if models.mmap_weights else None,
+            offline=models.offline
+        )
+        self.audio_handler = AudioInputHandler(sample_rate=self.config.audio.sample_rate)
+        if self.config.audio.feature_cache_dir:
+            self.feature_cache = FeatureCache(self.config.audio.feature_cache_dir,
+                                              max_bytes=self.config.audio.feature_cache_max_mb * 1024 * 1024)
+        self.speech_to_text = SpeechToText(
+            model_size=models.whisper_model_size, model_manager=self.model_manager,
+            first_pass_size=models.cascade_first_pass_size or None,
+            logprob_threshold=models.cascade_logprob_threshold,
+            no_speech_threshold=models.cascade_no_speech_threshold,
+            compression_ratio_threshold=models.cascade_compression_ratio_threshold
+        )
+        self.summarizer = TextSummarizer(
+            model_name=models.summarizer_model, model_manager=self.model_manager,
+            normalize=processing.normalize_transcript
+        )
+        self.classifier = TopicClassifier(
+            model_name=models.classifier_model, model_manager=self.model_manager,
+            window_tokens=processing.topic_window_tokens,
+            aggregation=processing.topic_aggregation,
+            cache_size=processing.topic_cache_size,
+            cache_path=processing.topic_cache_path or None,
+            cache_disk_entries=processing.topic_cache_disk_entries
+        )
         
-        # self.audio_handler = AudioInputHandler()
-        # self.speech_to_text = SpeechToText()
-        # self.summarizer = TextSummarizer()
-        # self.classifier = TopicClassifier()
+        if processing.extractive_ratio or processing.extractive_max_tokens:
+            self.extractor = ExtractiveCompressor(
+                ratio=processing.extractive_ratio,
+                max_tokens=processing.extractive_max_tokens,
+                min_tokens=processing.extractive_min_tokens,
+                method=processing.extractive_method
+            )
+        self.classifier.set_custom_topics(self.config.processing.predefined_topics)
         
-        print("✅ Models loaded successfully")
-        self._models_loaded = True
+        self.latency_profile = LatencyProfile(models.latency_profile or None, hardware_key(device))
+        self.latency_selector = LatencyBudgetSelector(
+            self.latency_profile,
+            [size.strip() for size in models.budget_model_sizes.split(",") if size.strip()]
+            or [models.whisper_model_size],
+            [name.strip() for name in models.budget_summarizers.split(",") if name.strip()]
+            or [models.summarizer_model],
+            is_loaded=self.model_manager.is_loaded
+        )
+        self.model_manager.load_listener = self.latency_profile.observe_load
+        if models.route_language:
+            self.language_router = LanguageRouter(models.summarizer_languages, models.classifier_languages)
     
-    def process_audio_file(self, file_path: str, output_path: str = None) -> Dict[str, Any]:
+    def load_models(self):
+        """
+        Load all required models.
+        
+        Models stay resident on the pipeline instance, so repeated calls to
+        ``process_audio_file`` (batch runs, distributed workers) reuse them.
+        In low-memory mode nothing is loaded here; each stage loads its own
+        model through the model manager, which evicts others to fit the budget.
+        """
+        with self._load_lock:
+            if self._models_loaded:
+                return
+            
+            if self.speech_to_text is None:
+                self.build_components()
+            
+            if self.low_memory:
+                logger.info(f"🪶 Low-memory mode: loading models per stage within "
+                            f"{self.config.models.memory_budget_mb} MB")
+                self._models_loaded = True
+                return
+            
+            logger.info("🔄 Loading models...")
+            
+            self.speech_to_text.load_model()
+            self.summarizer.load_model()
+            self.classifier.load_model()
+            
+            logger.info("✅ Models loaded successfully")
+            self._models_loaded = True
+    
+    def process_audio_file(self, file_path: str, output_path: str = None,
+                           progress: Callable = None, deadline: float = None,
+                           language: str = None) -> Dict[str, Any]:
         """
         Process an audio file through the complete pipeline.
         
         Args:
             file_path (str): Path to the audio file
             output_path (str): Optional output file path
-            
+            progress (Callable): Called as ``progress(event, stage, entry)`` when
+                each stage starts and ends (see ``StageTimer``)
+            deadline (float): Seconds the file should take at most; picks the models
+                per file (defaults to ``models.deadline_seconds``, 0 = configured models)
+            language (str): Spoken language, skipping detection (defaults to ``models.language``)
+        
         Returns:
             Dict[str, Any]: Processing results
         """
-        start_time = time.time()
-        
-        print(f"🎵 Processing audio file: {file_path}")
+        logger.info(f"🎵 Processing audio file: {file_path}")
         
         # Validate input
         if not Path(file_path).exists():
             raise FileNotFoundError(f"Audio file not found: {file_path}")
         
+        return self._process(file_path, None, output_path, progress, deadline,
+                             estimate=lambda: self.estimate_audio_seconds(file_path), language=language)
+    
+    def process_audio_bytes(self, data: bytes, name: str, output_path: str = None,
+                            progress: Callable = None, deadline: float = None,
+                            language: str = None) -> Dict[str, Any]:
+        """
+        Process encoded audio held in memory (e.g. an upload) without writing it to disk.
+        
+        Args:
+            data (bytes): Encoded audio file contents
+            name (str): Name recorded as the results' ``audio_file``
+            output_path (str): Optional output file path
+            progress (Callable): Stage progress callback (see ``process_audio_file``)
+            deadline (float): Processing deadline in seconds (see ``process_audio_file``)
+            language (str): Spoken language (see ``process_audio_file``)
+        
+        Returns:
+            Dict[str, Any]: Processing results
+        """
+        logger.info(f"🎵 Processing uploaded audio: {name} ({len(data) / 1e6:.1f} MB)")
+        return self._process(name, lambda: self.audio_handler.load_audio_bytes(data, name),
+                             output_path, progress, deadline,
+                             estimate=lambda: self.estimate_audio_seconds(data=data), language=language)
+    
+    def _process(self, audio_file: str, decode: Optional[Callable], output_path: Optional[str],
+                 progress: Optional[Callable], deadline: Optional[float] = None,
+                 estimate: Optional[Callable] = None, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run every stage for one recording.
+        
+        ``decode`` returns its samples and sample rate (None = decode the
+        ``audio_file`` path); ``estimate`` returns its duration without
+        decoding, for admission control.
+        """
+        start_time = time.time()
+        stages = StageTimer(track_memory=True, listener=progress)
+        
         # Load models if not already loaded
-        self.load_models()
+        if not self._models_loaded:
+            with stages.stage("model_load"):
+                self.load_models()
+        
+        results = self._new_results(audio_file, language)
+        if deadline is None:
+            deadline = self.config.models.deadline_seconds
+        if deadline:
+            results["model_selection"] = {"deadline_seconds": deadline}
+        
+        try:
+            with RSSMonitor() as monitor:
+                # The decoded audio only lives until transcription is done
+                with self._admitted(audio_file, estimate, stages):
+                    audio_duration = self._run_speech_to_text(results, stages, decode)
+                self._run_summarization(results, stages)
+                self._run_classification(results, stages)
+            
+            self._complete(results, stages, audio_duration, time.time() - start_time,
+                           monitor.peak_bytes, output_path)
+        
+        except Exception as e:
+            self._fail(results, e)
+            raise
+        
+        return results
+    
+    def process_incremental(self, file_path: str, source_id: str,
+                            output_path: str = None) -> Dict[str, Any]:
+        """
+        Process the latest version of a growing recording, reusing earlier work.
+        
+        Args:
+            file_path (str): Path to the current audio file
+            source_id (str): Stable identifier of the recording across versions
+            output_path (str): Optional output file path
         
+        Returns:
+            Dict[str, Any]: Processing results for the whole recording
+        """
+        from src.incremental import IncrementalProcessor
+        
+        logger.info(f"🎵 Processing audio file incrementally: {file_path} ({source_id})")
+        processor = IncrementalProcessor(self, self.config.storage.incremental_state_dir)
+        return processor.process(file_path, source_id, output_path)
+    
+    def estimate_audio_seconds(self, file_path: str = None, data: bytes = None) -> float:
+        """
+        Estimate a file's duration without decoding it.
+        
+        Args:
+            file_path (str): Path to the audio file
+            data (bytes): Encoded audio file contents (instead of ``file_path``)
+        
+        Returns:
+            float: Duration from the container, or a conservative guess from the encoded size
+        """
+        seconds = self.audio_handler.probe_duration(file_path, data)
+        if seconds is None:
+            size = len(data) if data is not None else os.path.getsize(file_path)
+            seconds = size * UNKNOWN_SECONDS_PER_BYTE
+        return seconds
+    
+    @contextmanager
+    def _admitted(self, audio_file: str, estimate: Optional[Callable], stages: StageTimer):
+        """Hold admission for a file's decoded audio (a no-op without limits)."""
+        if not self.admission.enabled or estimate is None:
+            yield
+            return
+        
+        with stages.stage("admission"):
+            ticket = self.admission.acquire(estimate(), audio_file)
+        try:
+            yield
+        finally:
+            self.admission.release(ticket)
+    
+    def _new_results(self, file_path: str, language: str = None) -> Dict[str, Any]:
         results = {
             "audio_file": file_path,
             "timestamp": datetime.now().isoformat(),
@@ -83,121 +317,543 @@ class AudioProcessingPipeline:
             "processing_time": 0,
             "status": "processing"
         }
+        language = language or self.config.models.language
+        if language or self.config.models.route_language:
+            results["language_routing"] = {"language": language or None,
+                                           "source": "hint" if language else "detected"}
+        return results
+    
+    @contextmanager
+    def _model_stage(self, stages: StageTimer, name: str, component):
+        """
+        Time a stage that needs a model, loading and releasing it in low-memory mode.
         
-        try:
-            # Step 1: Speech-to-Text
-            print("🎤 Converting speech to text...")
-            
-            # Import and use Whisper for actual transcription
-            
-            
-            # Load Whisper model
-            model_size = getattr(self.config.models, 'whisper_model_size', 'base') if self.config else 'base'
-            print(f"Loading Whisper {model_size} model...")
-            model = whisper.load_model(model_size)
-            
-            # Transcribe the audio file
-            print("Transcribing audio...")
-            result = model.transcribe(file_path)
-            transcript = result["text"].strip()
-            
-            results["transcript"] = transcript
-            print(f"📝 Transcript: {transcript[:100]}...")
-            
-            # Step 2: Summarization
-            print("📋 Generating summary...")
-            
-            if len(transcript) > 50:  # Only summarize if there's enough content
-                from transformers import pipeline
-                
-                print("Loading summarization model...")
-                summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-                
-                # Split long text if needed
-                max_chunk_length = 1000
-                if len(transcript) > max_chunk_length:
-                    # Split into chunks and summarize each
-                    chunks = [transcript[i:i+max_chunk_length] for i in range(0, len(transcript), max_chunk_length)]
-                    summaries = []
-                    for chunk in chunks:
-                        if len(chunk.strip()) > 50:
-                            chunk_summary = summarizer(chunk, max_length=100, min_length=20, do_sample=False)
-                            summaries.append(chunk_summary[0]['summary_text'])
-                    
-                    if summaries:
-                        # If multiple chunks, summarize the summaries
-                        if len(summaries) > 1:
-                            combined_summary = " ".join(summaries)
-                            if len(combined_summary) > 200:
-                                final_summary = summarizer(combined_summary, max_length=150, min_length=30, do_sample=False)
-                                summary = final_summary[0]['summary_text']
-                            else:
-                                summary = combined_summary
-                        else:
-                            summary = summaries[0]
-                    else:
-                        summary = "Content too short for summarization"
+        During a stage-wise batch the model stays loaded until the batch stage
+        ends, or until a file needs another variant (a different Whisper size
+        or summarizer) for the same stage, which replaces it.
+        
+        Args:
+            stages (StageTimer): Stage timings for the file
+            name (str): Stage name
+            component: Component whose model the stage uses
+        """
+        held = self._stage_models
+        per_stage = self.low_memory and held is None
+        with self._stage_lock(name):
+            if held is not None and held.get(name) is not component:
+                if name in held:
+                    held.pop(name).release_model()
+                with stages.stage("model_load"):
+                    component.load_model()
+                held[name] = component
+            elif per_stage:
+                with stages.stage("model_load"):
+                    component.load_model()
+            try:
+                with stages.stage(name):
+                    yield
+            finally:
+                if per_stage:
+                    component.release_model()
+    
+    def _stage_lock(self, name: str) -> threading.Lock:
+        """
+        Lock serializing one model stage across threads sharing the pipeline.
+        
+        Different stages may run concurrently for different files (one file
+        summarized while the next is transcribed). In low-memory mode all
+        stages share one lock so only one model is ever loaded.
+        """
+        key = "models" if self.low_memory else name
+        with self._load_lock:
+            return self._stage_locks.setdefault(key, threading.Lock())
+    
+    def _run_speech_to_text(self, results: Dict[str, Any], stages: StageTimer,
+                            decode: Callable = None) -> float:
+        """
+        Decode and transcribe the audio file.
+        
+        Args:
+            results (Dict[str, Any]): Results to fill in
+            stages (StageTimer): Stage timings for the file
+            decode (Callable): Returns samples and sample rate (defaults to decoding ``audio_file``)
+        
+        Returns:
+            float: Decoded audio duration in seconds
+        """
+        # A file whose features are cached may not need decoding at all
+        audio, known = None, None
+        if decode is None and self._features_suffice(results):
+            with stages.stage("features"):
+                known = self.feature_cache.identify(results["audio_file"])
+        
+        if known is None:
+            with stages.stage("decode"):
+                if decode is None:
+                    audio, sample_rate = self.audio_handler.load_audio_file(results["audio_file"])
                 else:
-                    # Single chunk summarization
-                    summary_result = summarizer(transcript, max_length=30, min_length=10, do_sample=False)
-                    summary = summary_result[0]['summary_text']
-            else:
-                summary = "Audio content too short for meaningful summarization"
-                
-            results["summary"] = summary
-            print(f"📄 Summary: {summary}")
-            
-            # Step 3: Topic Classification
-            print("🏷️  Classifying topic...")
+                    audio, sample_rate = decode()
+            audio_duration = len(audio) / sample_rate
             
-            if len(transcript) > 10:  # Only classify if there's content
-                from transformers import pipeline
-                
-                print("Loading classification model...")
-                classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-                
-                # Predefined topics
-                candidate_labels = [
-                    "technology", "business", "education", "entertainment", 
-                    "health", "sports", "politics", "casual conversation",
-                    "news", "science", "finance", "travel"
-                ]
-                
-                classification_result = classifier(transcript, candidate_labels)
-                
-                topic_result = {
-                    "label": classification_result['labels'][0],
-                    "confidence": classification_result['scores'][0],
-                    "all_scores": dict(zip(classification_result['labels'][:5], classification_result['scores'][:5]))
-                }
-            else:
-                topic_result = {
-                    "label": "unknown",
-                    "confidence": 0.0,
-                    "all_scores": {"unknown": 1.0}
-                }
+            if self.fingerprint_index is not None:
+                with stages.stage("fingerprint"):
+                    duplicate = self._reuse_duplicate(results, audio, sample_rate)
+                if duplicate:
+                    return audio_duration
+        else:
+            audio_duration = known[1]
+        
+        self._select_models(results, stages, audio_duration)
+        self._route_language(results, stages, audio, audio_duration)
+        speech_to_text = self._speech_to_text_for(results)
+        
+        audio_input = audio
+        if self.feature_cache is not None:
+            audio_input = self._cached_features(results, stages, speech_to_text, audio, known,
+                                                record=decode is None)
+        
+        logger.info("🎤 Converting speech to text...")
+        with self._model_stage(stages, "asr", speech_to_text):
+            transcription = speech_to_text.transcribe_segments(
+                audio_input, language=results.get("language_routing", {}).get("language")
+            )
+        
+        results["transcript"] = transcription["text"]
+        results["segments"] = transcription["segments"]
+        if transcription.get("cascade"):
+            results["asr_cascade"] = transcription["cascade"]
+            self._record_cascade_metrics(transcription["cascade"])
+        logger.info(f"📝 Transcript: {results['transcript'][:100]}...")
+        return audio_duration
+    
+    def _features_suffice(self, results: Dict[str, Any]) -> bool:
+        """Whether the file can be transcribed from cached features without its samples."""
+        routing = results.get("language_routing")
+        return (self.feature_cache is not None and self.fingerprint_index is None
+                and (routing is None or routing["source"] != "detected"))
+    
+    def _cached_features(self, results: Dict[str, Any], stages: StageTimer, speech_to_text,
+                         audio, known: Optional[Tuple[str, float]], record: bool):
+        """
+        Log-mel features for the first ASR pass, from the feature cache when possible.
+        
+        Args:
+            results (Dict[str, Any]): Results being filled in
+            stages (StageTimer): Stage timings for the file
+            speech_to_text: Model that will transcribe the features
+            audio: Decoded samples, or None when the cache recognized the file as ``known``
+            known (Optional[Tuple[str, float]]): Audio hash and duration from ``FeatureCache.identify``
+            record (bool): Whether the samples were decoded from ``audio_file`` itself
+        
+        Returns:
+            LogMelFeatures: Features, keeping the samples whenever they were decoded
+        """
+        from src.audio_processing.features import n_mels_for
+        
+        n_mels = n_mels_for(speech_to_text.first_pass_size or speech_to_text.model_size)
+        if audio is None:
+            # Without samples, a cascade whose passes need different mel sizes could not recompute
+            if n_mels == n_mels_for(speech_to_text.model_size):
+                with stages.stage("features"):
+                    features = self.feature_cache.load(known[0], n_mels)
+                if features is not None:
+                    return features
+            with stages.stage("decode"):
+                audio, _ = self.audio_handler.load_audio_file(results["audio_file"])
+        
+        with stages.stage("features"):
+            return self.feature_cache.features(audio, n_mels=n_mels,
+                                               file_path=results["audio_file"] if record else None)
+    
+    def _select_models(self, results: Dict[str, Any], stages: StageTimer, audio_duration: float):
+        """Pick the largest Whisper size and summarizer predicted to meet the file's deadline."""
+        selection = results.get("model_selection")
+        if selection is None or self.latency_selector is None:
+            return
+        
+        with stages.stage("select"):
+            budget = selection["deadline_seconds"] - stages.total_wall_time
+            selection.update(self.latency_selector.select(audio_duration, budget),
+                             budget_seconds=budget, audio_duration=audio_duration)
+        logger.info(f"⏳ {budget:.1f}s left for {audio_duration:.1f}s of audio: Whisper "
+                    f"{selection['whisper_model_size']} + {selection['summarizer_model']} "
+                    f"(predicted {selection['predicted_seconds']:.1f}s)")
+        if not selection["fits"]:
+            logger.warning(f"⚠️  Even the smallest models are predicted to miss the "
+                           f"{selection['deadline_seconds']:.1f}s deadline")
+    
+    def _route_language(self, results: Dict[str, Any], stages: StageTimer, audio, audio_duration: float):
+        """Detect the file's language (unless given) and route it to the models that support it."""
+        routing = results.get("language_routing")
+        if routing is None or self.language_router is None:
+            return
+        
+        from src.models.language_routing import multilingual_variant
+        
+        language, probability = routing["language"], None
+        if routing["source"] == "detected":
+            detector = self._asr_variant(multilingual_variant(self.config.models.language_detect_size))
+            with self._model_stage(stages, "language", detector):
+                language, probability = detector.detect_language(audio)
+        
+        unrouted = self._speech_to_text_for(results)
+        routing.update(self.language_router.route(language, probability, unrouted.model_size,
+                                                  getattr(unrouted, "first_pass_size", None)))
+        routing["detect_seconds"] = stages.stages.get("language", {}).get("wall_time", 0.0)
+        routing["estimated_saved_seconds"] = self._routing_savings(results, unrouted, audio_duration)
+        
+        logger.info(f"🌐 Language {routing['language'] or 'unknown'} ({routing['source']}"
+                    + (f", p={probability:.2f}" if probability is not None else "")
+                    + f"): Whisper {routing['whisper_model_size']}"
+                    + (f", skipping {' and '.join(routing['skipped'])}" if routing["skipped"] else ""))
+        get_registry().inc("language_routes_total",
+                           labels={"language": routing["language"] or "unknown",
+                                   "whisper": routing["whisper_model_size"]},
+                           help_text="Files routed by spoken language, by language and Whisper checkpoint")
+    
+    def _routing_savings(self, results: Dict[str, Any], unrouted, audio_duration: float) -> float:
+        """Predicted seconds saved by routing, net of detection (from the latency profile)."""
+        routing = results["language_routing"]
+        saved = -routing["detect_seconds"]
+        if self.latency_profile is None:
+            return saved
+        
+        # Cascade timings depend on the escalation rate, which the profile does not predict
+        if routing["whisper_model_size"] != unrouted.model_size and not getattr(unrouted, "cascade", False):
+            before, _ = self.latency_profile.rtf("asr", unrouted.model_size)
+            after, _ = self.latency_profile.rtf("asr", routing["whisper_model_size"])
+            saved += (before - after) * audio_duration
+        if not routing["summarize"]:
+            rtf, _ = self.latency_profile.rtf("summarize", self._summarizer_for(results).model_name)
+            saved += rtf * audio_duration
+        return saved
+    
+    def _speech_to_text_for(self, results: Dict[str, Any]):
+        """The speech-to-text component for the Whisper size selected and routed for this file."""
+        routing = results.get("language_routing", {})
+        if "whisper_model_size" in routing:
+            return self._asr_variant(routing["whisper_model_size"], routing["first_pass_size"])
+        
+        size = results.get("model_selection", {}).get("whisper_model_size")
+        if size is None:
+            return self.speech_to_text
+        return self._asr_variant(size)
+    
+    def _asr_variant(self, size: str, first_pass_size: str = None):
+        """
+        Get the speech-to-text component for a Whisper size, creating it once.
+        
+        Args:
+            size (str): Whisper size
+            first_pass_size (str): Cascade first-pass size (None = no cascade)
+        
+        Returns:
+            SpeechToText: The configured component if it matches, otherwise a variant
+        """
+        if first_pass_size == size:
+            first_pass_size = None
+        if (size == self.speech_to_text.model_size
+                and first_pass_size == getattr(self.speech_to_text, "first_pass_size", None)):
+            return self.speech_to_text
+        
+        with self._load_lock:
+            if (size, first_pass_size) not in self._asr_variants:
+                from src.audio_processing.speech_to_text import SpeechToText
                 
-            results["topic"] = topic_result
-            print(f"📊 Topic: {topic_result['label']} (confidence: {topic_result['confidence']:.2f})")
-            
-            # Calculate processing time
-            processing_time = time.time() - start_time
-            results["processing_time"] = processing_time
-            results["status"] = "completed"
-            
-            # Save results
-            if output_path:
-                self._save_results(results, output_path)
-            
-            print(f"✅ Processing completed in {processing_time:.2f} seconds")
+                models = self.config.models
+                self._asr_variants[(size, first_pass_size)] = SpeechToText(
+                    model_size=size, model_manager=self.model_manager,
+                    first_pass_size=first_pass_size,
+                    logprob_threshold=models.cascade_logprob_threshold,
+                    no_speech_threshold=models.cascade_no_speech_threshold,
+                    compression_ratio_threshold=models.cascade_compression_ratio_threshold
+                )
+            return self._asr_variants[(size, first_pass_size)]
+    
+    def _summarizer_for(self, results: Dict[str, Any]):
+        """The summarizer selected for this file."""
+        name = results.get("model_selection", {}).get("summarizer_model")
+        if name is None or name == self.summarizer.model_name:
+            return self.summarizer
+        
+        with self._load_lock:
+            if name not in self._summarizer_variants:
+                from src.text_processing.summarizer import TextSummarizer
+                self._summarizer_variants[name] = TextSummarizer(
+                    model_name=name, model_manager=self.model_manager,
+                    normalize=self.config.processing.normalize_transcript
+                )
+            return self._summarizer_variants[name]
+    
+    def _reuse_duplicate(self, results: Dict[str, Any], audio, sample_rate: int) -> bool:
+        """
+        Fingerprint decoded audio and take the results of an indexed copy if there is one.
+        
+        Returns:
+            bool: Whether the results were filled in from a duplicate
+        """
+        from src.audio_processing.fingerprint import compute_fingerprint
+        
+        index = self.fingerprint_index
+        variant = self._result_variant()
+        fingerprint = compute_fingerprint(audio, sample_rate)
+        match = index.lookup(fingerprint, variant)
+        if match is None:
+            index.add(results["audio_file"], fingerprint, variant)
+            return False
+        
+        index.alias(results["audio_file"], match, variant)
+        results.update(match["results"])
+        results["duplicate_of"] = {"audio_file": match["audio_file"], "similarity": match["similarity"]}
+        get_registry().inc("duplicates_total",
+                           help_text="Files answered with the results of an acoustically matching recording")
+        logger.info(f"♻️  {results['audio_file']} matches {match['audio_file']} "
+                    f"(similarity {match['similarity']:.2f}); reusing its results")
+        return True
+    
+    def _result_variant(self) -> str:
+        """Settings that change results; copies only reuse results produced with the same ones."""
+        models = self.config.models
+        labels = getattr(self.classifier, "predefined_topics", [])
+        return json.dumps([models.whisper_model_size, models.cascade_first_pass_size,
+                           models.summarizer_model, models.classifier_model, list(labels)])
+    
+    @staticmethod
+    def _record_cascade_metrics(cascade: Dict[str, Any]):
+        registry = get_registry()
+        registry.inc("asr_segments_total", cascade["segments"], {"pass": "first"},
+                     help_text="Segments transcribed by the cascade first pass, and those escalated")
+        registry.inc("asr_segments_total", cascade["escalated_segments"], {"pass": "escalated"},
+                     help_text="Segments transcribed by the cascade first pass, and those escalated")
+    
+    def _run_summarization(self, results: Dict[str, Any], stages: StageTimer):
+        """Summarize the transcript, after extractive compression when configured."""
+        self._summarize(results, stages, self._summary_input(results, stages))
+    
+    def _summarize(self, results: Dict[str, Any], stages: StageTimer, text: Optional[str]):
+        """Summarize a ``_summary_input`` text (None = skip summarization)."""
+        if text is None:
+            return
+        
+        logger.info("📋 Generating summary...")
+        processing = self.config.processing
+        summarizer = self._summarizer_for(results)
+        with self._model_stage(stages, "summarize", summarizer):
+            summary = summarizer.summarize_text(
+                text,
+                max_length=processing.max_summary_length,
+                min_length=processing.min_summary_length
+            )
+        
+        results["summary"] = summary
+        logger.info(f"📄 Summary: {summary}")
+    
+    def _run_summarization_batch(self, items: List[Tuple[Dict[str, Any], StageTimer, Optional[str]]]):
+        """
+        Summarize several files together, so their chunks share length-bucketed batches.
+        
+        Files are grouped by the summarizer selected for them. Each file's
+        ``summarize`` stage is charged a share of its group's time
+        proportional to its text length.
+        
+        Args:
+            items (List[Tuple[Dict[str, Any], StageTimer, Optional[str]]]): Results, stage
+                timings and ``_summary_input`` text per file
+        """
+        groups = {}
+        for results, stages, text in items:
+            if text is not None:
+                summarizer = self._summarizer_for(results)
+                groups.setdefault(id(summarizer), (summarizer, []))[1].append((results, stages, text))
+        
+        processing = self.config.processing
+        for summarizer, members in groups.values():
+            logger.info(f"📋 Generating {len(members)} summaries together...")
+            batch = StageTimer()
+            with self._model_stage(batch, "summarize", summarizer):
+                summaries = summarizer.summarize_texts(
+                    [text for _, _, text in members],
+                    max_length=processing.max_summary_length,
+                    min_length=processing.min_summary_length
+                )
             
-        except Exception as e:
-            results["status"] = "error"
-            results["error"] = str(e)
-            print(f"❌ Processing failed: {e}")
-            raise
+            total = sum(len(text) for _, _, text in members) or 1
+            for (results, stages, text), summary in zip(members, summaries):
+                results["summary"] = summary
+                share = len(text) / total
+                for name, entry in batch.stages.items():
+                    own = stages.stages.setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0})
+                    own["wall_time"] += entry["wall_time"] * share
+                    own["cpu_time"] += entry["cpu_time"] * share
+    
+    def _summary_input(self, results: Dict[str, Any], stages: StageTimer) -> Optional[str]:
+        """The text to summarize, after extractive compression (None = skip summarization)."""
+        if "duplicate_of" in results:
+            return None
+        if not results.get("language_routing", {}).get("summarize", True):
+            logger.info(f"⏭️  Skipping summarization: {self._summarizer_for(results).model_name} "
+                        f"does not support '{results['language_routing']['language']}'")
+            return None
         
-        return results
+        text = results["transcript"]
+        if self.extractor is not None:
+            with stages.stage("extract"):
+                text = self.extractor.compress(text)
+        return text
+    
+    def _run_classification(self, results: Dict[str, Any], stages: StageTimer):
+        """Classify the transcript's topic, window by window when segments are available."""
+        if "duplicate_of" in results:
+            return
+        if not results.get("language_routing", {}).get("classify", True):
+            logger.info(f"⏭️  Skipping topic classification: {self.classifier.model_name} "
+                        f"does not support '{results['language_routing']['language']}'")
+            return
+        
+        logger.info("🏷️  Classifying topic...")
+        with self._model_stage(stages, "classify", self.classifier):
+            if results.get("segments"):
+                topic_result = self.classifier.classify_segments(results["segments"])
+                results["topic_timeline"] = topic_result.pop("timeline")
+            else:
+                topic_result = self.classifier.classify_topic(results["transcript"])
+        
+        results["topic"] = topic_result
+        logger.info(f"📊 Topic: {topic_result['label']} (confidence: {topic_result['confidence']:.2f})")
+    
+    def _complete(self, results: Dict[str, Any], stages: StageTimer, audio_duration: float,
+                  processing_time: float, peak_rss_bytes: int, output_path: Optional[str]):
+        """Record timings and metrics, mark the results completed and save them."""
+        results["processing_time"] = processing_time
+        results["metrics"] = self._record_metrics(stages, audio_duration, processing_time, peak_rss_bytes)
+        results["status"] = "completed"
+        
+        if self.fingerprint_index is not None and "duplicate_of" not in results:
+            self.fingerprint_index.attach(results["audio_file"], results)
+        self._record_latency(results, stages, audio_duration, processing_time)
+        
+        # Queued for the writer thread; its time is not part of the file's stage metrics
+        if output_path:
+            self._save_results(results, output_path)
+        
+        logger.info(f"✅ Processing completed in {processing_time:.2f} seconds "
+                    f"(RTF {results['metrics']['rtf']:.3f}, "
+                    f"peak RSS {results['metrics']['peak_rss_mb']:.0f} MB)")
+    
+    def _record_latency(self, results: Dict[str, Any], stages: StageTimer, audio_duration: float,
+                        processing_time: float):
+        """Add the file's stage times to the latency profile and check its deadline."""
+        # Duplicates and incremental updates did not run the models on the whole file
+        if "duplicate_of" in results or "incremental" in results:
+            return
+        
+        speech_to_text = self._speech_to_text_for(results)
+        # Cascade timings depend on how much gets escalated, not on one model size
+        if self.latency_profile is not None and not getattr(speech_to_text, "cascade", False):
+            self.latency_profile.observe_stages(stages.stages, audio_duration, speech_to_text.model_size,
+                                                self._summarizer_for(results).model_name)
+            self.latency_profile.save_if_due()
+        
+        selection = results.get("model_selection")
+        if selection is not None and "whisper_model_size" in selection:
+            selection["actual_seconds"] = processing_time
+            selection["met_deadline"] = processing_time <= selection["deadline_seconds"]
+            get_registry().inc("deadlines_total", labels={"met": str(selection["met_deadline"]).lower()},
+                               help_text="Files processed with a deadline, by whether it was met")
+    
+    def _fail(self, results: Dict[str, Any], error: Exception):
+        """Mark the results as failed and count the failure."""
+        results["status"] = "error"
+        results["error"] = str(error)
+        get_registry().inc("files_total", labels={"status": "error"},
+                           help_text="Audio files processed by outcome")
+        logger.error(f"❌ Processing failed: {error}")
+    
+    def _record_metrics(self, stages: StageTimer, audio_duration: float,
+                        processing_time: float, peak_rss_bytes: int = 0) -> Dict[str, Any]:
+        """
+        Build the per-file metrics entry and export it to the metrics registry.
+        
+        Args:
+            stages (StageTimer): Stage timings for the file
+            audio_duration (float): Decoded audio length in seconds
+            processing_time (float): Total wall time for the file
+            peak_rss_bytes (int): Peak process RSS while processing the file
+        
+        Returns:
+            Dict[str, Any]: Stage timings, audio duration, real-time factors and peak memory
+        """
+        rtf = processing_time / audio_duration if audio_duration > 0 else 0.0
+        peak_rss_mb = max(
+            [peak_rss_bytes / 1e6] + [entry.get("peak_rss_mb", 0.0) for entry in stages.stages.values()]
+        )
+        metrics = {
+            "stages": {name: dict(entry) for name, entry in stages.stages.items()},
+            "audio_duration": audio_duration,
+            "rtf": rtf,
+            "peak_rss_mb": peak_rss_mb
+        }
+        if audio_duration > 0:
+            for entry in metrics["stages"].values():
+                entry["rtf"] = entry["wall_time"] / audio_duration
+        
+        registry = get_registry()
+        stages.record(registry)
+        registry.inc("files_total", labels={"status": "success"},
+                     help_text="Audio files processed by outcome")
+        registry.inc("audio_seconds_total", audio_duration,
+                     help_text="Seconds of decoded audio processed")
+        registry.observe("realtime_factor", rtf, buckets=RTF_BUCKETS,
+                         help_text="Processing wall time divided by audio duration")
+        previous_peak = registry.get("peak_rss_bytes") or 0
+        registry.set("peak_rss_bytes", max(previous_peak, peak_rss_mb * 1e6),
+                     help_text="Highest process RSS observed while processing a file")
+        
+        return metrics
+    
+    def calibrate_latency(self, file_path: str) -> Dict[str, Any]:
+        """
+        Measure every latency-budget candidate model on one file and store the results.
+        
+        Each model is loaded before it is timed, so the profile holds
+        steady-state real-time factors. Stages other than ASR and
+        summarization keep being measured from processed files.
+        
+        Args:
+            file_path (str): Representative audio file
+        
+        Returns:
+            Dict[str, Any]: The profile for this machine (see ``LatencyProfile.entries``)
+        """
+        self.load_models()
+        audio, sample_rate = self.audio_handler.load_audio_file(file_path)
+        duration = len(audio) / sample_rate
+        processing = self.config.processing
+        
+        transcript = ""
+        for size in self.latency_selector.model_sizes:
+            speech_to_text = self._speech_to_text_for({"model_selection": {"whisper_model_size": size}})
+            speech_to_text.load_model()
+            start = time.perf_counter()
+            transcript = speech_to_text.transcribe_segments(audio)["text"]
+            self.latency_profile.observe("asr", size, time.perf_counter() - start, duration)
+            if self.low_memory:
+                speech_to_text.release_model()
+            logger.info(f"⏱️  Whisper {size}: RTF {self.latency_profile.rtf('asr', size)[0]:.3f}")
+        
+        for name in self.latency_selector.summarizers:
+            summarizer = self._summarizer_for({"model_selection": {"summarizer_model": name}})
+            summarizer.load_model()
+            start = time.perf_counter()
+            summarizer.summarize_text(transcript, max_length=processing.max_summary_length,
+                                      min_length=processing.min_summary_length)
+            self.latency_profile.observe("summarize", name, time.perf_counter() - start, duration)
+            if self.low_memory:
+                summarizer.release_model()
+            logger.info(f"⏱️  {name}: RTF {self.latency_profile.rtf('summarize', name)[0]:.3f}")
+        
+        self.latency_profile.save()
+        return self.latency_profile.entries
     
     def process_microphone_input(self, duration: int = 10) -> Dict[str, Any]:
         """
@@ -205,11 +861,11 @@ class AudioProcessingPipeline:
         
         Args:
             duration (int): Recording duration in seconds
-            
+        
         Returns:
             Dict[str, Any]: Processing results
         """
-        print(f"🎙️  Recording from microphone for {duration} seconds...")
+        logger.info(f"🎙️  Recording from microphone for {duration} seconds...")
         
         # Load models if not already loaded
         self.load_models()
@@ -229,58 +885,110 @@ class AudioProcessingPipeline:
             "status": "completed"
         }
     
+    @property
+    def results_store(self):
+        """
+        Searchable results index, opened on first use.
+        
+        Returns:
+            ResultsStore: Store backed by ``config.storage.results_db``, or None if indexing is disabled
+        """
+        storage = self.config.storage
+        if self._results_store is None and storage.index_results:
+            from src.utils.results_store import ResultsStore
+            self._results_store = ResultsStore(storage.results_db)
+        return self._results_store
+    
+    @property
+    def fingerprint_index(self):
+        """
+        Acoustic fingerprint index for reusing results across copies, opened on first use.
+        
+        Returns:
+            FingerprintIndex: Index backed by ``config.storage.fingerprint_db``, or None if deduplication is off
+        """
+        storage = self.config.storage
+        if self._fingerprint_index is None and storage.fingerprint_db:
+            from src.utils.fingerprint_index import FingerprintIndex
+            self._fingerprint_index = FingerprintIndex(storage.fingerprint_db, storage.fingerprint_threshold)
+        return self._fingerprint_index
+    
+    @property
+    def result_writer(self):
+        """
+        Background writer for result files, started on first use in each process.
+        
+        Returns:
+            ResultWriter: Writer configured from ``config.storage``
+        """
+        with self._load_lock:
+            # A forked worker inherits the parent's writer but not its thread
+            if self._result_writer is None or self._result_writer.pid != os.getpid():
+                from src.utils.result_writer import ResultWriter
+                storage = self.config.storage
+                self._result_writer = ResultWriter(max_pending=storage.write_queue_size,
+                                                   fsync=storage.fsync_results)
+            return self._result_writer
+    
+    def flush_results(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued result file is written and indexed.
+        
+        New latency profile measurements are saved too.
+        
+        Args:
+            timeout (float): Seconds to wait at most (None = no limit)
+        
+        Returns:
+            bool: Whether everything was written in time
+        """
+        if self.latency_profile is not None:
+            self.latency_profile.save_if_dirty()
+        if self._result_writer is None or self._result_writer.pid != os.getpid():
+            return True
+        return self._result_writer.flush(timeout)
+    
     def _save_results(self, results: Dict[str, Any], output_path: str):
         """
-        Save processing results to file.
+        Queue processing results to be written to file and indexed in the results store.
+        
+        The file is written atomically on the writer thread; see ``flush_results``.
         
         Args:
             results (Dict[str, Any]): Results to save
             output_path (str): Output file path
         """
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        store = self.results_store
         
-        # Save as JSON
-        if output_file.suffix.lower() == '.json':
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-        else:
-            # Save as formatted text
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(f"Audio Conversation Analysis Results\n")
-                f.write(f"{'=' * 40}\n\n")
-                f.write(f"File: {results['audio_file']}\n")
-                f.write(f"Processed: {results['timestamp']}\n")
-                f.write(f"Duration: {results.get('processing_time', 0):.2f}s\n\n")
-                
-                f.write(f"TRANSCRIPT:\n")
-                f.write(f"{'-' * 20}\n")
-                f.write(f"{results['transcript']}\n\n")
-                
-                f.write(f"SUMMARY:\n")
-                f.write(f"{'-' * 20}\n")
-                f.write(f"{results['summary']}\n\n")
-                
-                f.write(f"TOPIC CLASSIFICATION:\n")
-                f.write(f"{'-' * 20}\n")
-                topic = results['topic']
-                f.write(f"Primary Topic: {topic.get('label', 'unknown')}\n")
-                f.write(f"Confidence: {topic.get('confidence', 0):.2f}\n")
+        def index_results():
+            store.add(results, output_path)
         
-        print(f"💾 Results saved to: {output_path}")
+        # Index only files that are complete on disk
+        self.result_writer.submit(output_path, results,
+                                  on_written=index_results if store is not None else None)
+        
+        logger.info(f"💾 Results queued for: {output_path}")
     
-    def batch_process(self, input_directory: str, output_directory: str) -> Dict[str, Any]:
+    def batch_process(self, input_directory: str, output_directory: str,
+                      results_path: str = None) -> Dict[str, Any]:
         """
         Process multiple audio files in a directory.
         
+        Per-file results are streamed to a JSON Lines file as each file
+        finishes; the returned summary only keeps counters and failures so
+        memory stays flat regardless of batch size.
+        
         Args:
             input_directory (str): Directory containing audio files
             output_directory (str): Directory to save results
-            
+            results_path (str): JSONL file for per-file results
+                (default: ``<output_directory>/batch_results.jsonl``)
+        
         Returns:
             Dict[str, Any]: Batch processing summary
         """
         from src.utils.file_utils import FileUtils
+        from src.utils.results_sink import JSONLResultsSink
         
         input_dir = Path(input_directory)
         output_dir = Path(output_directory)
@@ -292,53 +1000,184 @@ class AudioProcessingPipeline:
         audio_files = FileUtils.list_audio_files(str(input_dir))
         
         if not audio_files:
-            print("⚠️  No audio files found in input directory")
-            return {"processed": 0, "failed": 0, "files": []}
+            logger.warning("⚠️  No audio files found in input directory")
+            return {"processed": 0, "failed": 0, "failures": []}
         
-        print(f"📁 Found {len(audio_files)} audio files to process")
+        logger.info(f"📁 Found {len(audio_files)} audio files to process")
         
+        results_path = results_path or str(output_dir / "batch_results.jsonl")
         results = {
             "processed": 0,
             "failed": 0,
-            "files": [],
+            "failures": [],
+            "results_path": results_path,
             "start_time": datetime.now().isoformat(),
             "end_time": "",
             "total_duration": 0
         }
         
         start_time = time.time()
+        totals = {"audio_duration": 0.0, "stages": {}}
         
-        for audio_file in audio_files:
-            try:
-                file_name = Path(audio_file).stem
-                output_file = output_dir / f"{file_name}_results.json"
-                
-                print(f"\n🔄 Processing {file_name}...")
-                file_results = self.process_audio_file(audio_file, str(output_file))
-                
-                results["files"].append({
-                    "file": audio_file,
-                    "status": "success",
-                    "results": file_results
-                })
-                results["processed"] += 1
-                
-            except Exception as e:
-                print(f"❌ Failed to process {audio_file}: {e}")
-                results["files"].append({
-                    "file": audio_file,
-                    "status": "failed", 
-                    "error": str(e)
-                })
-                results["failed"] += 1
+        with JSONLResultsSink(results_path) as sink, RSSMonitor() as monitor:
+            if self.low_memory and self.config.models.stagewise_batch:
+                self._batch_stagewise(audio_files, output_dir, sink, results, totals)
+            else:
+                for audio_file in audio_files:
+                    try:
+                        file_name = Path(audio_file).stem
+                        output_file = output_dir / f"{file_name}_results.json"
+                        
+                        logger.info(f"🔄 Processing {file_name}...")
+                        file_results = self.process_audio_file(audio_file, str(output_file))
+                        self._record_batch_success(audio_file, file_results, sink, results, totals)
+                    
+                    except Exception as e:
+                        self._record_batch_failure(audio_file, e, sink, results)
+            
+            # The summary covers files that are on disk
+            self.flush_results()
         
         total_time = time.time() - start_time
+        audio_duration = totals["audio_duration"]
         results["end_time"] = datetime.now().isoformat()
         results["total_duration"] = total_time
+        results["metrics"] = {
+            "stages": totals["stages"],
+            "audio_duration": audio_duration,
+            "rtf": total_time / audio_duration if audio_duration > 0 else 0.0,
+            "files_per_second": len(audio_files) / total_time if total_time > 0 else 0.0,
+            "peak_rss_mb": monitor.peak_bytes / 1e6
+        }
+        if self.model_manager is not None:
+            results["metrics"]["model_evictions"] = self.model_manager.evictions
+        
+        registry = get_registry()
+        registry.set("batch_duration_seconds", total_time,
+                     help_text="Wall time of the most recent batch")
+        registry.set("batch_realtime_factor", results["metrics"]["rtf"],
+                     help_text="Wall time divided by audio duration for the most recent batch")
+        registry.set("batch_peak_rss_bytes", monitor.peak_bytes,
+                     help_text="Peak process RSS during the most recent batch")
+        
+        logger.info(f"📊 Batch processing completed: {results['processed']} processed, "
+                    f"{results['failed']} failed in {total_time:.2f} seconds "
+                    f"(RTF {results['metrics']['rtf']:.3f}, "
+                    f"peak RSS {results['metrics']['peak_rss_mb']:.0f} MB)")
+        logger.info(f"📄 Results: {results_path}")
+        
+        return results
+    
+    def _record_batch_success(self, audio_file: str, file_results: Dict[str, Any], sink,
+                              results: Dict[str, Any], totals: Dict[str, Any]):
+        """Stream a finished file's results and add its metrics to the batch totals."""
+        file_metrics = file_results.get("metrics", {})
+        totals["audio_duration"] += file_metrics.get("audio_duration", 0.0)
+        for name, entry in file_metrics.get("stages", {}).items():
+            total = totals["stages"].setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0})
+            total["wall_time"] += entry["wall_time"]
+            total["cpu_time"] += entry["cpu_time"]
+        
+        sink.write({
+            "file": audio_file,
+            "status": "success",
+            "results": file_results
+        })
+        results["processed"] += 1
+    
+    def _record_batch_failure(self, audio_file: str, error: Exception, sink, results: Dict[str, Any]):
+        """Stream a failed file's error and keep it in the batch summary."""
+        logger.error(f"❌ Failed to process {audio_file}: {error}")
+        failure = {
+            "file": audio_file,
+            "status": "failed",
+            "error": str(error)
+        }
+        sink.write(failure)
+        results["failures"].append(failure)
+        results["failed"] += 1
+    
+    def _batch_stagewise(self, audio_files, output_dir: Path, sink,
+                         results: Dict[str, Any], totals: Dict[str, Any]):
+        """
+        Run every file through one stage before moving on to the next.
         
-        print(f"\n📊 Batch processing completed:")
-        print(f"   ✅ Processed: {results['processed']} files")
-        print(f"   ❌ Failed: {results['failed']} files")
-        print(f"   ⏱️  Total time: {total_time:.2f} seconds")
+        Only one model is needed at a time, so each is loaded once per batch
+        instead of once per file when the budget cannot hold all of them.
+        Only transcripts are kept between stages, never decoded audio, and
+        decoding still waits for admission. With ``models.deadline_seconds``,
+        each file's models are selected when it is transcribed, against the
+        time spent on that file itself.
+        """
+        self.load_models()
+        
+        jobs = []
+        deadline = self.config.models.deadline_seconds
+        for audio_file in audio_files:
+            file_results = self._new_results(audio_file)
+            if deadline:
+                file_results["model_selection"] = {"deadline_seconds": deadline}
+            jobs.append({
+                "file": audio_file,
+                "output": str(output_dir / f"{Path(audio_file).stem}_results.json"),
+                "results": file_results,
+                "stages": StageTimer(track_memory=True),
+                "audio_duration": 0.0,
+                "error": None
+            })
         
-        return results
\ No newline at end of file
+        def run_stage(name, fn, batch_fn=None):
+            logger.info(f"🔁 Stage-wise batch: {name} for {len(jobs)} files")
+            self._stage_models = {}
+            try:
+                pending = [job for job in jobs if job["error"] is None]
+                if batch_fn is not None and len(pending) > 1:
+                    try:
+                        batch_fn(pending)
+                        pending = []
+                    except Exception as e:
+                        logger.warning(f"⚠️  Batched {name} failed ({e}); retrying file by file")
+                for job in pending:
+                    try:
+                        fn(job)
+                    except Exception as e:
+                        job["error"] = e
+            finally:
+                held, self._stage_models = self._stage_models, None
+                for component in held.values():
+                    component.release_model()
+        
+        def transcribe(job):
+            file_path = job["file"]
+            with self._admitted(file_path, lambda: self.estimate_audio_seconds(file_path), job["stages"]):
+                job["audio_duration"] = self._run_speech_to_text(job["results"], job["stages"])
+        
+        run_stage("speech-to-text", transcribe)
+        
+        def summary_input(job):
+            # Extracted once, so a failed batch's per-file retry does not extract again
+            if "summary_input" not in job:
+                job["summary_input"] = self._summary_input(job["results"], job["stages"])
+            return job["summary_input"]
+        
+        def summarize(job):
+            self._summarize(job["results"], job["stages"], summary_input(job))
+        
+        def summarize_batch(pending):
+            self._run_summarization_batch([(job["results"], job["stages"], summary_input(job)) for job in pending])
+        
+        run_stage("summarization", summarize, summarize_batch)
+        run_stage("classification", lambda job: self._run_classification(job["results"], job["stages"]))
+        
+        for job in jobs:
+            if job["error"] is None:
+                try:
+                    self._complete(job["results"], job["stages"], job["audio_duration"],
+                                   job["stages"].total_wall_time, 0, job["output"])
+                    self._record_batch_success(job["file"], job["results"], sink, results, totals)
+                    continue
+                except Exception as e:
+                    job["error"] = e
+            
+            self._fail(job["results"], job["error"])
+            self._record_batch_failure(job["file"], job["error"], sink, results)
@@ -0,0 +1,6 @@
+"""
+Service Module
+
+Long-running processing modes: the distributed batch coordinator and its workers,
+and the warm worker daemon for single-file runs.
+"""
@@ -0,0 +1,347 @@
+"""
+Batch Coordinator
+
+Hands out audio files to remote workers as time-limited leases.
+
+Workers ask the coordinator for a lease, keep it alive with heartbeats while
+the pipeline runs and report the result when done. A lease whose worker stops
+sending heartbeats expires and its file goes back into the queue, so a crashed
+or partitioned worker never loses work.
+"""
+
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.service.protocol import decode_message, encode_message, parse_address
+from src.utils.file_utils import FileUtils
+from src.utils.logger import get_logger
+from src.utils.results_sink import JSONLResultsSink
+
+logger = get_logger(__name__)
+
+# Seconds without a heartbeat before a lease is reassigned
+DEFAULT_HEARTBEAT_TIMEOUT = 30.0
+
+# How many times a file is leased out before it is reported as failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+@dataclass
+class Lease:
+    """A file handed out to a worker."""
+    lease_id: str
+    file: str
+    output: str
+    worker: str
+    attempt: int
+    expires_at: float
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads JSON lines from a connection and answers each one."""
+    
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.coordinator.handle(decode_message(line))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(encode_message(response))
+            self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Coordinator:
+    """
+    Distributes audio files to workers and collects their results.
+    """
+    
+    def __init__(self, audio_files: List[str], output_directory: str,
+                 heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, results_path: str = None):
+        """
+        Initialize the coordinator.
+        
+        Args:
+            audio_files (List[str]): Audio files to process
+            output_directory (str): Directory workers write results into
+            heartbeat_timeout (float): Seconds without a heartbeat before a lease expires
+            max_attempts (int): Maximum number of leases handed out per file
+            results_path (str): JSONL file for per-file results
+                (default: ``<output_directory>/batch_results.jsonl``)
+        """
+        self.output_directory = Path(output_directory)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_attempts = max_attempts
+        
+        self._lock = threading.Condition()
+        self._pending = deque((str(f), 1) for f in audio_files)
+        self._leases: Dict[str, Lease] = {}
+        self._workers_seen = set()
+        self._workers_released = set()
+        self._server = None
+        self._sink = None
+        
+        self.results_path = results_path or str(self.output_directory / "batch_results.jsonl")
+        self.results = {
+            "processed": 0,
+            "failed": 0,
+            "reassigned": 0,
+            "failures": [],
+            "results_path": self.results_path,
+            "start_time": datetime.now().isoformat(),
+            "end_time": "",
+            "total_duration": 0
+        }
+        self._remaining = len(self._pending)
+        self._start = time.time()
+    
+    @classmethod
+    def from_directory(cls, input_directory: str, output_directory: str, **kwargs) -> "Coordinator":
+        """
+        Create a coordinator for all audio files in a directory.
+        
+        Args:
+            input_directory (str): Directory containing audio files
+            output_directory (str): Directory to save results
+            **kwargs: Extra coordinator options
+        
+        Returns:
+            Coordinator: Coordinator with every audio file queued
+        """
+        if not Path(input_directory).exists():
+            raise FileNotFoundError(f"Input directory not found: {input_directory}")
+        return cls(FileUtils.list_audio_files(input_directory), output_directory, **kwargs)
+    
+    @property
+    def done(self) -> bool:
+        """Whether every file has either succeeded or failed."""
+        with self._lock:
+            return self._remaining == 0
+    
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a single protocol request.
+        
+        Args:
+            message (Dict[str, Any]): Decoded request
+        
+        Returns:
+            Dict[str, Any]: Response message
+        """
+        op = message.get("op")
+        worker = str(message.get("worker", "anonymous"))
+        
+        with self._lock:
+            self._workers_seen.add(worker)
+            self._expire_leases()
+            
+            if op == "lease":
+                return self._grant_lease(worker)
+            if op == "heartbeat":
+                return self._heartbeat(worker)
+            if op == "complete":
+                return self._complete(worker, message)
+            if op == "status":
+                return {"ok": True, "status": self._status()}
+        
+        return {"ok": False, "error": f"Unknown operation: {op}"}
+    
+    def _grant_lease(self, worker: str) -> Dict[str, Any]:
+        if not self._pending:
+            if self._remaining == 0:
+                self._workers_released.add(worker)
+                self._lock.notify_all()
+            return {
+                "ok": True,
+                "lease": None,
+                "done": self._remaining == 0,
+                "retry_after": self.heartbeat_timeout / 4
+            }
+        
+        file, attempt = self._pending.popleft()
+        lease = Lease(
+            lease_id=uuid.uuid4().hex,
+            file=file,
+            output=str(self.output_directory / f"{Path(file).stem}_results.json"),
+            worker=worker,
+            attempt=attempt,
+            expires_at=time.monotonic() + self.heartbeat_timeout
+        )
+        self._leases[lease.lease_id] = lease
+        
+        logger.debug(f"Leased {file} to {worker} (attempt {attempt})")
+        return {
+            "ok": True,
+            "lease": {"lease_id": lease.lease_id, "file": lease.file, "output": lease.output},
+            "heartbeat_interval": self.heartbeat_timeout / 3
+        }
+    
+    def _heartbeat(self, worker: str) -> Dict[str, Any]:
+        expires_at = time.monotonic() + self.heartbeat_timeout
+        active = []
+        for lease in self._leases.values():
+            if lease.worker == worker:
+                lease.expires_at = expires_at
+                active.append(lease.lease_id)
+        return {"ok": True, "leases": active}
+    
+    def _complete(self, worker: str, message: Dict[str, Any]) -> Dict[str, Any]:
+        lease = self._leases.get(message.get("lease_id"))
+        if lease is None or lease.worker != worker:
+            # The lease expired and the file was handed to someone else
+            return {"ok": False, "error": "Unknown or expired lease"}
+        
+        del self._leases[lease.lease_id]
+        
+        if message.get("status") == "success":
+            self._record(lease.file, "success", results=message.get("results"))
+        else:
+            self._record(lease.file, "failed", error=message.get("error", "unknown error"))
+        return {"ok": True}
+    
+    def _record(self, file: str, status: str, results: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None):
+        entry = {"file": file, "status": status}
+        if status == "success":
+            entry["results"] = results
+            self.results["processed"] += 1
+        else:
+            entry["error"] = error
+            self.results["failed"] += 1
+            self.results["failures"].append(entry)
+            logger.error(f"Failed to process {file}: {error}")
+        
+        if self._sink is None:
+            self._sink = JSONLResultsSink(self.results_path)
+        self._sink.write(entry)
+        self._remaining -= 1
+        self._lock.notify_all()
+    
+    def _expire_leases(self):
+        now = time.monotonic()
+        expired = [lease for lease in self._leases.values() if lease.expires_at <= now]
+        
+        for lease in expired:
+            del self._leases[lease.lease_id]
+            self.results["reassigned"] += 1
+            
+            if lease.attempt >= self.max_attempts:
+                self._record(lease.file, "failed",
+                             error=f"Lease expired {lease.attempt} times (last worker: {lease.worker})")
+            else:
+                logger.warning(f"Lease on {lease.file} held by {lease.worker} expired; requeueing")
+                # Retried files go to the front so a stuck file doesn't wait behind the whole queue
+                self._pending.appendleft((lease.file, lease.attempt + 1))
+    
+    def _status(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "leased": len(self._leases),
+            "remaining": self._remaining,
+            "processed": self.results["processed"],
+            "failed": self.results["failed"],
+            "workers": len(self._workers_seen)
+        }
+    
+    def serve(self, address: str, linger: float = None) -> Dict[str, Any]:
+        """
+        Serve leases on the given address until every file is finished.
+        
+        After the last file completes the coordinator keeps answering for up to
+        ``linger`` seconds so that polling workers learn the batch is done.
+        
+        Args:
+            address (str): ``host:port`` or ``unix:/path/to.sock``
+            linger (float): Seconds to keep serving after completion
+                (defaults to the heartbeat timeout)
+        
+        Returns:
+            Dict[str, Any]: Batch processing summary
+        """
+        self.start(address)
+        linger = self.heartbeat_timeout if linger is None else linger
+        
+        try:
+            with self._lock:
+                while self._remaining > 0:
+                    self._lock.wait(timeout=min(1.0, self.heartbeat_timeout / 4))
+                    self._expire_leases()
+                
+                deadline = time.monotonic() + linger
+                while self._workers_seen - self._workers_released:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._lock.wait(timeout=timeout)
+        finally:
+            self.stop()
+        
+        return self.summary()
+    
+    def start(self, address: str):
+        """
+        Start the socket server in a background thread.
+        
+        Args:
+            address (str): ``host:port`` or ``unix:/path/to.sock``
+        """
+        family, target = parse_address(address)
+        
+        if family == socket.AF_UNIX:
+            Path(target).unlink(missing_ok=True)
+            self._server = _UnixServer(target, _RequestHandler)
+        else:
+            self._server = _TCPServer(target, _RequestHandler)
+        
+        self._server.coordinator = self
+        self.address = address
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        
+        logger.info(f"Coordinator listening on {address} with {self._remaining} files queued")
+    
+    def stop(self):
+        """Stop the socket server."""
+        if self._server is None:
+            return
+        
+        self._server.shutdown()
+        self._server.server_close()
+        
+        if self._sink is not None:
+            self._sink.close()
+        
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            Path(target).unlink(missing_ok=True)
+        self._server = None
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the batch summary in the same shape as ``batch_process``.
+        
+        Returns:
+            Dict[str, Any]: Batch processing summary
+        """
+        with self._lock:
+            self.results["end_time"] = datetime.now().isoformat()
+            self.results["total_duration"] = time.time() - self._start
+            return dict(self.results)
@@ -0,0 +1,94 @@
+"""
+Service Protocol
+
+Newline-delimited JSON messages over TCP or Unix stream sockets.
+
+Addresses are written as ``host:port`` for TCP or ``unix:/path/to.sock`` for
+Unix domain sockets. Every request is a single JSON object on one line and is
+answered by a single JSON object on one line.
+"""
+
+import json
+import socket
+from typing import Any, Dict, Tuple, Union
+
+Address = Union[str, Tuple[str, int]]
+
+# Default socket timeout for a single request/response exchange
+DEFAULT_TIMEOUT = 30.0
+
+
+def parse_address(address: str) -> Tuple[int, Address]:
+    """
+    Parse an address string into a socket family and address.
+    
+    Args:
+        address (str): ``host:port`` or ``unix:/path/to.sock``
+    
+    Returns:
+        Tuple[int, Address]: Socket family and address usable with ``connect``/``bind``
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid address (expected host:port or unix:/path): {address}")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """
+    Encode a message as a single JSON line.
+    
+    Args:
+        message (Dict[str, Any]): Message to encode
+    
+    Returns:
+        bytes: UTF-8 encoded JSON terminated by a newline
+    """
+    return (json.dumps(message, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    """
+    Decode a single JSON line into a message.
+    
+    Args:
+        line (bytes): Raw line received from the socket
+    
+    Returns:
+        Dict[str, Any]: Decoded message
+    """
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Protocol messages must be JSON objects")
+    return message
+
+
+def send_request(address: str, message: Dict[str, Any],
+                 timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Any]:
+    """
+    Send one request and wait for its response.
+    
+    Args:
+        address (str): Server address
+        message (Dict[str, Any]): Request message
+        timeout (float): Socket timeout in seconds
+    
+    Returns:
+        Dict[str, Any]: Response message
+    """
+    family, target = parse_address(address)
+    
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(target)
+        sock.sendall(encode_message(message))
+        
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    
+    if not line:
+        raise ConnectionError(f"No response from {address}")
+    return decode_message(line)
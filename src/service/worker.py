@@ -0,0 +1,187 @@
+"""
+Batch Worker
+
+Pulls file leases from a coordinator and runs them through a warm pipeline.
+"""
+
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.service.protocol import send_request
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Consecutive connection failures tolerated before the worker gives up
+MAX_CONNECT_FAILURES = 10
+
+
+class Worker:
+    """
+    Processes leased files until the coordinator reports the batch is done.
+    """
+    
+    def __init__(self, address: str, pipeline=None, config=None, worker_id: str = None):
+        """
+        Initialize the worker.
+        
+        Args:
+            address (str): Coordinator address (``host:port`` or ``unix:/path``)
+            pipeline: Pipeline used to process files (created from ``config`` if omitted)
+            config: Configuration object for a newly created pipeline
+            worker_id (str): Identifier reported to the coordinator
+        """
+        self.address = address
+        self.pipeline = pipeline
+        self.config = config
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{id(self):x}"
+        
+        self.heartbeat_interval = 10.0
+        self._holding_lease = threading.Event()
+        self._stopped = threading.Event()
+        self.stats = {"processed": 0, "failed": 0, "rejected": 0}
+        # Whether the coordinator reported the batch done (False after losing contact)
+        self.finished = False
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Run the lease/process/report loop.
+        
+        Returns:
+            Dict[str, Any]: Counts of processed, failed and rejected files
+        """
+        if self.pipeline is None:
+            from src.pipeline import AudioProcessingPipeline
+            self.pipeline = AudioProcessingPipeline(self.config)
+        
+        # Load models once up front so every lease runs on a warm pipeline
+        self.pipeline.load_models()
+        
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        
+        try:
+            while True:
+                response = self._request({"op": "lease"})
+                if response is None:
+                    logger.error(f"Lost contact with coordinator at {self.address}")
+                    break
+                
+                lease = response.get("lease")
+                if lease is None:
+                    if response.get("done"):
+                        self.finished = True
+                        break
+                    time.sleep(response.get("retry_after", 1.0))
+                    continue
+                
+                self.heartbeat_interval = response.get("heartbeat_interval", self.heartbeat_interval)
+                self._process_lease(lease)
+        finally:
+            self._stopped.set()
+            self._holding_lease.set()
+            heartbeat.join()
+        
+        logger.info(f"Worker {self.worker_id} finished: {self.stats}")
+        return self.stats
+    
+    def _process_lease(self, lease: Dict[str, Any]):
+        report = {"op": "complete", "lease_id": lease["lease_id"]}
+        
+        self._holding_lease.set()
+        try:
+            results = self.pipeline.process_audio_file(lease["file"], lease["output"])
+            # Completing the lease tells the coordinator the output is safely on disk
+            self.pipeline.flush_results()
+            report.update(status="success", results=results)
+            self.stats["processed"] += 1
+        except Exception as e:
+            report.update(status="failed", error=str(e))
+            self.stats["failed"] += 1
+        finally:
+            self._holding_lease.clear()
+        
+        response = self._request(report)
+        if response is not None and not response.get("ok"):
+            # Our lease expired while we were working; another worker owns the file now
+            logger.warning(f"Result for {lease['file']} rejected: {response.get('error')}")
+            self.stats["rejected"] += 1
+    
+    def _heartbeat_loop(self):
+        while not self._stopped.is_set():
+            self._holding_lease.wait()
+            if self._stopped.is_set():
+                break
+            self._request({"op": "heartbeat"}, retries=1)
+            self._stopped.wait(self.heartbeat_interval)
+    
+    def _request(self, message: Dict[str, Any], retries: int = MAX_CONNECT_FAILURES) -> Optional[Dict[str, Any]]:
+        message = dict(message, worker=self.worker_id)
+        delay = 0.1
+        
+        for _ in range(retries):
+            try:
+                return send_request(self.address, message)
+            except (ConnectionError, FileNotFoundError, socket.timeout) as e:
+                logger.debug(f"Coordinator request failed: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+        return None
+
+
+def _run_worker_process(address: str, config, worker_index: int, worker_count: int) -> int:
+    """Run one worker; returns its exit code (1 if it lost the coordinator before the batch was done)."""
+    from config.settings import load_config
+    from src.utils.runtime import configure_runtime
+    
+    config = config if config is not None else load_config()
+    configure_runtime(config.models, workers=worker_count, worker_index=worker_index)
+    
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{worker_index}"
+    worker = Worker(address, config=config, worker_id=worker_id)
+    worker.run()
+    return 0 if worker.finished else 1
+
+
+def _worker_process_main(address: str, config, worker_index: int, worker_count: int):
+    sys.exit(_run_worker_process(address, config, worker_index, worker_count))
+
+
+def run_workers(address: str, count: int = 1, config=None) -> int:
+    """
+    Run one or more worker processes against a coordinator.
+    
+    Each process loads its own models once and keeps them warm for the
+    duration of the batch. The configured core budget is split between the
+    processes so they do not oversubscribe the CPU.
+    
+    Args:
+        address (str): Coordinator address
+        count (int): Number of worker processes
+        config: Configuration object passed to each worker's pipeline
+    
+    Returns:
+        int: Number of worker processes that exited with an error or lost the coordinator
+    """
+    if count <= 1:
+        try:
+            return _run_worker_process(address, config, 0, 1)
+        except Exception as e:
+            logger.error(f"❌ Worker failed: {e}")
+            return 1
+    
+    processes = [
+        multiprocessing.Process(target=_worker_process_main, args=(address, config, i, count))
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    
+    return sum(1 for process in processes if process.exitcode != 0)
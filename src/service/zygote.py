@@ -0,0 +1,444 @@
+"""
+Warm Worker Daemon
+
+Loads models once and forks a copy-on-write child per job for near-instant CLI runs.
+
+The daemon imports torch and loads every model a single time, then waits on
+a Unix socket. Each ``process`` request is handled by a child forked from
+that warm parent: the child shares the loaded weights with the parent
+copy-on-write, runs the pipeline on one file, answers with the results and
+exits. A command-line invocation therefore only pays for a Python start-up,
+a socket round trip and the actual processing.
+
+Forking is only safe on the CPU (CUDA and MPS contexts do not survive
+``fork``); on other devices the daemon runs jobs on threads over the same
+warm pipeline instead.
+"""
+
+import gc
+import heapq
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.service.protocol import decode_message, encode_message
+from src.utils.admission import AdmissionController, Ticket
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds a client waits for the daemon to accept before processing in-process
+CONNECT_TIMEOUT = 1.0
+
+# Seconds the daemon waits for a connected client to send its request
+REQUEST_TIMEOUT = 10.0
+
+# How often the accept loop wakes up to reap children and check for shutdown
+POLL_INTERVAL = 0.5
+
+# Model settings that only affect speed, so a daemon may differ from its clients in them
+RUNTIME_FIELDS = ("device", "cpu_cores", "interop_threads", "pin_cpus",
+                  "memory_budget_mb", "stagewise_batch")
+
+# Storage settings that change results: where earlier results, state and duplicates come from
+STORAGE_FIELDS = ("results_db", "incremental_state_dir", "fingerprint_db", "fingerprint_threshold")
+
+
+def default_socket_path() -> str:
+    """
+    Get the per-user daemon socket path used when none is configured.
+    
+    Returns:
+        str: Socket path in the system temp directory
+    """
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"acs-zygote-{uid}.sock")
+
+
+def job_settings(config) -> Dict[str, Any]:
+    """
+    Collect the settings that change results.
+    
+    A client only hands a job to a daemon configured with the same settings,
+    so using the daemon never changes what an invocation produces.
+    
+    Args:
+        config (AppConfig): Configuration
+    
+    Returns:
+        Dict[str, Any]: JSON-compatible audio, model, processing and storage settings
+    """
+    models = {k: v for k, v in asdict(config.models).items() if k not in RUNTIME_FIELDS}
+    storage = {}
+    for name in STORAGE_FIELDS:
+        value = getattr(config.storage, name)
+        # Client and daemon may run in different directories
+        storage[name] = os.path.abspath(value) if isinstance(value, str) and value else value
+    return {"audio": asdict(config.audio), "models": models, "processing": asdict(config.processing),
+            "storage": storage}
+
+
+def submit_job(config, audio_file: str, output_path: str = None, source_id: str = None,
+               socket_path: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Process a file on the warm worker daemon if one is running.
+    
+    Args:
+        config (AppConfig): Configuration of the calling process
+        audio_file (str): Audio file to process
+        output_path (str): Where the results are saved
+        source_id (str): Process the file incrementally as this growing recording
+        socket_path (str): Daemon socket (defaults to the configured one)
+    
+    Returns:
+        Optional[Dict[str, Any]]: Processing results, or None if no compatible
+            daemon is running and the caller should process the file itself
+    
+    Raises:
+        RuntimeError: If the daemon accepted the job and processing failed
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = socket_path or config.service.zygote_socket or default_socket_path()
+    message = {
+        "op": "process",
+        "audio_file": os.path.abspath(audio_file),
+        "output_path": os.path.abspath(output_path) if output_path else None,
+        "source_id": source_id,
+        "settings": job_settings(config)
+    }
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+            return None
+        
+        # Processing takes as long as it takes once the daemon has the job
+        sock.settimeout(None)
+        sock.sendall(encode_message(message))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    
+    if not line:
+        raise RuntimeError(f"Warm worker daemon at {socket_path} closed the connection")
+    response = decode_message(line)
+    if response.get("fallback"):
+        logger.info(f"Warm worker daemon not used: {response['error']}")
+        return None
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    
+    logger.debug(f"Processed by warm worker daemon (pid {response['pid']})")
+    return response["results"]
+
+
+def request_daemon(op: str, config=None, socket_path: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Send a control request (``status`` or ``shutdown``) to the daemon.
+    
+    Args:
+        op (str): Request type
+        config (AppConfig): Configuration naming the socket
+        socket_path (str): Daemon socket (overrides the configuration)
+    
+    Returns:
+        Optional[Dict[str, Any]]: The daemon's answer, or None if it is not running
+    """
+    if config is not None:
+        socket_path = socket_path or config.service.zygote_socket
+    socket_path = socket_path or default_socket_path()
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+            return None
+        sock.sendall(encode_message({"op": op}))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    return decode_message(line) if line else None
+
+
+class WarmWorkerDaemon:
+    """
+    Serves processing jobs from a pipeline whose models are loaded once.
+    """
+    
+    def __init__(self, config=None, socket_path: str = None, max_children: int = None,
+                 pipeline=None):
+        """
+        Initialize the daemon.
+        
+        Args:
+            config (AppConfig): Configuration (loaded from the environment if omitted)
+            socket_path (str): Unix socket to listen on (defaults to the configured one)
+            max_children (int): Jobs run at the same time (defaults to the configured limit)
+            pipeline: Pipeline to serve (created from ``config`` if omitted)
+        """
+        if config is None:
+            from config.settings import load_config
+            config = load_config()
+        
+        self.config = config
+        self.socket_path = socket_path or config.service.zygote_socket or default_socket_path()
+        self.max_children = max(1, max_children or config.service.zygote_max_children)
+        self.pipeline = pipeline
+        self.forking = False
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0}
+        
+        # Runtime setup only applies to a pipeline this daemon builds itself
+        self._owns_pipeline = pipeline is None
+        self._settings = decode_message(encode_message(job_settings(config)))
+        self._children: Dict[int, float] = {}
+        # Worker indices of running children; a slot is only handed out again once its child is reaped
+        self._free_slots = list(range(self.max_children))
+        self._child_slots: Dict[int, int] = {}
+        # Forked children run outside any one pipeline, so the daemon admits their audio
+        self.admission = AdmissionController.from_config(config.service)
+        self._tickets: Dict[int, Ticket] = {}
+        self._slots = threading.BoundedSemaphore(self.max_children)
+        self._stats_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.ready = threading.Event()
+    
+    def serve(self):
+        """
+        Load the models and answer requests until ``stop`` or a shutdown request.
+        """
+        from src.utils.runtime import RuntimePlan, apply_runtime, configure_runtime, resolve_device
+        
+        device = resolve_device(self.config.models.device) if self._owns_pipeline else "cpu"
+        self.forking = hasattr(os, "fork") and device == "cpu"
+        if self._owns_pipeline:
+            if self.forking:
+                # Load on one thread so no thread pool is running at fork time;
+                # each child sizes its own pool for its share of the cores
+                apply_runtime(RuntimePlan(device=device, threads=1, interop_threads=1))
+            else:
+                configure_runtime(self.config.models)
+            from src.pipeline import AudioProcessingPipeline
+            self.pipeline = AudioProcessingPipeline(self.config)
+        
+        start = time.perf_counter()
+        self.pipeline.load_models()
+        logger.info(f"🔥 Models loaded in {time.perf_counter() - start:.1f}s")
+        
+        if self.forking:
+            # Keep the loaded objects out of the collector's reach so children
+            # do not copy every page the parent shares just to mark them
+            gc.collect()
+            gc.freeze()
+        
+        listener = self._listen()
+        previous_handlers = self._install_signal_handlers()
+        mode = f"forking up to {self.max_children} children" if self.forking else \
+            f"{self.max_children} job threads"
+        logger.info(f"🧬 Warm worker daemon listening on {self.socket_path} ({mode})")
+        self.ready.set()
+        
+        try:
+            while not self._stopped.is_set():
+                self._reap()
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    if self._stopped.is_set():
+                        break
+                    raise
+                self._handle(conn, listener)
+        finally:
+            listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            self._reap(wait=True)
+            if self.forking:
+                gc.unfreeze()
+            logger.info(f"Warm worker daemon stopped: {self.stats}")
+    
+    def stop(self):
+        """Stop accepting jobs; running jobs are waited for."""
+        self._stopped.set()
+    
+    def _listen(self) -> socket.socket:
+        Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+        if request_daemon("status", socket_path=self.socket_path) is not None:
+            raise RuntimeError(f"A warm worker daemon is already listening on {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        # Jobs read and write files as the daemon's user, so only that user may submit them
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(64)
+        listener.settimeout(POLL_INTERVAL)
+        return listener
+    
+    def _install_signal_handlers(self) -> Dict[int, Any]:
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, lambda *_: self.stop())
+        return previous
+    
+    def _handle(self, conn: socket.socket, listener: socket.socket):
+        """Read one request and answer it, starting a job for ``process`` requests."""
+        try:
+            conn.settimeout(REQUEST_TIMEOUT)
+            with conn.makefile("rb") as reader:
+                line = reader.readline()
+            message = decode_message(line)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Dropped malformed daemon request: {e}")
+            conn.close()
+            return
+        
+        op = message.get("op")
+        if op == "process":
+            if message.get("settings") != self._settings:
+                self._count("rejected")
+                self._reply(conn, {"ok": False, "fallback": True,
+                                   "error": "daemon runs with different model or processing settings"})
+            elif self.forking:
+                self._fork_job(conn, message, listener)
+            else:
+                self._slots.acquire()
+                threading.Thread(target=self._thread_job, args=(conn, message), daemon=True).start()
+            return
+        
+        if op == "status":
+            self._reply(conn, {"ok": True, "pid": os.getpid(), "forking": self.forking,
+                               "running": len(self._children), "stats": dict(self.stats),
+                               "admission": self.admission.snapshot()})
+        elif op == "shutdown":
+            self._reply(conn, {"ok": True})
+            self.stop()
+        else:
+            self._reply(conn, {"ok": False, "error": f"Unknown op: {op}"})
+    
+    def _fork_job(self, conn: socket.socket, message: Dict[str, Any], listener: socket.socket):
+        ticket = self._reserve(message)
+        while len(self._children) >= self.max_children:
+            self._reap(block=True)
+        slot = heapq.heappop(self._free_slots)
+        
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                listener.close()
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    signal.signal(signum, signal.SIG_DFL)
+                try:
+                    self._prepare_child(slot)
+                    response = self._run_job(message)
+                except Exception as e:
+                    response = {"ok": False, "error": str(e), "pid": os.getpid()}
+                code = 0 if response["ok"] else 1
+                self._reply(conn, response)
+            finally:
+                os._exit(code)
+        
+        conn.close()
+        self._children[pid] = time.time()
+        self._child_slots[pid] = slot
+        if ticket is not None:
+            self._tickets[pid] = ticket
+    
+    def _reserve(self, message: Dict[str, Any]) -> Optional[Ticket]:
+        """
+        Reserve a forked job's audio in the daemon's admission budget.
+        
+        Children only finish while the accept loop reaps them, so the loop
+        waits here until the job fits; later clients queue in the listen backlog.
+        """
+        if not self.admission.enabled:
+            return None
+        audio_file = message["audio_file"]
+        audio_seconds = self.pipeline.estimate_audio_seconds(audio_file) if os.path.exists(audio_file) else 0.0
+        ticket = self.admission.acquire(audio_seconds, audio_file, block=False)
+        while ticket is None:
+            self._reap(block=True)
+            ticket = self.admission.acquire(audio_seconds, audio_file, block=False)
+        return ticket
+    
+    def _prepare_child(self, slot: int):
+        """Give a freshly forked child its own threads and database connections."""
+        if self._owns_pipeline:
+            from src.utils.runtime import configure_runtime
+            configure_runtime(self.config.models, workers=self.max_children, worker_index=slot)
+        classifier = getattr(self.pipeline, "classifier", None)
+        if classifier is not None and hasattr(classifier, "reopen_cache"):
+            classifier.reopen_cache()
+    
+    def _thread_job(self, conn: socket.socket, message: Dict[str, Any]):
+        try:
+            response = self._run_job(message)
+            self._count("completed" if response["ok"] else "failed")
+            self._reply(conn, response)
+        finally:
+            self._slots.release()
+    
+    def _run_job(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        audio_file = message["audio_file"]
+        try:
+            if message.get("source_id"):
+                results = self.pipeline.process_incremental(
+                    audio_file, message["source_id"], message.get("output_path")
+                )
+            else:
+                results = self.pipeline.process_audio_file(audio_file, message.get("output_path"))
+            # The client reads the output file as soon as we answer (and a child exits right after)
+            self.pipeline.flush_results()
+        except Exception as e:
+            logger.error(f"❌ Daemon job {audio_file} failed: {e}")
+            return {"ok": False, "error": str(e), "pid": os.getpid()}
+        return {"ok": True, "results": results, "pid": os.getpid()}
+    
+    def _reap(self, block: bool = False, wait: bool = False):
+        """Collect exited children; ``block`` waits for one, ``wait`` for all."""
+        while self._children:
+            for pid in list(self._children):
+                try:
+                    done, status = os.waitpid(pid, 0 if wait else os.WNOHANG)
+                except ChildProcessError:
+                    done, status = pid, 1
+                if done:
+                    del self._children[pid]
+                    heapq.heappush(self._free_slots, self._child_slots.pop(pid))
+                    ticket = self._tickets.pop(pid, None)
+                    if ticket is not None:
+                        self.admission.release(ticket)
+                    self._count("completed" if os.waitstatus_to_exitcode(status) == 0 else "failed")
+                    block = False
+            if not block:
+                return
+            time.sleep(0.01)
+    
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+    
+    @staticmethod
+    def _reply(conn: socket.socket, response: Dict[str, Any]):
+        try:
+            conn.settimeout(None)
+            conn.sendall(encode_message(response))
+        except OSError as e:
+            logger.debug(f"Client went away before the daemon answered: {e}")
+        finally:
+            conn.close()
@@ -0,0 +1,245 @@
+"""
+Extractive Compression Module
+
+Selects the most salient transcript sentences before abstractive summarization.
+"""
+
+import re
+from collections import Counter
+from typing import List
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Conversational words that carry no topic signal
+STOPWORDS = frozenset("""
+a about all also am an and any are as at be because been but by can could did do does
+don't for from get got had has have he her him his how i i'm if in into is it it's just
+know like me my no not of oh ok okay on one or our out really right so some that that's
+the their them then there they this to um uh up us was we well were what when which who
+will with would yeah yes you your
+""".split())
+
+# Above this many sentences the n x n TextRank graph is replaced by centroid scoring
+MAX_GRAPH_SENTENCES = 3000
+
+# Most document-frequent terms kept as TF-IDF features
+MAX_FEATURES = 2048
+
+DAMPING = 0.85
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences at ``.``, ``!`` and ``?`` followed by whitespace.
+    
+    Args:
+        text (str): Text to split
+    
+    Returns:
+        List[str]: Non-empty sentences in order
+    """
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count used for extraction budgets (whitespace words)."""
+    return len(text.split())
+
+
+class ExtractiveCompressor:
+    """
+    Keeps the highest-ranked sentences of a transcript within a token budget.
+    
+    Sentences are TF-IDF vectors; TextRank (PageRank over their cosine
+    similarity graph) or similarity to the document centroid ranks them.
+    The vectors are kept as their non-zero entries, so memory follows the
+    words in the text rather than sentences x vocabulary. The selected
+    sentences keep their original order.
+    """
+    
+    def __init__(self, ratio: float = 0.0, max_tokens: int = 0, min_tokens: int = 0,
+                 method: str = "textrank"):
+        """
+        Initialize the compressor.
+        
+        Args:
+            ratio (float): Keep this fraction of the tokens (0 = no ratio budget)
+            max_tokens (int): Keep at most this many tokens (0 = no absolute budget)
+            min_tokens (int): Leave texts with fewer tokens untouched
+            method (str): ``textrank`` or ``centroid``
+        """
+        if not ratio and not max_tokens:
+            raise ValueError("Either ratio or max_tokens must be set")
+        if not 0 <= ratio <= 1:
+            raise ValueError("ratio must be between 0 and 1")
+        if method not in ("textrank", "centroid"):
+            raise ValueError(f"Unknown method: {method}")
+        
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.min_tokens = min_tokens
+        self.method = method
+    
+    def budget(self, total_tokens: int) -> int:
+        """
+        Get the token budget for a text.
+        
+        Args:
+            total_tokens (int): Tokens in the text
+        
+        Returns:
+            int: Tokens to keep (the tighter of the ratio and absolute budgets)
+        """
+        budgets = []
+        if self.ratio:
+            budgets.append(int(total_tokens * self.ratio))
+        if self.max_tokens:
+            budgets.append(self.max_tokens)
+        return max(1, min(budgets))
+    
+    def compress(self, text: str) -> str:
+        """
+        Reduce text to its most salient sentences.
+        
+        Args:
+            text (str): Transcript
+        
+        Returns:
+            str: Selected sentences in original order (the text itself if it
+                is already within budget)
+        """
+        total_tokens = count_tokens(text)
+        budget = self.budget(total_tokens)
+        if total_tokens < self.min_tokens or total_tokens <= budget:
+            return text
+        
+        sentences = split_sentences(text)
+        if len(sentences) < 2:
+            return text
+        
+        scores = self.score_sentences(sentences)
+        lengths = [count_tokens(sentence) for sentence in sentences]
+        
+        selected, used = [], 0
+        for index in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+            if used + lengths[index] <= budget:
+                selected.append(index)
+                used += lengths[index]
+        if not selected:
+            selected = [max(range(len(sentences)), key=lambda i: scores[i])]
+        
+        compressed = " ".join(sentences[i] for i in sorted(selected))
+        logger.debug(f"Extractive compression kept {len(selected)}/{len(sentences)} sentences "
+                     f"({count_tokens(compressed)}/{total_tokens} tokens)")
+        return compressed
+    
+    def score_sentences(self, sentences: List[str]):
+        """
+        Rank sentences by salience.
+        
+        Args:
+            sentences (List[str]): Sentences of one text
+        
+        Returns:
+            numpy.ndarray: One score per sentence (higher is more salient)
+        """
+        import numpy as np
+        
+        n = len(sentences)
+        features = self._tfidf(sentences)
+        if features is None:
+            return np.ones(n, dtype=np.float32)
+        rows, cols, values = features
+        
+        if self.method == "centroid" or n > MAX_GRAPH_SENTENCES:
+            centroid = np.bincount(cols, weights=values) / n
+            norm = np.linalg.norm(centroid)
+            if not norm:
+                return np.ones(n, dtype=np.float32)
+            return np.bincount(rows, weights=values * centroid[cols] / norm, minlength=n).astype(np.float32)
+        
+        return self._textrank(self._similarities(n, rows, cols, values))
+    
+    @staticmethod
+    def _tfidf(sentences: List[str]):
+        """
+        L2-normalized TF-IDF vectors as their non-zero entries.
+        
+        Returns:
+            tuple: ``rows``, ``cols`` and ``values`` arrays, sorted by row and
+                column, or None when no term is shared by two sentences
+        """
+        import numpy as np
+        
+        tokens = [[word for word in _WORD.findall(sentence.lower()) if word not in STOPWORDS]
+                  for sentence in sentences]
+        document_frequency = Counter(word for words in tokens for word in set(words))
+        vocabulary = [word for word, df in document_frequency.most_common(MAX_FEATURES) if df > 1]
+        if not vocabulary:
+            return None
+        column = {word: i for i, word in enumerate(vocabulary)}
+        
+        keys = np.asarray([row * len(vocabulary) + column[word]
+                           for row, words in enumerate(tokens) for word in words if word in column],
+                          dtype=np.int64)
+        keys, counts = np.unique(keys, return_counts=True)
+        rows, cols = keys // len(vocabulary), keys % len(vocabulary)
+        
+        df = np.asarray([document_frequency[word] for word in vocabulary], dtype=np.float64)
+        idf = np.log((1.0 + len(sentences)) / (1.0 + df)) + 1.0
+        values = np.log1p(counts) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(sentences)))
+        return rows, cols, values / norms[rows]
+    
+    @staticmethod
+    def _similarities(n: int, rows, cols, values):
+        """
+        Cosine similarity matrix, accumulated term by term from the sparse entries.
+        
+        Each term adds the products of its weights in the sentences that
+        contain it, so only sentence pairs sharing a term are touched and no
+        dense sentences x vocabulary matrix is built.
+        
+        Args:
+            n (int): Number of sentences
+            rows, cols, values: Non-zero TF-IDF entries (see ``_tfidf``)
+        
+        Returns:
+            numpy.ndarray: n x n similarities
+        """
+        import numpy as np
+        
+        similarity = np.zeros((n, n), dtype=np.float32)
+        by_term = np.argsort(cols, kind="stable")
+        term_rows, term_values = rows[by_term], values[by_term].astype(np.float32)
+        start = 0
+        for end in np.cumsum(np.bincount(cols)):
+            members, weights = term_rows[start:end], term_values[start:end]
+            # A sentence appears once per term, so the fancy-indexed add does not lose updates
+            similarity[np.ix_(members, members)] += np.outer(weights, weights)
+            start = end
+        return similarity
+    
+    @staticmethod
+    def _textrank(similarity, iterations: int = 100, tolerance: float = 1e-6):
+        """PageRank scores over a cosine similarity matrix."""
+        import numpy as np
+        
+        n = similarity.shape[0]
+        np.fill_diagonal(similarity, 0.0)
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        # Sentences with no similar neighbour link uniformly to all others
+        transition = np.where(row_sums > 0, similarity / np.where(row_sums > 0, row_sums, 1.0), 1.0 / n)
+        
+        scores = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(iterations):
+            updated = (1.0 - DAMPING) / n + DAMPING * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < tolerance:
+                return updated
+            scores = updated
+        return scores
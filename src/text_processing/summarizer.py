@@ -4,49 +4,424 @@ Text Summarization Module
 Generates concise summaries using BART/T5 models.
 """
 
+import re
+from typing import List
+
+from src.text_processing.extractive import count_tokens, split_sentences
+from src.utils.logger import get_logger
+from src.utils.metrics import get_registry
+
+logger = get_logger(__name__)
+
+# Transcripts longer than this (in characters) are summarized chunk by chunk
+MAX_CHUNK_LENGTH = 1000
+
+# Longest text (in characters) passed to the model in one call; stays under
+# BART's 1024-token window at a conservative ~4 characters per token
+MAX_INPUT_LENGTH = 3000
+CHARS_PER_TOKEN = 4
+
+# Texts shorter than this are not worth summarizing
+MIN_TEXT_LENGTH = 50
+
+# Reduce levels allowed before the final summary, and the smallest per-piece summary
+MAX_REDUCE_DEPTH = 4
+MIN_PIECE_TOKENS = 16
+
+# Chunks summarized per model call
+BATCH_SIZE = 8
+
+# Summary tokens allowed per input token: short inputs get short generation budgets
+SUMMARY_RATIO = 0.5
+
+# A batch is closed early rather than take a text with a target this many times its smallest
+BUCKET_SPREAD = 2.0
+
+# Padding ratios (padded / total input tokens) per generation batch
+PADDING_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+
+# Hesitations, with the commas around them ("we, uh, went" -> "we went")
+_FILLERS = re.compile(r"(?:,\s*)?\b(?:u+[hm]+|e+rm|(?:hm+|mm+)(?:-hm+)?)\b(?:\s*,)?", re.IGNORECASE)
+
+# "you know" and "I mean" only where commas or sentence boundaries set them off
+# ("It was, you know, late"), never inside a clause ("Do you know where ...")
+_PHRASE_FILLERS = re.compile(r"(^|(?<=[.!?])\s+|\s*,\s*)(?:you know|i mean)\s*([,.!?]|$)", re.IGNORECASE)
+
+# Words are letters only: numbers ("555 555 1234") are never collapsed
+_WORD = r"[^\W\d_]+(?:'[^\W\d_]+)?"
+
+# A word said three or more times in a row ("no no no"); twice is often
+# grammatical ("had had", "that that")
+_REPEATED_WORD = re.compile(rf"\b({_WORD})(?:[\s,]+\1\b){{2,}}", re.IGNORECASE)
+
+# A phrase of 2-8 words said again right after itself: Whisper's looping
+# hallucinations ("Thank you. Thank you. ...") and restarts ("I think I think")
+_REPEATED_PHRASE = re.compile(rf"\b({_WORD}(?:[^\w]+{_WORD}){{1,7}}?)(?:[^\w]+\1\b)+", re.IGNORECASE)
+
+# Marks left next to each other once a filler sentence ("Hmm.") is gone
+_PUNCTUATION_RUN = re.compile(r"[,.!?](?:\s+[,.!?])+")
+
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+(?=[,.!?])")
+
+
+def _drop_phrase_filler(match) -> str:
+    """Keep a sentence-ending mark after the filler, otherwise just a space."""
+    trail = match.group(2)
+    return trail if trail and trail in ".!?" else " "
+
+
+def _merge_punctuation(match) -> str:
+    """Keep the first sentence-ending mark of a run, or a comma if there is none."""
+    stops = match.group(0).replace(",", "").split()
+    return stops[0][0] if stops else ","
+
 
 class TextSummarizer:
     """
     Handles text summarization using transformer models.
     """
     
-    def __init__(self, model_name: str = "facebook/bart-large-cnn"):
+    def __init__(self, model_name: str = "facebook/bart-large-cnn", model_manager=None,
+                 normalize: bool = False, length_buckets: bool = True):
         """
         Initialize the text summarizer.
         
         Args:
             model_name (str): Name of the summarization model
+            model_manager (ModelManager): Optional shared manager that owns the model
+            normalize (bool): Remove fillers and repetitions before summarizing
+            length_buckets (bool): Batch texts of similar length with budgets fitted to
+                them (False = batches in input order with the full budget)
         """
         self.model_name = model_name
+        self.model_manager = model_manager
+        self.normalize = normalize
+        self.length_buckets = length_buckets
         self.tokenizer = None
         self.model = None
+        self.summarizer = None
     
     def load_model(self):
         """Load the summarization model and tokenizer."""
-        pass
+        if self.summarizer is not None:
+            return
+        
+        if self.model_manager is not None:
+            self.summarizer = self.model_manager.load_summarizer_model(self.model_name)
+        else:
+            from transformers import pipeline
+            
+            logger.info("Loading summarization model...")
+            self.summarizer = pipeline("summarization", model=self.model_name)
+        
+        self.model = self.summarizer.model
+        self.tokenizer = self.summarizer.tokenizer
+    
+    def release_model(self):
+        """Drop this component's references to the model so its manager can evict it."""
+        if self.model_manager is not None:
+            self.summarizer = self.model = self.tokenizer = None
     
     def summarize_text(self, text: str, max_length: int = 150, min_length: int = 50):
         """
         Summarize the input text.
         
+        Long texts are split into chunks at sentence boundaries and the chunks
+        are summarized in batches (map). The chunk summaries are then merged
+        in window-sized groups and summarized again, level by level, until
+        they fit one model call (reduce); the final call produces the summary.
+        Per-piece budgets shrink with the number of pieces, so the depth
+        stays small even for multi-hour transcripts. Fillers and repetitions
+        are removed first (see ``preprocess_text``) unless disabled.
+        
         Args:
             text (str): Text to summarize
             max_length (int): Maximum length of summary
             min_length (int): Minimum length of summary
+        
+        Returns:
+            str: Summarized text
+        """
+        return self.summarize_texts([text], max_length, min_length)[0]
+    
+    def summarize_texts(self, texts: List[str], max_length: int = 150, min_length: int = 50) -> List[str]:
+        """
+        Summarize several transcripts, sharing the map step's batches between them.
+        
+        The chunks of every transcript (and the short transcripts themselves)
+        are generated together in batches of similar length, so one long
+        chunk does not make a batch of short ones pad and decode to its
+        length. Each transcript is then reduced on its own, as in
+        ``summarize_text``. The pipeline only passes several files at once in
+        stage-wise batches (``--stagewise``); otherwise each file is bucketed
+        on its own.
+        
+        Args:
+            texts (List[str]): Texts to summarize
+            max_length (int): Maximum length of each summary
+            min_length (int): Minimum length of each summary
+        
+        Returns:
+            List[str]: One summary per text, in input order
+        """
+        if self.normalize:
+            texts = [self._normalize(text) for text in texts]
+        
+        summaries = [None] * len(texts)
+        pieces, caps, floors, owners = [], [], [], []
+        for index, text in enumerate(texts):
+            if len(text) <= MIN_TEXT_LENGTH:
+                summaries[index] = "Audio content too short for meaningful summarization"
+                continue
+            if len(text) <= MAX_CHUNK_LENGTH:
+                pieces.append(text)
+                caps.append(30)
+                floors.append(10)
+                owners.append(index)
+                continue
             
+            # Map: summarize every chunk, batched
+            chunks = [chunk for chunk in self._pack(split_sentences(text), MAX_CHUNK_LENGTH)
+                      if len(chunk.strip()) > MIN_TEXT_LENGTH]
+            if not chunks:
+                summaries[index] = "Content too short for summarization"
+                continue
+            pieces.extend(chunks)
+            caps.extend([self._piece_budget(len(chunks), cap=100)] * len(chunks))
+            floors.extend([20] * len(chunks))
+            owners.extend([index] * len(chunks))
+        
+        if not pieces:
+            return summaries
+        
+        self.load_model()
+        chunk_summaries = {}
+        for index, piece, summary in zip(owners, pieces, self._generate_bucketed(pieces, caps, floors)):
+            if len(texts[index]) <= MAX_CHUNK_LENGTH:
+                summaries[index] = summary
+            else:
+                chunk_summaries.setdefault(index, []).append(summary)
+        
+        for index, chunk_list in chunk_summaries.items():
+            summaries[index] = self.reduce_summaries(chunk_list, max_length, min_length)
+        return summaries
+    
+    def summarize_chunks(self, chunks: List[str]) -> List[str]:
+        """
+        Summarize transcript chunks (the map step), batched.
+        
+        Args:
+            chunks (List[str]): Chunks of at most ``MAX_CHUNK_LENGTH`` characters
+        
+        Returns:
+            List[str]: One summary per chunk
+        """
+        self.load_model()
+        return self._summarize_pieces(chunks, cap=100, floor=20)
+    
+    def reduce_summaries(self, summaries: List[str], max_length: int = 150, min_length: int = 50) -> str:
+        """
+        Combine chunk summaries into the final summary (the reduce step).
+        
+        Summaries are merged in window-sized groups and summarized again until
+        they fit one model call; the final call produces the summary.
+        
+        Args:
+            summaries (List[str]): Chunk summaries in transcript order
+            max_length (int): Maximum length of summary
+            min_length (int): Minimum length of summary
+        
         Returns:
             str: Summarized text
         """
-        pass
+        if len(summaries) == 1:
+            return summaries[0]
+        
+        self.load_model()
+        depth = 0
+        while len(" ".join(summaries)) > MAX_INPUT_LENGTH and len(summaries) > 1:
+            if depth == MAX_REDUCE_DEPTH:
+                logger.warning(f"Summary still exceeds the model window after {depth} reduce "
+                               f"levels; the final pass will truncate it")
+                break
+            depth += 1
+            groups = self._pack(summaries, MAX_INPUT_LENGTH)
+            logger.debug(f"Reduce level {depth}: {len(summaries)} summaries -> {len(groups)}")
+            summaries = self._summarize_pieces(groups, cap=max_length, floor=min_length)
+        
+        combined_summary = " ".join(summaries)
+        if len(combined_summary) > 200:
+            return self._generate(combined_summary, max_length=max_length, min_length=min_length)
+        return combined_summary
+    
+    def _summarize_pieces(self, pieces: List[str], cap: int, floor: int) -> List[str]:
+        """
+        Summarize pieces of one level with a shared length budget.
+        
+        Each piece gets an equal share of one model window (at most ``cap``
+        tokens), so the next level's input shrinks even for very long texts.
+        
+        Args:
+            pieces (List[str]): Texts to summarize
+            cap (int): Largest summary length per piece
+            floor (int): Preferred minimum summary length per piece
+        
+        Returns:
+            List[str]: One summary per piece
+        """
+        budget = self._piece_budget(len(pieces), cap)
+        return self._generate_bucketed(pieces, [budget] * len(pieces), [floor] * len(pieces))
+    
+    @staticmethod
+    def _piece_budget(count: int, cap: int) -> int:
+        """Summary tokens per piece so that ``count`` summaries fit one model window."""
+        window_tokens = MAX_INPUT_LENGTH // CHARS_PER_TOKEN
+        return max(MIN_PIECE_TOKENS, min(cap, window_tokens // count))
+    
+    def _generate_bucketed(self, texts: List[str], caps: List[int], floors: List[int]) -> List[str]:
+        """
+        Summarize texts in batches of similar length, each with a budget fitted to its inputs.
+        
+        A batch pads every input to its longest one and decodes until its
+        longest summary ends, so texts are sorted by their target summary
+        length (``SUMMARY_RATIO`` of their tokens, at most their cap) and
+        each batch of up to ``BATCH_SIZE`` neighbours gets the largest target
+        in it. A batch ends early where the targets jump by ``BUCKET_SPREAD``.
+        
+        Args:
+            texts (List[str]): Texts to summarize
+            caps (List[int]): Largest summary length per text
+            floors (List[int]): Preferred minimum summary length per text
+        
+        Returns:
+            List[str]: Generated summaries in input order
+        """
+        tokens = [max(1, len(text) // CHARS_PER_TOKEN) for text in texts]
+        if self.length_buckets:
+            targets = [max(MIN_PIECE_TOKENS, min(cap, int(count * SUMMARY_RATIO)))
+                       for count, cap in zip(tokens, caps)]
+            order = sorted(range(len(texts)), key=lambda i: (targets[i], tokens[i]))
+        else:
+            targets, order = list(caps), list(range(len(texts)))
+        
+        buckets = []
+        for i in order:
+            if (not buckets or len(buckets[-1]) == BATCH_SIZE
+                    or (self.length_buckets and targets[i] > BUCKET_SPREAD * targets[buckets[-1][0]])):
+                buckets.append([])
+            buckets[-1].append(i)
+        
+        registry = get_registry()
+        summaries = [None] * len(texts)
+        for bucket in buckets:
+            max_length = max(targets[i] for i in bucket)
+            min_length = min(min(floors[i] for i in bucket), max_length // 2)
+            outputs = self._generate_batch([texts[i] for i in bucket], max_length, min_length)
+            for i, summary in zip(bucket, outputs):
+                summaries[i] = summary
+            
+            longest = max(tokens[i] for i in bucket)
+            registry.observe("summarizer_batch_padding_ratio",
+                             1 - sum(tokens[i] for i in bucket) / (longest * len(bucket)),
+                             help_text="Fraction of each summarization batch's input that is padding",
+                             buckets=PADDING_BUCKETS)
+        return summaries
+    
+    @staticmethod
+    def _pack(pieces: List[str], limit: int) -> List[str]:
+        """
+        Greedily join consecutive pieces into texts of at most ``limit`` characters.
+        
+        Pieces longer than the limit are split at word boundaries (or hard,
+        for unbroken runs), so nothing is dropped.
+        
+        Args:
+            pieces (List[str]): Sentences or summaries in order
+            limit (int): Maximum characters per packed text
+        
+        Returns:
+            List[str]: Packed texts
+        """
+        packed, current = [], ""
+        for piece in pieces:
+            while len(piece) > limit:
+                cut = piece.rfind(" ", 0, limit + 1)
+                cut = cut if cut > 0 else limit
+                head, piece = piece[:cut], piece[cut:].lstrip()
+                if current:
+                    packed.append(current)
+                    current = ""
+                packed.append(head)
+            if current and len(current) + 1 + len(piece) > limit:
+                packed.append(current)
+                current = ""
+            current = f"{current} {piece}" if current else piece
+        if current:
+            packed.append(current)
+        return packed
+    
+    def _generate(self, text: str, max_length: int, min_length: int) -> str:
+        """
+        Run the summarization model on a single piece of text.
+        
+        Args:
+            text (str): Text to summarize
+            max_length (int): Maximum length of summary
+            min_length (int): Minimum length of summary
+        
+        Returns:
+            str: Generated summary
+        """
+        return self._generate_batch([text], max_length, min_length)[0]
+    
+    def _generate_batch(self, texts: List[str], max_length: int, min_length: int) -> List[str]:
+        """
+        Run the summarization model on several texts, ``BATCH_SIZE`` per forward pass.
+        
+        Args:
+            texts (List[str]): Texts to summarize
+            max_length (int): Maximum length of each summary
+            min_length (int): Minimum length of each summary
+        
+        Returns:
+            List[str]: Generated summaries in input order
+        """
+        results = self.summarizer(
+            texts, max_length=max_length, min_length=min_length, do_sample=False,
+            batch_size=min(BATCH_SIZE, len(texts)), truncation=True
+        )
+        return [result['summary_text'] for result in results]
     
     def preprocess_text(self, text: str) -> str:
         """
         Preprocess text before summarization.
         
+        Removes hesitations ("um", "uh", ...), "you know" and "I mean" where
+        commas or sentence boundaries set them off, words said three or more
+        times in a row and phrases repeated back to back (Whisper's looping
+        hallucinations), then tidies the spacing. Numbers and words said
+        twice ("had had") are kept. Each step is one pass of a precompiled
+        regular expression, so the cost is linear in the transcript length.
+        
         Args:
             text (str): Raw text
-            
+        
         Returns:
             str: Preprocessed text
         """
-        pass
\ No newline at end of file
+        text = _FILLERS.sub(" ", text)
+        text = _PHRASE_FILLERS.sub(_drop_phrase_filler, text)
+        text = _REPEATED_WORD.sub(r"\1", text)
+        text = _REPEATED_PHRASE.sub(r"\1", text)
+        text = _PUNCTUATION_RUN.sub(_merge_punctuation, text)
+        return _SPACE_BEFORE_PUNCTUATION.sub("", " ".join(text.split())).lstrip(",.!? ")
+    
+    def _normalize(self, text: str) -> str:
+        """Preprocess text and count the tokens it saved."""
+        normalized = self.preprocess_text(text)
+        registry = get_registry()
+        registry.inc("summarizer_input_tokens_total", count_tokens(text), labels={"text": "raw"},
+                     help_text="Transcript tokens given to the summarizer, before and after normalization")
+        registry.inc("summarizer_input_tokens_total", count_tokens(normalized), labels={"text": "normalized"},
+                     help_text="Transcript tokens given to the summarizer, before and after normalization")
+        return normalized
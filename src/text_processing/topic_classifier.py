@@ -4,20 +4,71 @@ Topic Classification Module
 Classifies conversation topics using zero-shot classification with BART-MNLI.
 """
 
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Dict, List
+
+from src.utils.logger import get_logger
+from src.utils.metrics import get_registry
+
+logger = get_logger(__name__)
+
+# Texts shorter than this are reported as "unknown" without running the model
+MIN_TEXT_LENGTH = 10
+
+# Words per classification window; well inside BART-MNLI's 1024-token premise limit
+WINDOW_TOKENS = 256
+
+# Windows classified per model call
+BATCH_SIZE = 8
+
+# Predictions kept in the in-memory cache
+CACHE_SIZE = 1024
+
+# Predictions kept in the shared SQLite cache
+DISK_CACHE_ENTRIES = 100000
+
+_WHITESPACE = re.compile(r"\s+")
+
 
 class TopicClassifier:
     """
     Handles topic classification using zero-shot classification.
     """
     
-    def __init__(self, model_name: str = "facebook/bart-large-mnli"):
+    def __init__(self, model_name: str = "facebook/bart-large-mnli", model_manager=None,
+                 window_tokens: int = WINDOW_TOKENS, aggregation: str = "mean",
+                 cache_size: int = CACHE_SIZE, cache_path: str = None,
+                 cache_disk_entries: int = DISK_CACHE_ENTRIES):
         """
         Initialize the topic classifier.
         
         Args:
             model_name (str): Name of the classification model
+            model_manager (ModelManager): Optional shared manager that owns the model
+            window_tokens (int): Words per window for long texts
+            aggregation (str): How window scores combine into the overall topic
+                (``mean`` or ``max``, both weighted by window length)
+            cache_size (int): Predictions memoized in memory (0 disables the cache)
+            cache_path (str): SQLite file for a cache tier shared across processes
+            cache_disk_entries (int): Predictions kept in that file, oldest dropped (0 = unbounded)
         """
+        if aggregation not in ("mean", "max"):
+            raise ValueError(f"Unknown aggregation: {aggregation}")
+        
         self.model_name = model_name
+        self.model_manager = model_manager
+        self.window_tokens = window_tokens
+        self.aggregation = aggregation
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, list]" = OrderedDict()
+        self._disk_cache = None
+        if cache_path:
+            from src.utils.prediction_cache import PredictionCache
+            self._disk_cache = PredictionCache(cache_path, max_entries=cache_disk_entries)
+        self.cache_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
         self.classifier = None
         self.predefined_topics = [
             "technology",
@@ -34,20 +85,207 @@ class TopicClassifier:
     
     def load_model(self):
         """Load the classification model."""
-        pass
+        if self.classifier is not None:
+            return
+        
+        if self.model_manager is not None:
+            self.classifier = self.model_manager.load_classifier_model(self.model_name)
+            return
+        
+        from transformers import pipeline
+        
+        logger.info("Loading classification model...")
+        self.classifier = pipeline("zero-shot-classification", model=self.model_name)
+    
+    def release_model(self):
+        """Drop this component's reference to the model so its manager can evict it."""
+        if self.model_manager is not None:
+            self.classifier = None
+    
+    def reopen_cache(self):
+        """
+        Open a new connection to the shared prediction cache.
+        
+        SQLite connections must not be used across ``fork``, so a forked
+        child calls this before it classifies anything.
+        """
+        if self._disk_cache is not None:
+            from src.utils.prediction_cache import PredictionCache
+            self._disk_cache = PredictionCache(self._disk_cache.db_path, self._disk_cache.max_entries)
     
     def classify_topic(self, text: str, custom_topics: list = None):
         """
         Classify the topic of the input text.
         
+        Texts longer than one window are classified window by window and the
+        scores aggregated, so no part of the text is truncated away.
+        
         Args:
             text (str): Text to classify
             custom_topics (list): Custom list of topics to classify against
-            
+        
         Returns:
             dict: Classification result with topic and confidence score
         """
-        pass
+        if len(text) <= MIN_TEXT_LENGTH:
+            return self._unknown()
+        
+        if len(text.split()) > self.window_tokens:
+            result = self.classify_segments([{"text": text}], custom_topics)
+            result.pop("timeline")
+            return result
+        
+        predictions = self._predict(text, custom_topics or self.predefined_topics)
+        return self._result(predictions)
+    
+    def classify_segments(self, segments: List[Dict], custom_topics: list = None):
+        """
+        Classify a transcript from its timestamped segments.
+        
+        Consecutive segments are grouped into windows of about ``window_tokens``
+        words and all windows are scored in batched model calls. The cost grows
+        linearly with the transcript's length.
+        
+        Args:
+            segments (List[Dict]): Segments with ``text`` and optional ``start``/``end``
+            custom_topics (list): Custom list of topics to classify against
+        
+        Returns:
+            dict: Classification result with topic and confidence score, plus a
+                ``timeline`` with each window's ``start``, ``end``, ``label`` and
+                ``confidence``
+        """
+        return self.combine_windows(self.score_windows(self.build_windows(segments), custom_topics))
+    
+    def score_windows(self, windows: List[Dict], custom_topics: list = None) -> List[Dict]:
+        """
+        Classify windows in batched model calls.
+        
+        Args:
+            windows (List[Dict]): Windows from ``build_windows``
+            custom_topics (list): Custom list of topics to classify against
+        
+        Returns:
+            List[Dict]: The windows long enough to classify, each with its
+                ``predictions`` as (label, score) pairs
+        """
+        windows = [window for window in windows if len(window["text"]) > MIN_TEXT_LENGTH]
+        if not windows:
+            return []
+        
+        labels = custom_topics or self.predefined_topics
+        window_predictions = self._predict_batch([window["text"] for window in windows], labels)
+        return [dict(window, predictions=predictions)
+                for window, predictions in zip(windows, window_predictions)]
+    
+    def combine_windows(self, windows: List[Dict]) -> dict:
+        """
+        Aggregate scored windows into the overall topic and a timeline.
+        
+        Args:
+            windows (List[Dict]): Windows from ``score_windows``
+        
+        Returns:
+            dict: Classification result with topic and confidence score, plus a
+                ``timeline`` of each window's topic
+        """
+        if not windows:
+            return dict(self._unknown(), timeline=[])
+        
+        timeline = []
+        for window in windows:
+            label, confidence = window["predictions"][0]
+            timeline.append({
+                "start": window["start"],
+                "end": window["end"],
+                "label": label,
+                "confidence": confidence
+            })
+        
+        aggregated = self._aggregate([window["predictions"] for window in windows],
+                                     [window["tokens"] for window in windows])
+        return dict(self._result(aggregated), timeline=timeline)
+    
+    def build_windows(self, segments: List[Dict]) -> List[Dict]:
+        """
+        Group consecutive segments into windows of at most ``window_tokens`` words.
+        
+        Segments longer than a window are split into several windows that share
+        the segment's timestamps.
+        
+        Args:
+            segments (List[Dict]): Segments with ``text`` and optional ``start``/``end``
+        
+        Returns:
+            List[Dict]: Windows with ``start``, ``end``, ``text`` and ``tokens``
+        """
+        windows = []
+        current = None
+        
+        for segment in segments:
+            words = segment["text"].split()
+            for offset in range(0, len(words), self.window_tokens):
+                piece = words[offset:offset + self.window_tokens]
+                if current is not None and current["tokens"] + len(piece) > self.window_tokens:
+                    windows.append(current)
+                    current = None
+                if current is None:
+                    current = {"start": segment.get("start"), "end": segment.get("end"),
+                               "words": [], "tokens": 0}
+                current["words"].extend(piece)
+                current["tokens"] += len(piece)
+                current["end"] = segment.get("end")
+        if current is not None:
+            windows.append(current)
+        
+        for window in windows:
+            window["text"] = " ".join(window.pop("words"))
+        return windows
+    
+    def _aggregate(self, window_predictions: List[list], weights: List[int]) -> list:
+        """
+        Combine per-window scores into one ranking.
+        
+        ``mean`` averages each label's score weighted by window length. ``max``
+        takes each label's best window score, scaled by that window's length
+        relative to the longest window so short fragments cannot dominate.
+        
+        Args:
+            window_predictions (List[list]): (label, score) pairs per window
+            weights (List[int]): Words per window
+        
+        Returns:
+            list: (label, score) pairs sorted by descending score
+        """
+        totals: Dict[str, float] = {}
+        if self.aggregation == "mean":
+            total_weight = sum(weights)
+            for predictions, weight in zip(window_predictions, weights):
+                for label, score in predictions:
+                    totals[label] = totals.get(label, 0.0) + score * weight / total_weight
+        else:
+            longest = max(weights)
+            for predictions, weight in zip(window_predictions, weights):
+                for label, score in predictions:
+                    totals[label] = max(totals.get(label, 0.0), score * weight / longest)
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    
+    @staticmethod
+    def _unknown() -> dict:
+        return {
+            "label": "unknown",
+            "confidence": 0.0,
+            "all_scores": {"unknown": 1.0}
+        }
+    
+    @staticmethod
+    def _result(predictions: list) -> dict:
+        label, confidence = predictions[0]
+        return {
+            "label": label,
+            "confidence": confidence,
+            "all_scores": dict(predictions[:5])
+        }
     
     def set_custom_topics(self, topics: list):
         """
@@ -56,7 +294,12 @@ class TopicClassifier:
         Args:
             topics (list): List of custom topic labels
         """
-        pass
+        if not topics:
+            raise ValueError("At least one topic is required")
+        if list(topics) != self.predefined_topics:
+            # Keys include the label list, so old entries could never match again
+            self._cache.clear()
+        self.predefined_topics = list(topics)
     
     def get_top_predictions(self, text: str, top_k: int = 3):
         """
@@ -65,8 +308,101 @@ class TopicClassifier:
         Args:
             text (str): Text to classify
             top_k (int): Number of top predictions to return
-            
+        
         Returns:
             list: Top K predictions with scores
         """
-        pass
\ No newline at end of file
+        return self._predict(text, self.predefined_topics)[:top_k]
+    
+    def _predict(self, text: str, candidate_labels: list) -> list:
+        """
+        Run zero-shot classification against the candidate labels.
+        
+        Args:
+            text (str): Text to classify
+            candidate_labels (list): Topic labels to score
+        
+        Returns:
+            list: (label, score) pairs sorted by descending score
+        """
+        return self._predict_batch([text], candidate_labels)[0]
+    
+    def _predict_batch(self, texts: List[str], candidate_labels: list) -> List[list]:
+        """
+        Run zero-shot classification on several texts in batched model calls.
+        
+        Predictions are memoized per text, label list and model. Only texts
+        found in neither the memory nor the disk cache reach the model.
+        
+        Args:
+            texts (List[str]): Texts to classify
+            candidate_labels (list): Topic labels to score
+        
+        Returns:
+            List[list]: (label, score) pairs sorted by descending score, per text
+        """
+        if not self.cache_size and self._disk_cache is None:
+            return self._run_model(texts, candidate_labels)
+        
+        keys = [self._cache_key(text, candidate_labels) for text in texts]
+        predictions = {}
+        for key in keys:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                predictions[key] = self._cache[key]
+        memory_hits = len(predictions)
+        
+        missing = [key for key in dict.fromkeys(keys) if key not in predictions]
+        if missing and self._disk_cache is not None:
+            for key, value in self._disk_cache.get_many(missing).items():
+                predictions[key] = [tuple(pair) for pair in value]
+                self._remember(key, predictions[key])
+        disk_hits = len(predictions) - memory_hits
+        
+        pending = {key: text for key, text in zip(keys, texts) if key not in predictions}
+        if pending:
+            computed = dict(zip(pending, self._run_model(list(pending.values()), candidate_labels)))
+            for key, value in computed.items():
+                self._remember(key, value)
+            if self._disk_cache is not None:
+                self._disk_cache.put_many(list(computed.items()))
+            predictions.update(computed)
+        
+        self._record_cache_metrics(memory_hits, disk_hits, len(pending))
+        return [predictions[key] for key in keys]
+    
+    def _run_model(self, texts: List[str], candidate_labels: list) -> List[list]:
+        self.load_model()
+        results = self.classifier(texts, candidate_labels, batch_size=BATCH_SIZE)
+        if isinstance(results, dict):
+            results = [results]
+        return [list(zip(result['labels'], result['scores'])) for result in results]
+    
+    def _cache_key(self, text: str, candidate_labels: list) -> str:
+        """Hash of the model, the exact label list and the case/whitespace-normalized text."""
+        normalized = _WHITESPACE.sub(" ", text).strip().casefold()
+        payload = json.dumps([self.model_name, list(candidate_labels), normalized])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _remember(self, key: str, predictions: list):
+        if not self.cache_size:
+            return
+        self._cache[key] = predictions
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def _record_cache_metrics(self, memory_hits: int, disk_hits: int, misses: int):
+        self.cache_stats["memory_hits"] += memory_hits
+        self.cache_stats["disk_hits"] += disk_hits
+        self.cache_stats["misses"] += misses
+        
+        registry = get_registry()
+        for result, count in (("memory_hit", memory_hits), ("disk_hit", disk_hits), ("miss", misses)):
+            if count:
+                registry.inc("classifier_cache_requests_total", count, {"result": result},
+                             help_text="Topic classifier cache lookups by outcome")
+        lookups = sum(self.cache_stats.values())
+        hits = self.cache_stats["memory_hits"] + self.cache_stats["disk_hits"]
+        registry.set("classifier_cache_hit_ratio", hits / lookups if lookups else 0.0,
+                     help_text="Fraction of topic classifier lookups served from cache")
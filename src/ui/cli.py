@@ -5,6 +5,7 @@ Console interface for the Audio Conversation Summarizer.
 """
 
 import argparse
+import sys
 
 
 class CLI:
@@ -62,21 +63,56 @@ class CLI:
         
         return parser
     
-    def run(self):
+    def run(self) -> int:
         """
         Run the CLI application.
+        
+        Audio files go to the warm worker daemon when one is running (see
+        ``main.py --serve-daemon``) and are processed in this process otherwise.
+        
+        Returns:
+            int: Exit code
         """
         args = self.parser.parse_args()
+        if not args.audio and not args.record:
+            self.parser.print_help()
+            return 1
+        
+        from config.settings import load_config
+        
+        config = load_config()
+        config.models.whisper_model_size = args.model_size
+        
+        results = None
+        if args.audio:
+            from src.service.zygote import submit_job
+            
+            results = submit_job(config, args.audio, args.output)
+        
+        if results is None:
+            # No daemon: pay for the imports and model load here
+            from src.pipeline import AudioProcessingPipeline
+            from src.utils.runtime import configure_runtime
+            
+            configure_runtime(config.models)
+            pipeline = AudioProcessingPipeline(config)
+            if args.audio:
+                results = pipeline.process_audio_file(args.audio, args.output)
+            else:
+                results = pipeline.process_microphone_input(args.duration)
         
-        # Process arguments and run pipeline
-        pass
+        topic = results.get("topic", {})
+        print(f"Topic: {topic.get('label', 'unknown')} ({topic.get('confidence', 0):.2f})")
+        print(f"\nTranscript:\n{results['transcript']}")
+        print(f"\nSummary:\n{results['summary']}")
+        return 0
 
 
-def main():
+def main() -> int:
     """Main CLI entry point."""
     cli = CLI()
-    cli.run()
+    return cli.run()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -4,8 +4,190 @@ Streamlit Web Application
 Interactive web interface for the Audio Conversation Summarizer.
 """
 
+import json
+import sys
+import time
+from pathlib import Path
+
 import streamlit as st
 
+# `streamlit run` only puts this file's directory on the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from config.settings import load_config
+from src.pipeline import AudioProcessingPipeline
+from src.utils.jobs import JobRunner
+from src.utils.runtime import configure_runtime
+
+# Seconds between refreshes of the job list while jobs are running
+POLL_SECONDS = 1.0
+
+STAGE_LABELS = {
+    "model_load": "Loading models",
+    "decode": "Decoding audio",
+    "fingerprint": "Checking for duplicates",
+    "features": "Computing features",
+    "asr": "Transcribing",
+    "extract": "Selecting key sentences",
+    "summarize": "Summarizing",
+    "classify": "Classifying topic"
+}
+
+
+@st.cache_resource(show_spinner="Loading models...")
+def get_pipeline() -> AudioProcessingPipeline:
+    """
+    Build the process-wide pipeline with its models loaded.
+    
+    Cached as a resource, so every session and every rerun of this script
+    share one warm model set instead of reloading models per interaction.
+    """
+    config = load_config()
+    configure_runtime(config.models)
+    pipeline = AudioProcessingPipeline(config)
+    pipeline.load_models()
+    return pipeline
+
+
+@st.cache_resource
+def get_runner() -> JobRunner:
+    """Process-wide background executor that runs jobs on the shared pipeline."""
+    pipeline = get_pipeline()
+    return JobRunner(pipeline, max_workers=pipeline.config.ui.max_concurrent_jobs)
+
+
+def session_jobs(runner: JobRunner) -> list:
+    """Jobs submitted from this browser session that the runner still tracks."""
+    jobs = (runner.get(job_id) for job_id in st.session_state.job_ids)
+    return [job for job in jobs if job is not None]
+
+
+def render_sidebar(runner: JobRunner):
+    """Show the shared model configuration and server load."""
+    config = runner.pipeline.config
+    st.header("Configuration")
+    st.markdown(f"**Speech-to-text:** Whisper `{config.models.whisper_model_size}`")
+    if config.models.cascade_first_pass_size:
+        st.markdown(f"**Cascade first pass:** Whisper `{config.models.cascade_first_pass_size}`")
+    st.markdown(f"**Summarizer:** `{config.models.summarizer_model}`")
+    st.markdown(f"**Classifier:** `{config.models.classifier_model}`")
+    st.caption("Models are loaded once and shared by every session.")
+    
+    jobs = [job.snapshot() for job in runner.jobs()]
+    running = sum(1 for job in jobs if job["status"] == "running")
+    queued = sum(1 for job in jobs if job["status"] == "queued")
+    st.metric("Jobs running", running, help=f"Up to {config.ui.max_concurrent_jobs} at a time")
+    st.metric("Jobs queued", queued)
+    
+    if st.button("Clear finished jobs"):
+        st.session_state.job_ids = [job.id for job in session_jobs(runner) if not job.done]
+
+
+def render_upload(runner: JobRunner):
+    """Upload files and queue them; uploads stay in memory and go straight to the decoder."""
+    config = runner.pipeline.config
+    uploads = st.file_uploader(
+        "Audio files",
+        type=[fmt.lstrip(".") for fmt in config.audio.supported_formats],
+        accept_multiple_files=True
+    )
+    
+    if st.button("Process", type="primary", disabled=not uploads):
+        limit_bytes = config.ui.max_upload_size_mb * 1024 * 1024
+        for upload in uploads:
+            if upload.size > limit_bytes:
+                st.error(f"{upload.name} is larger than {config.ui.max_upload_size_mb} MB")
+                continue
+            job = runner.submit_bytes(upload.getvalue(), upload.name)
+            st.session_state.job_ids.append(job.id)
+
+
+def render_job(job: dict):
+    """Show one job's progress, or its results once finished."""
+    with st.container():
+        st.subheader(job["name"])
+        
+        if job["status"] == "failed":
+            st.error(f"Processing failed: {job['error']}")
+            return
+        
+        if job["status"] != "completed":
+            if job["status"] == "queued":
+                text = "Waiting for a free worker..."
+            else:
+                stage = STAGE_LABELS.get(job["stage"], job["stage"] or "Working")
+                text = f"{stage}... ({job['elapsed']:.0f}s)"
+            st.progress(job["progress"], text=text)
+            return
+        
+        results = job["result"]
+        metrics = results["metrics"]
+        topic = results["topic"]
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Topic", topic.get("label", "unknown"), f"{topic.get('confidence', 0):.0%} confidence",
+                    delta_color="off")
+        col2.metric("Audio", f"{metrics['audio_duration']:.0f}s")
+        col3.metric("Processing", f"{results['processing_time']:.1f}s", f"RTF {metrics['rtf']:.2f}",
+                    delta_color="off")
+        
+        if results.get("duplicate_of"):
+            st.info(f"Same recording as {results['duplicate_of']['audio_file']}; results reused.")
+        
+        st.markdown("**Summary**")
+        st.write(results["summary"])
+        
+        with st.expander("Transcript"):
+            st.write(results["transcript"])
+        
+        if results.get("topic_timeline"):
+            with st.expander("Topic timeline"):
+                st.dataframe(results["topic_timeline"], use_container_width=True)
+        
+        with st.expander("Stage timings"):
+            st.dataframe(
+                [{"stage": STAGE_LABELS.get(name, name), "seconds": round(entry["wall_time"], 2)}
+                 for name, entry in metrics["stages"].items()],
+                use_container_width=True
+            )
+        
+        st.download_button(
+            "Download JSON",
+            data=json.dumps(results, indent=2, ensure_ascii=False),
+            file_name=f"{Path(job['name']).stem}_results.json",
+            mime="application/json",
+            key=f"download-{job['id']}"
+        )
+
+
+def render_jobs(runner: JobRunner) -> bool:
+    """
+    Show this session's jobs, newest first.
+    
+    Returns:
+        bool: Whether any of them is still queued or running
+    """
+    jobs = [job.snapshot() for job in session_jobs(runner)]
+    if not jobs:
+        st.info("Upload audio to see its transcript, summary and topic here.")
+    for job in reversed(jobs):
+        render_job(job)
+        st.divider()
+    return any(job["status"] in ("queued", "running") for job in jobs)
+
+
+if hasattr(st, "fragment"):
+    @st.fragment(run_every=POLL_SECONDS)
+    def live_jobs(runner: JobRunner):
+        """Refresh only the job list while the rest of the page stays put."""
+        render_jobs(runner)
+else:
+    def live_jobs(runner: JobRunner):
+        """Rerun the script until this session's jobs finish (Streamlit without fragments)."""
+        if render_jobs(runner):
+            time.sleep(POLL_SECONDS)
+            st.rerun()
+
 
 def main():
     """
@@ -20,25 +202,24 @@ def main():
     st.title("🎤 Audio Conversation Summarizer & Topic Classifier")
     st.markdown("Convert audio to text, generate summaries, and classify topics")
     
+    st.session_state.setdefault("job_ids", [])
+    runner = get_runner()
+    
     # Sidebar for configuration
     with st.sidebar:
-        st.header("Configuration")
-        # Add configuration options here
-        pass
+        render_sidebar(runner)
     
     # Main content area
     col1, col2 = st.columns(2)
     
     with col1:
         st.header("📁 Audio Input")
-        # Add audio input components here
-        pass
+        render_upload(runner)
     
     with col2:
         st.header("📄 Results")
-        # Add results display here
-        pass
+        live_jobs(runner)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
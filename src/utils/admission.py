@@ -0,0 +1,211 @@
+"""
+Admission Control
+
+Limits the decoded audio in flight and queues or rejects work beyond it.
+
+Decoded audio is float32 at 16 kHz, about 230 MB per hour, so the number
+of files says little about memory: one long recording can outweigh dozens
+of short ones. Work is admitted by its audio duration and decoded size
+instead. Jobs that do not fit wait in a bounded first-in, first-out queue
+(a large job is never starved by a stream of small ones), and a job that
+finds the queue full, or waits longer than the timeout, is rejected with
+``AdmissionRejected``. A job larger than the limits on its own still runs,
+alone, so every file can be processed.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from src.utils.metrics import get_registry
+
+# Bytes per second of decoded mono float32 audio at Whisper's 16 kHz
+DECODED_BYTES_PER_SECOND = 16000 * 4
+
+# Seconds assumed per byte of encoded audio whose duration cannot be probed (32 kbit/s);
+# most formats are denser, so this errs towards admitting less at once
+UNKNOWN_SECONDS_PER_BYTE = 1 / 4000
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when work cannot be admitted: the wait queue is full or the wait timed out."""
+
+
+class Ticket:
+    """Admitted work, to be handed back to ``AdmissionController.release``."""
+    
+    def __init__(self, audio_seconds: float, name: str):
+        self.audio_seconds = audio_seconds
+        self.audio_bytes = int(audio_seconds * DECODED_BYTES_PER_SECOND)
+        self.name = name
+
+
+class AdmissionController:
+    """
+    Admits work while the audio in flight stays within a duration and a memory limit.
+    """
+    
+    def __init__(self, max_audio_seconds: float = 0, max_audio_mb: float = 0,
+                 max_waiting: int = 8, wait_timeout: float = 0):
+        """
+        Initialize the controller.
+        
+        Args:
+            max_audio_seconds (float): Audio in flight at most, in seconds (0 = no limit)
+            max_audio_mb (float): Decoded audio in flight at most, in MB (0 = no limit)
+            max_waiting (int): Jobs waiting at most; more are rejected
+            wait_timeout (float): Seconds a job waits at most before it is rejected (0 = no limit)
+        """
+        self.max_audio_seconds = max_audio_seconds
+        self.max_audio_bytes = max_audio_mb * 1e6
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.stats = {"admitted": 0, "rejected": 0, "waited": 0}
+        self._in_flight_seconds = 0.0
+        self._in_flight_bytes = 0
+        self._running = 0
+        self._waiting: deque = deque()
+        self._cond = threading.Condition()
+    
+    @classmethod
+    def from_config(cls, service) -> "AdmissionController":
+        """
+        Create a controller from the service configuration.
+        
+        Args:
+            service (ServiceConfig): Limits and queue settings
+        
+        Returns:
+            AdmissionController: The controller
+        """
+        return cls(max_audio_seconds=service.max_inflight_audio_seconds,
+                   max_audio_mb=service.max_inflight_audio_mb,
+                   max_waiting=service.admission_queue_size,
+                   wait_timeout=service.admission_timeout)
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set (costs need not be estimated otherwise)."""
+        return bool(self.max_audio_seconds or self.max_audio_bytes)
+    
+    @contextmanager
+    def admit(self, audio_seconds: float, name: str = "") -> Iterator[Ticket]:
+        """
+        Hold admission for the duration of a block, waiting for room if needed.
+        
+        Args:
+            audio_seconds (float): Duration of the audio the work decodes
+            name (str): Name used in log and error messages
+        
+        Raises:
+            AdmissionRejected: If the wait queue is full or the wait times out
+        """
+        ticket = self.acquire(audio_seconds, name)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    def acquire(self, audio_seconds: float, name: str = "", block: bool = True) -> Optional[Ticket]:
+        """
+        Admit work, waiting in the queue until it fits.
+        
+        Args:
+            audio_seconds (float): Duration of the audio the work decodes
+            name (str): Name used in log and error messages
+            block (bool): Wait for room (False = return None at once if it does not fit)
+        
+        Returns:
+            Optional[Ticket]: The admission to release later (None if not blocking and full)
+        
+        Raises:
+            AdmissionRejected: If the wait queue is full or the wait times out
+        """
+        ticket = Ticket(max(0.0, audio_seconds), name)
+        with self._cond:
+            if not self._waiting and self._fits(ticket):
+                self._start(ticket)
+                return ticket
+            if not block:
+                return None
+            if len(self._waiting) >= self.max_waiting:
+                self._reject(f"{len(self._waiting)} jobs are already waiting")
+            
+            self._waiting.append(ticket)
+            self.stats["waited"] += 1
+            self._export()
+            deadline = time.monotonic() + self.wait_timeout if self.wait_timeout else None
+            try:
+                while not (self._waiting[0] is ticket and self._fits(ticket)):
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self._reject(f"no room within {self.wait_timeout:.0f}s")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                # The next job in line may fit now that this one left the queue
+                self._cond.notify_all()
+            self._start(ticket)
+            return ticket
+    
+    def release(self, ticket: Ticket):
+        """
+        Hand back an admission and let waiting work in.
+        
+        Args:
+            ticket (Ticket): Admission returned by ``acquire``
+        """
+        with self._cond:
+            self._running -= 1
+            self._in_flight_seconds -= ticket.audio_seconds
+            self._in_flight_bytes -= ticket.audio_bytes
+            self._export()
+            self._cond.notify_all()
+    
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Get the current load.
+        
+        Returns:
+            Dict[str, float]: ``running`` jobs, ``waiting`` jobs, ``audio_seconds``
+                and ``audio_mb`` in flight, plus the ``stats`` counters
+        """
+        with self._cond:
+            return dict(self.stats, running=self._running, waiting=len(self._waiting),
+                        audio_seconds=self._in_flight_seconds, audio_mb=self._in_flight_bytes / 1e6)
+    
+    def _fits(self, ticket: Ticket) -> bool:
+        """Whether the work fits next to what is running (anything fits when nothing runs)."""
+        if self._running == 0:
+            return True
+        if self.max_audio_seconds and self._in_flight_seconds + ticket.audio_seconds > self.max_audio_seconds:
+            return False
+        if self.max_audio_bytes and self._in_flight_bytes + ticket.audio_bytes > self.max_audio_bytes:
+            return False
+        return True
+    
+    def _start(self, ticket: Ticket):
+        self._running += 1
+        self._in_flight_seconds += ticket.audio_seconds
+        self._in_flight_bytes += ticket.audio_bytes
+        self.stats["admitted"] += 1
+        self._export()
+    
+    def _reject(self, reason: str):
+        """Count and raise a rejection (caller holds the lock)."""
+        self.stats["rejected"] += 1
+        get_registry().inc("admission_rejected_total",
+                           help_text="Jobs rejected because too much audio was in flight or waiting")
+        raise AdmissionRejected(f"Server busy: {reason}; try again later")
+    
+    def _export(self):
+        """Publish the current load as gauges (caller holds the lock)."""
+        registry = get_registry()
+        registry.set("admission_in_flight_audio_seconds", self._in_flight_seconds,
+                     help_text="Seconds of audio admitted and not yet transcribed")
+        registry.set("admission_in_flight_audio_bytes", self._in_flight_bytes,
+                     help_text="Decoded bytes of audio admitted and not yet transcribed")
+        registry.set("admission_waiting_jobs", len(self._waiting),
+                     help_text="Jobs waiting for admission")
@@ -0,0 +1,202 @@
+"""
+Fingerprint Index
+
+SQLite index of acoustic fingerprints for reusing results across copies of a recording.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.audio_processing.fingerprint import AudioFingerprint, hamming_distance
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    id INTEGER PRIMARY KEY,
+    audio_file TEXT UNIQUE NOT NULL,
+    variant TEXT NOT NULL,
+    duration REAL NOT NULL,
+    summary INTEGER NOT NULL,
+    frames BLOB,
+    alias_of INTEGER,
+    results TEXT,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_fingerprints_lookup ON fingerprints(variant, duration);
+"""
+
+# Recordings shorter than this are too short to fingerprint reliably
+MIN_DURATION = 10.0
+
+# Copies may differ in length by codec padding and trimming
+DURATION_TOLERANCE_S = 0.5
+DURATION_TOLERANCE_RATIO = 0.005
+
+# Summary codes further apart than this are never compared frame by frame
+MAX_SUMMARY_DISTANCE = 16
+
+# Shortlisted candidates compared frame by frame
+CANDIDATES = 8
+
+# Results fields reused for a duplicate
+REUSED_FIELDS = ("transcript", "segments", "summary", "topic", "topic_timeline")
+
+
+def _signed(value: int) -> int:
+    """Store a 64-bit code in SQLite's signed INTEGER."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class FingerprintIndex:
+    """
+    Acoustic fingerprints of processed recordings and their results.
+    
+    A lookup only reads rows of the same processing variant whose duration
+    is within a small tolerance (an index range scan), shortlists them by
+    Hamming distance between summary codes, and compares the sub-fingerprints
+    of the closest few. Its cost depends on how many recordings have about
+    the same length, not on the size of the index.
+    """
+    
+    def __init__(self, db_path: str, threshold: float = 0.75):
+        """
+        Open (or create) the index database.
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+            threshold (float): Minimum similarity (1 - bit error rate) for a duplicate
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+    
+    def lookup(self, fingerprint: AudioFingerprint, variant: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Find an already processed copy of a recording.
+        
+        Args:
+            fingerprint (AudioFingerprint): Fingerprint of the new recording
+            variant (str): Processing settings the results must have been produced with
+        
+        Returns:
+            Optional[Dict[str, Any]]: ``audio_file``, ``similarity`` and
+                ``results`` of the best match, or None
+        """
+        if fingerprint.duration < MIN_DURATION or not len(fingerprint):
+            return None
+        
+        tolerance = DURATION_TOLERANCE_S + DURATION_TOLERANCE_RATIO * fingerprint.duration
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, summary FROM fingerprints "
+                "WHERE variant = ? AND duration BETWEEN ? AND ? "
+                "AND alias_of IS NULL AND results IS NOT NULL",
+                (variant, fingerprint.duration - tolerance, fingerprint.duration + tolerance)
+            ).fetchall()
+        
+        shortlist = []
+        for row_id, code in rows:
+            distance = hamming_distance(fingerprint.summary, code & ((1 << 64) - 1))
+            if distance <= MAX_SUMMARY_DISTANCE:
+                shortlist.append((distance, row_id))
+        shortlist = sorted(shortlist)[:CANDIDATES]
+        
+        best = None
+        for _, row_id in shortlist:
+            with self._lock:
+                audio_file, duration, frames, results = self._conn.execute(
+                    "SELECT audio_file, duration, frames, results FROM fingerprints WHERE id = ?",
+                    (row_id,)
+                ).fetchone()
+            similarity = fingerprint.similarity(AudioFingerprint.from_bytes(frames, duration))
+            if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                best = {"id": row_id, "audio_file": audio_file, "similarity": similarity,
+                        "results": json.loads(results)}
+        return best
+    
+    def add(self, audio_file: str, fingerprint: AudioFingerprint, variant: str = ""):
+        """
+        Index a recording whose results are still being produced.
+        
+        Args:
+            audio_file (str): Path of the recording
+            fingerprint (AudioFingerprint): Its fingerprint
+            variant (str): Processing settings
+        """
+        self.add_many([(audio_file, fingerprint)], variant)
+    
+    def add_many(self, items: List[Tuple[str, AudioFingerprint]], variant: str = ""):
+        """
+        Index several recordings in one transaction.
+        
+        Args:
+            items (List[Tuple[str, AudioFingerprint]]): ``(audio_file, fingerprint)`` pairs
+            variant (str): Processing settings
+        """
+        now = time.time()
+        rows = [(audio_file, variant, fingerprint.duration, _signed(fingerprint.summary),
+                 fingerprint.to_bytes(), now)
+                for audio_file, fingerprint in items
+                if fingerprint.duration >= MIN_DURATION and len(fingerprint)]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fingerprints "
+                "(audio_file, variant, duration, summary, frames, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    
+    def attach(self, audio_file: str, results: Dict[str, Any]):
+        """
+        Store a recording's results once they are complete, making it matchable.
+        
+        Args:
+            audio_file (str): Path of a recording passed to ``add``
+            results (Dict[str, Any]): Its processing results
+        """
+        payload = json.dumps({field: results[field] for field in REUSED_FIELDS if field in results},
+                             ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE fingerprints SET results = ? WHERE audio_file = ? AND alias_of IS NULL",
+                (payload, audio_file)
+            )
+    
+    def alias(self, audio_file: str, match: Dict[str, Any], variant: str = ""):
+        """
+        Record that a recording is a copy of an indexed one.
+        
+        Args:
+            audio_file (str): Path of the copy
+            match (Dict[str, Any]): Result of ``lookup``
+            variant (str): Processing settings
+        """
+        if audio_file == match["audio_file"]:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints "
+                "(audio_file, variant, duration, summary, alias_of, created_at) "
+                "SELECT ?, ?, duration, summary, id, ? FROM fingerprints WHERE id = ?",
+                (audio_file, variant, time.time(), match["id"])
+            )
+    
+    def count(self) -> int:
+        """Number of indexed recordings, aliases included."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
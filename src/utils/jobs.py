@@ -0,0 +1,178 @@
+"""
+Background Jobs
+
+Runs pipeline jobs on a thread pool and tracks their per-stage progress.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stages every file goes through, in order; progress is the share of them finished
+PROGRESS_STAGES = ("decode", "asr", "summarize", "classify")
+
+
+class Job:
+    """
+    One submitted piece of work and what is known about it so far.
+    
+    The worker thread updates a job while the caller reads it, so readers
+    should use ``snapshot`` for a consistent view.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Initialize a queued job.
+        
+        Args:
+            name (str): Display name (e.g. the uploaded file name)
+        """
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "queued"
+        self.current_stage: Optional[str] = None
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+    
+    def on_stage(self, event: str, name: str, entry: Dict[str, float]):
+        """Stage listener passed to the pipeline (see ``StageTimer``)."""
+        with self._lock:
+            if event == "start":
+                self.current_stage = name
+            else:
+                self.current_stage = None
+                self.stages[name] = dict(entry)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a consistent copy of the job's state.
+        
+        Returns:
+            Dict[str, Any]: ``id``, ``name``, ``status``, ``stage``, ``progress``
+                (0-1), ``stages`` timings, ``result``, ``error`` and ``elapsed`` seconds
+        """
+        with self._lock:
+            finished = sum(1 for stage in PROGRESS_STAGES if stage in self.stages)
+            start = self.started_at or self.submitted_at
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "stage": self.current_stage,
+                "progress": 1.0 if self.status == "completed" else finished / len(PROGRESS_STAGES),
+                "stages": {name: dict(entry) for name, entry in self.stages.items()},
+                "result": self.result,
+                "error": self.error,
+                "elapsed": (self.finished_at or time.time()) - start
+            }
+
+
+class JobRunner:
+    """
+    Thread pool for pipeline jobs shared by every caller in the process.
+    
+    Jobs run on background threads so callers (e.g. UI sessions) stay
+    responsive. All jobs share one pipeline and therefore one set of loaded
+    models; the pipeline serializes each model stage, so with more than one
+    worker different files can be in different stages at the same time.
+    """
+    
+    def __init__(self, pipeline, max_workers: int = 2, max_finished: int = 100):
+        """
+        Initialize the runner.
+        
+        Args:
+            pipeline (AudioProcessingPipeline): Shared pipeline
+            max_workers (int): Jobs processed at the same time
+            max_finished (int): Finished jobs kept for lookup before the oldest are dropped
+        """
+        self.pipeline = pipeline
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="acs-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+    
+    def submit_bytes(self, data: bytes, name: str) -> Job:
+        """
+        Queue processing of encoded audio held in memory.
+        
+        Args:
+            data (bytes): Encoded audio file contents
+            name (str): Display name
+        
+        Returns:
+            Job: The queued job
+        """
+        return self.submit(
+            name, lambda job: self.pipeline.process_audio_bytes(data, name, progress=job.on_stage)
+        )
+    
+    def submit(self, name: str, work: Callable[[Job], Dict[str, Any]]) -> Job:
+        """
+        Queue arbitrary work that reports progress through the job.
+        
+        Args:
+            name (str): Display name
+            work (Callable[[Job], Dict[str, Any]]): Produces the job's result
+        
+        Returns:
+            Job: The queued job
+        """
+        job = Job(name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, work)
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id (None once it has been pruned)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self) -> List[Job]:
+        """All tracked jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones."""
+        self._executor.shutdown(wait=wait)
+    
+    def _run(self, job: Job, work: Callable[[Job], Dict[str, Any]]):
+        with job._lock:
+            job.status = "running"
+            job.started_at = time.time()
+        try:
+            result = work(job)
+        except Exception as e:
+            logger.error(f"❌ Job {job.name} failed: {e}")
+            with job._lock:
+                job.status, job.error = "failed", str(e)
+        else:
+            with job._lock:
+                job.status, job.result = "completed", result
+        finally:
+            with job._lock:
+                job.finished_at = time.time()
+    
+    def _prune(self):
+        """Drop the oldest finished jobs beyond ``max_finished`` (caller holds the lock)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,300 @@
+"""
+Metrics Utilities
+
+Per-stage timing and a small metrics registry with Prometheus text export.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.utils.resources import RSSMonitor
+
+# Histogram buckets for stage durations (seconds)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Histogram buckets for real-time factors (processing time / audio time)
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (
+        k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters, gauges and histograms.
+    """
+    
+    def __init__(self, prefix: str = "acs"):
+        """
+        Initialize the registry.
+        
+        Args:
+            prefix (str): Prefix added to every exported metric name
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+    
+    def _metric(self, name: str, kind: str, help_text: str, buckets=None) -> Dict[str, Any]:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = {"type": kind, "help": help_text, "values": {}, "buckets": buckets}
+            self._metrics[name] = metric
+        elif metric["type"] != kind:
+            raise ValueError(f"Metric {name} already registered as {metric['type']}")
+        return metric
+    
+    def inc(self, name: str, value: float = 1.0, labels: Dict[str, Any] = None, help_text: str = ""):
+        """
+        Increase a counter.
+        
+        Args:
+            name (str): Metric name (without prefix)
+            value (float): Amount to add
+            labels (Dict[str, Any]): Metric labels
+            help_text (str): Description shown in the export
+        """
+        with self._lock:
+            values = self._metric(name, "counter", help_text)["values"]
+            key = _label_key(labels)
+            values[key] = values.get(key, 0.0) + value
+    
+    def set(self, name: str, value: float, labels: Dict[str, Any] = None, help_text: str = ""):
+        """
+        Set a gauge.
+        
+        Args:
+            name (str): Metric name (without prefix)
+            value (float): New value
+            labels (Dict[str, Any]): Metric labels
+            help_text (str): Description shown in the export
+        """
+        with self._lock:
+            self._metric(name, "gauge", help_text)["values"][_label_key(labels)] = value
+    
+    def observe(self, name: str, value: float, labels: Dict[str, Any] = None,
+                help_text: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Record an observation in a histogram.
+        
+        Args:
+            name (str): Metric name (without prefix)
+            value (float): Observed value
+            labels (Dict[str, Any]): Metric labels
+            help_text (str): Description shown in the export
+            buckets (Tuple[float, ...]): Upper bounds used when the histogram is created
+        """
+        with self._lock:
+            metric = self._metric(name, "histogram", help_text, buckets)
+            key = _label_key(labels)
+            state = metric["values"].get(key)
+            if state is None:
+                state = {"counts": [0] * len(metric["buckets"]), "sum": 0.0, "count": 0}
+                metric["values"][key] = state
+            for i, bound in enumerate(metric["buckets"]):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+    
+    def get(self, name: str, labels: Dict[str, Any] = None):
+        """
+        Get the current value of a counter or gauge, or a histogram's state.
+        
+        Args:
+            name (str): Metric name (without prefix)
+            labels (Dict[str, Any]): Metric labels
+        
+        Returns:
+            Current value, or None if nothing was recorded
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                return None
+            return metric["values"].get(_label_key(labels))
+    
+    def reset(self):
+        """Remove all recorded metrics."""
+        with self._lock:
+            self._metrics.clear()
+    
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._metrics):
+                metric = self._metrics[name]
+                full_name = f"{self.prefix}_{name}" if self.prefix else name
+                if metric["help"]:
+                    lines.append(f"# HELP {full_name} {metric['help']}")
+                lines.append(f"# TYPE {full_name} {metric['type']}")
+                
+                for key, value in sorted(metric["values"].items()):
+                    if metric["type"] != "histogram":
+                        lines.append(f"{full_name}{_format_labels(key)} {value:g}")
+                        continue
+                    
+                    for bound, count in zip(metric["buckets"], value["counts"]):
+                        lines.append(f"{full_name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {count}")
+                    lines.append(f"{full_name}_bucket{_format_labels(key, ('le', '+Inf'))} {value['count']}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {value['sum']:g}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {value['count']}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def write_textfile(self, path: str):
+        """
+        Write the exposition text to a file (e.g. for the node exporter textfile collector).
+        
+        The file is replaced atomically so scrapers never read a partial export.
+        
+        Args:
+            path (str): Output file path
+        """
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp, output)
+    
+    def start_http_server(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve ``/metrics`` from a background thread.
+        
+        Args:
+            port (int): Port to listen on (0 picks a free port)
+            host (str): Interface to bind
+        
+        Returns:
+            ThreadingHTTPServer: Running server (call ``shutdown()`` to stop it)
+        """
+        registry = self
+        
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry.
+    
+    Returns:
+        MetricsRegistry: Shared registry
+    """
+    return _registry
+
+
+class StageTimer:
+    """
+    Collects wall and CPU time for the named stages of one run.
+    """
+    
+    def __init__(self, track_memory: bool = False, listener: Callable = None):
+        """
+        Initialize an empty set of stage timings.
+        
+        Args:
+            track_memory (bool): Also record each stage's peak RSS as ``peak_rss_mb``
+            listener (Callable): Called as ``listener(event, name, entry)`` with
+                event ``"start"`` or ``"end"`` around every stage, e.g. to report progress
+        """
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.track_memory = track_memory
+        self.listener = listener
+    
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, float]]:
+        """
+        Time a stage; repeated stages with the same name are accumulated.
+        
+        Args:
+            name (str): Stage name
+        
+        Yields:
+            Dict[str, float]: The stage's timing entry (filled in on exit)
+        """
+        entry = self.stages.setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0})
+        if self.listener is not None:
+            self.listener("start", name, entry)
+        monitor = RSSMonitor().start() if self.track_memory else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield entry
+        finally:
+            entry["wall_time"] += time.perf_counter() - wall_start
+            entry["cpu_time"] += time.process_time() - cpu_start
+            if monitor is not None:
+                peak_mb = monitor.stop() / 1e6
+                entry["peak_rss_mb"] = max(entry.get("peak_rss_mb", 0.0), peak_mb)
+            if self.listener is not None:
+                self.listener("end", name, entry)
+    
+    @property
+    def total_wall_time(self) -> float:
+        """Sum of wall time over all stages."""
+        return sum(entry["wall_time"] for entry in self.stages.values())
+    
+    def record(self, registry: MetricsRegistry = None, labels: Dict[str, Any] = None):
+        """
+        Export the collected stage timings to a registry.
+        
+        Args:
+            registry (MetricsRegistry): Target registry (defaults to the shared one)
+            labels (Dict[str, Any]): Extra labels for every stage metric
+        """
+        registry = registry or get_registry()
+        for name, entry in self.stages.items():
+            stage_labels = dict(labels or {}, stage=name)
+            registry.observe("stage_wall_seconds", entry["wall_time"], stage_labels,
+                             help_text="Wall time spent per pipeline stage")
+            registry.inc("stage_cpu_seconds_total", entry["cpu_time"], stage_labels,
+                         help_text="Process CPU time spent per pipeline stage")
+            if "peak_rss_mb" in entry:
+                registry.set("stage_peak_rss_bytes", entry["peak_rss_mb"] * 1e6, stage_labels,
+                             help_text="Peak process RSS during the last run of each stage")
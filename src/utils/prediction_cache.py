@@ -0,0 +1,127 @@
+"""
+Prediction Cache
+
+SQLite key-value store for model outputs, shared by worker processes on one machine.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions(created_at);
+"""
+
+# SQLite limits the number of host parameters per statement
+_MAX_PARAMS = 500
+
+# Share of max_entries written between prunes, so the bounded table grows by at
+# most this much before the oldest entries are dropped in one statement
+PRUNE_FRACTION = 0.1
+
+
+class PredictionCache:
+    """
+    Persistent cache of JSON-serializable predictions keyed by string.
+    
+    WAL mode lets several processes read while one writes, so workers on the
+    same host share each other's predictions.
+    """
+    
+    def __init__(self, db_path: str, max_entries: int = 0):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+            max_entries (int): Keep about this many entries, dropping the oldest (0 = unbounded);
+                each process prunes once per ``PRUNE_FRACTION`` of it written
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._prune_every = max(1, int(max_entries * PRUNE_FRACTION))
+        self._unpruned = 0
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if max_entries:
+            with self._lock, self._conn:
+                self._prune()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Look up several keys.
+        
+        Args:
+            keys (List[str]): Keys to look up
+        
+        Returns:
+            Dict[str, Any]: Cached values for the keys that were found
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _MAX_PARAMS):
+                batch = keys[start:start + _MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM predictions WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+        return found
+    
+    def put_many(self, items: List[Tuple[str, Any]]):
+        """
+        Store several values in one transaction.
+        
+        Args:
+            items (List[Tuple[str, Any]]): ``(key, value)`` pairs
+        """
+        now = time.time()
+        rows = [(key, json.dumps(value), now) for key, value in items]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO predictions (key, value, created_at) VALUES (?, ?, ?)", rows
+            )
+            if self.max_entries:
+                # Pruning walks max_entries index rows under the write lock, so it is batched
+                self._unpruned += len(rows)
+                if self._unpruned >= self._prune_every:
+                    self._prune()
+    
+    def _prune(self):
+        """Drop all but the newest ``max_entries`` entries (caller holds the lock and a transaction)."""
+        self._conn.execute(
+            "DELETE FROM predictions WHERE key IN (SELECT key FROM predictions "
+            "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self._unpruned = 0
+    
+    def count(self) -> int:
+        """Number of cached entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+    
+    def clear(self):
+        """Remove every entry."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM predictions")
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
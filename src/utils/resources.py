@@ -0,0 +1,130 @@
+"""
+Resource Utilities
+
+Process memory (RSS) measurement helpers.
+"""
+
+import os
+import resource
+import sys
+import threading
+from typing import Dict, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> int:
+    """
+    Get the current resident set size of this process.
+    
+    Returns:
+        int: Resident memory in bytes
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # No procfs (macOS): fall back to the peak, the best available approximation
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """
+    Get the peak resident set size of this process since it started.
+    
+    Returns:
+        int: Peak resident memory in bytes
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_breakdown() -> Dict[str, int]:
+    """
+    Split this process's resident memory into shared and private pages.
+    
+    Pages of a memory-mapped file that other processes map too count as
+    shared: they occupy physical memory once, however many processes map them.
+    
+    Returns:
+        Dict[str, int]: ``rss``, ``shared`` and ``private`` bytes (everything
+            counts as private where procfs is unavailable)
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = int(parts[0]) * 1024
+    except OSError:
+        rss = current_rss_bytes()
+        return {"rss": rss, "shared": 0, "private": rss}
+    
+    return {
+        "rss": fields.get("Rss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    }
+
+
+class RSSMonitor:
+    """
+    Samples RSS in a background thread to find the peak within a code block.
+    
+    The process-wide ``ru_maxrss`` only ever grows, so it cannot attribute a
+    peak to one stage; sampling the current RSS can.
+    """
+    
+    def __init__(self, interval: float = 0.01):
+        """
+        Initialize the monitor.
+        
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self.end_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+    
+    def start(self) -> "RSSMonitor":
+        """Start sampling."""
+        self.start_bytes = self.peak_bytes = current_rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> int:
+        """
+        Stop sampling.
+        
+        Returns:
+            int: Peak RSS in bytes observed while monitoring
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.end_bytes = current_rss_bytes()
+        self.peak_bytes = max(self.peak_bytes, self.end_bytes)
+        return self.peak_bytes
+    
+    @property
+    def peak_increase_bytes(self) -> int:
+        """Peak RSS above the level at ``start``."""
+        return max(0, self.peak_bytes - self.start_bytes)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,276 @@
+"""
+Result Writer
+
+Writes result files on a background thread, atomically and with batched fsyncs.
+
+``submit`` only queues the results, so processing threads never wait on
+serialization or the disk. Each file is written to a temporary file next
+to its destination and renamed into place once it is on disk: readers,
+and later runs that skip finished files, see either the previous file or
+the complete new one, never a truncated one. Files that queue up together
+are fsynced as one group before any of them is renamed, followed by one
+fsync per directory, so bursts of results share a round of flushes.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+from src.utils.metrics import get_registry
+
+try:
+    import orjson
+except ImportError:  # optional: several times faster on long transcripts
+    orjson = None
+
+logger = get_logger(__name__)
+
+# Files written (and fsynced) together at most
+GROUP_SIZE = 32
+
+
+def dumps_json(results: Dict[str, Any]) -> bytes:
+    """
+    Serialize results as indented UTF-8 JSON, with ``orjson`` when it is installed.
+    
+    Args:
+        results (Dict[str, Any]): Results to serialize
+    
+    Returns:
+        bytes: The JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # orjson is stricter (e.g. non-string keys); the standard encoder decides
+            pass
+    return json.dumps(results, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def render_text(results: Dict[str, Any]) -> str:
+    """
+    Format results as the plain-text report.
+    
+    Args:
+        results (Dict[str, Any]): Processing results
+    
+    Returns:
+        str: The report
+    """
+    topic = results['topic']
+    return (
+        f"Audio Conversation Analysis Results\n"
+        f"{'=' * 40}\n\n"
+        f"File: {results['audio_file']}\n"
+        f"Processed: {results['timestamp']}\n"
+        f"Duration: {results.get('processing_time', 0):.2f}s\n\n"
+        f"TRANSCRIPT:\n"
+        f"{'-' * 20}\n"
+        f"{results['transcript']}\n\n"
+        f"SUMMARY:\n"
+        f"{'-' * 20}\n"
+        f"{results['summary']}\n\n"
+        f"TOPIC CLASSIFICATION:\n"
+        f"{'-' * 20}\n"
+        f"Primary Topic: {topic.get('label', 'unknown')}\n"
+        f"Confidence: {topic.get('confidence', 0):.2f}\n"
+    )
+
+
+def render(results: Dict[str, Any], path: str) -> bytes:
+    """
+    Serialize results in the format chosen by the file extension.
+    
+    Args:
+        results (Dict[str, Any]): Processing results
+        path (str): Output file (``.json`` for JSON, anything else for text)
+    
+    Returns:
+        bytes: File contents
+    """
+    if Path(path).suffix.lower() == ".json":
+        return dumps_json(results)
+    return render_text(results).encode("utf-8")
+
+
+def _fsync_directory(directory: Path):
+    """Make renames in a directory durable (not supported everywhere)."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ResultWriter:
+    """
+    Background thread writing result files from a bounded queue.
+    
+    The queue bounds the results held in memory: when the disk falls that
+    far behind, ``submit`` blocks until there is room again.
+    """
+    
+    def __init__(self, max_pending: int = 64, fsync: bool = True):
+        """
+        Start the writer thread.
+        
+        Args:
+            max_pending (int): Results queued at most before ``submit`` blocks
+            fsync (bool): Flush files to disk before renaming them into place
+                (off: still atomic, but a power loss may lose recent files)
+        """
+        self.fsync = fsync
+        self.pid = os.getpid()
+        self.stats = {"written": 0, "failed": 0, "groups": 0}
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._done = 0
+        self._closed = False
+        self._sequence = itertools.count()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+        # The thread is a daemon so it never keeps a process alive; drain it on exit
+        atexit.register(self.close)
+    
+    def submit(self, path: str, results: Dict[str, Any], on_written: Callable[[], None] = None):
+        """
+        Queue results to be written to a file.
+        
+        The results must not be modified afterwards; they are serialized on
+        the writer thread.
+        
+        Args:
+            path (str): Output file
+            results (Dict[str, Any]): Results to write
+            on_written (Callable[[], None]): Called on the writer thread once
+                the file is in place (e.g. to index it)
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Result writer is closed")
+            self._submitted += 1
+        self._queue.put((str(path), results, on_written))
+    
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every submitted file has been written (or has failed).
+        
+        Args:
+            timeout (float): Seconds to wait at most (None = no limit)
+        
+        Returns:
+            bool: Whether everything was written in time
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._done >= self._submitted, timeout)
+    
+    def close(self, timeout: float = None):
+        """
+        Write everything still queued and stop the thread.
+        
+        Args:
+            timeout (float): Seconds to wait at most (None = no limit)
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+        # A forked child inherits the object but not the thread
+        if os.getpid() == self.pid:
+            self._queue.put(None)
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            while len(group) < GROUP_SIZE:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            items = [item for item in group if item is not None]
+            if items:
+                self._write_group(items)
+            if len(items) < len(group):
+                return
+    
+    def _write_group(self, items: List[Tuple[str, Dict[str, Any], Optional[Callable]]]):
+        """Stage every file, fsync them together, then rename them into place."""
+        start = time.perf_counter()
+        staged, failures = [], []
+        for path, results, on_written in items:
+            target = Path(path)
+            # Unique per submission: a group may hold several versions of one file
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.{next(self._sequence)}.tmp")
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                payload = render(results, path)
+                f = open(tmp, "wb")
+                try:
+                    f.write(payload)
+                except BaseException:
+                    f.close()
+                    raise
+                staged.append((f, tmp, target, on_written))
+            except Exception as e:
+                failures.append((tmp, target, e))
+        
+        written = []
+        for f, tmp, target, on_written in staged:
+            try:
+                with f:
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                os.replace(tmp, target)
+                written.append((target, on_written))
+            except Exception as e:
+                failures.append((tmp, target, e))
+        
+        if self.fsync:
+            for directory in {target.parent for target, _ in written}:
+                _fsync_directory(directory)
+        
+        for tmp, target, error in failures:
+            logger.error(f"❌ Could not write results to {target}: {error}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+        for target, on_written in written:
+            if on_written is not None:
+                try:
+                    on_written()
+                except Exception as e:
+                    logger.error(f"❌ Post-write step for {target} failed: {e}")
+        
+        registry = get_registry()
+        registry.inc("result_files_total", len(written), labels={"status": "written"},
+                     help_text="Result files handled by the background writer, by outcome")
+        if failures:
+            registry.inc("result_files_total", len(failures), labels={"status": "failed"},
+                         help_text="Result files handled by the background writer, by outcome")
+        registry.observe("result_write_group_seconds", time.perf_counter() - start,
+                         help_text="Time to write, fsync and rename one group of result files")
+        
+        with self._cond:
+            self.stats["written"] += len(written)
+            self.stats["failed"] += len(failures)
+            self.stats["groups"] += 1
+            self._done += len(items)
+            self._cond.notify_all()
@@ -0,0 +1,100 @@
+"""
+Results Sink
+
+Streams per-file results to a JSON Lines file as they finish.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+# Bytes read per step while looking back for the last complete record
+_TAIL_CHUNK = 64 * 1024
+
+
+class JSONLResultsSink:
+    """
+    Appends one JSON object per line and flushes after every record.
+    
+    Readers can tail the file while a batch is running; a record is only
+    complete once its terminating newline has been written (see ``read``).
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the results file for appending.
+        
+        A partial last line left by a run that crashed mid-write is cut off
+        first, so new records never get glued onto it.
+        
+        Args:
+            path (str): Path to the JSONL file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._truncate_partial_line(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.records_written = 0
+    
+    def write(self, record: Dict[str, Any]):
+        """
+        Append a record and flush it to the operating system.
+        
+        Args:
+            record (Dict[str, Any]): JSON-serializable record
+        """
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.records_written += 1
+    
+    def close(self):
+        """Close the underlying file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    @staticmethod
+    def _truncate_partial_line(path: Path):
+        """Truncate a file to just after its last newline (or to empty if it has none)."""
+        with open(path, "r+b") as f:
+            end = f.seek(0, 2)
+            position = end
+            while position > 0:
+                start = max(0, position - _TAIL_CHUNK)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                f.truncate(position)
+    
+    @staticmethod
+    def read(path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the complete records in a JSONL results file.
+        
+        A trailing line without a newline (a writer still in progress) is skipped.
+        
+        Args:
+            path (str): Path to the JSONL file
+        
+        Yields:
+            Dict[str, Any]: One record per finished file
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n") and line.strip():
+                    yield json.loads(line)
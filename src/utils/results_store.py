@@ -0,0 +1,218 @@
+"""
+Results Store
+
+Local SQLite index of processing results with FTS5 full-text search.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    audio_file TEXT NOT NULL UNIQUE,
+    output_path TEXT,
+    processed_at TEXT NOT NULL,
+    status TEXT,
+    topic TEXT,
+    confidence REAL,
+    processing_time REAL,
+    timings TEXT,
+    transcript TEXT,
+    summary TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_results_processed_at ON results(processed_at);
+CREATE INDEX IF NOT EXISTS idx_results_topic ON results(topic, processed_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+    transcript, summary, topic,
+    content='results', content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+    INSERT INTO results_fts(rowid, transcript, summary, topic)
+    VALUES (new.id, new.transcript, new.summary, new.topic);
+END;
+
+CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+    INSERT INTO results_fts(results_fts, rowid, transcript, summary, topic)
+    VALUES ('delete', old.id, old.transcript, old.summary, old.topic);
+END;
+"""
+
+_COLUMNS = "r.id, r.audio_file, r.output_path, r.processed_at, r.status, r.topic, r.confidence, r.processing_time"
+
+
+class ResultsStore:
+    """
+    Indexes transcripts, summaries, topics and timings for fast lookup.
+    
+    Full-text queries use FTS5 with BM25 ranking; topic and date filters
+    are served from ordinary B-tree indexes on the results table.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the results database.
+        
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+    
+    def add(self, results: Dict[str, Any], output_path: str = None):
+        """
+        Index one file's results, replacing any earlier entry for the same file.
+        
+        Args:
+            results (Dict[str, Any]): Results from ``process_audio_file``
+            output_path (str): Where the results file was written
+        """
+        self.add_many([(results, output_path)])
+    
+    def add_many(self, entries: List[tuple]):
+        """
+        Index several results in a single transaction.
+        
+        Args:
+            entries (List[tuple]): ``(results, output_path)`` pairs
+        """
+        rows = [self._to_row(results, output_path) for results, output_path in entries]
+        
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM results WHERE audio_file = ?",
+                [(row[0],) for row in rows]
+            )
+            self._conn.executemany(
+                "INSERT INTO results (audio_file, output_path, processed_at, status, topic, "
+                "confidence, processing_time, timings, transcript, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    
+    @staticmethod
+    def _to_row(results: Dict[str, Any], output_path: Optional[str]) -> tuple:
+        topic = results.get("topic") or {}
+        timings = {
+            key: value for key, value in results.items()
+            if key in ("processing_time", "metrics")
+        }
+        return (
+            str(results.get("audio_file", "")),
+            str(output_path) if output_path else None,
+            results.get("timestamp", ""),
+            results.get("status"),
+            topic.get("label"),
+            topic.get("confidence"),
+            results.get("processing_time"),
+            json.dumps(timings, default=str),
+            results.get("transcript", ""),
+            results.get("summary", "")
+        )
+    
+    def search(self, query: str = None, topic: str = None, since: str = None,
+               until: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Search indexed results.
+        
+        Args:
+            query (str): FTS5 query over transcript, summary and topic
+                (plain words are matched as terms; FTS5 operators are allowed)
+            topic (str): Only return results with this topic label
+            since (str): Only results processed at or after this ISO date/time
+            until (str): Only results processed before this ISO date/time
+            limit (int): Maximum number of results
+        
+        Returns:
+            List[Dict[str, Any]]: Matching results, best match first
+                (most recent first when no query is given)
+        """
+        filters, params = [], []
+        if topic:
+            filters.append("r.topic = ?")
+            params.append(topic)
+        if since:
+            filters.append("r.processed_at >= ?")
+            params.append(since)
+        if until:
+            filters.append("r.processed_at < ?")
+            params.append(until)
+        
+        if not query:
+            where = f"WHERE {' AND '.join(filters)}" if filters else ""
+            sql = f"SELECT {_COLUMNS} FROM results r {where} ORDER BY r.processed_at DESC LIMIT ?"
+            return self._fetch(sql, params + [limit])
+        
+        where = " AND ".join(["results_fts MATCH ?"] + filters)
+        sql = (
+            f"SELECT {_COLUMNS}, "
+            f"snippet(results_fts, 0, '[', ']', '...', 12) AS snippet, "
+            f"bm25(results_fts) AS rank "
+            f"FROM results_fts JOIN results r ON r.id = results_fts.rowid "
+            f"WHERE {where} ORDER BY rank LIMIT ?"
+        )
+        try:
+            return self._fetch(sql, [query] + params + [limit])
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax (e.g. stray quotes or colons): match the words literally
+            return self._fetch(sql, [self._quote_terms(query)] + params + [limit])
+    
+    @staticmethod
+    def _quote_terms(query: str) -> str:
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"' for term in terms)
+    
+    def _fetch(self, sql: str, params: list) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+    
+    def get(self, audio_file: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the full indexed entry for a file.
+        
+        Args:
+            audio_file (str): Audio file path as recorded in the results
+        
+        Returns:
+            Optional[Dict[str, Any]]: Stored entry, or None if not indexed
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM results WHERE audio_file = ?", (audio_file,)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["timings"] = json.loads(entry["timings"] or "{}")
+        return entry
+    
+    def count(self) -> int:
+        """
+        Get the number of indexed results.
+        
+        Returns:
+            int: Number of indexed files
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
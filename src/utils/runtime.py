@@ -0,0 +1,182 @@
+"""
+Runtime Resources
+
+Device selection and CPU thread budgeting for model inference.
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Thread-pool size variables read by OpenMP and the BLAS libraries behind torch and numpy.
+# They only take effect if set before those libraries start their pools.
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def available_cores() -> List[int]:
+    """
+    Get the CPU ids this process may run on.
+    
+    Returns:
+        List[int]: Usable CPU ids (respects cgroup/taskset affinity where supported)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def resolve_device(device: str = "auto") -> str:
+    """
+    Resolve a configured device name to the device models should run on.
+    
+    Args:
+        device (str): ``auto``, ``cpu``, ``cuda``, ``cuda:N`` or ``mps``
+    
+    Returns:
+        str: ``cuda``/``cuda:N``/``mps`` when available, otherwise ``cpu``
+    """
+    device = (device or "auto").lower()
+    if device == "cpu":
+        return "cpu"
+    
+    try:
+        import torch
+    except ImportError:
+        if device != "auto":
+            logger.warning(f"Device {device} requested but torch is not installed; using cpu")
+        return "cpu"
+    
+    if device == "auto":
+        if torch.cuda.is_available():
+            return "cuda"
+        mps = getattr(torch.backends, "mps", None)
+        if mps is not None and mps.is_available():
+            return "mps"
+        return "cpu"
+    
+    if device.startswith("cuda") and not torch.cuda.is_available():
+        logger.warning(f"Device {device} requested but CUDA is not available; using cpu")
+        return "cpu"
+    return device
+
+
+@dataclass
+class RuntimePlan:
+    """Threads and CPUs assigned to one worker process."""
+    device: str
+    threads: int
+    interop_threads: int
+    cpu_ids: Optional[List[int]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def plan_runtime(device: str = "auto", workers: int = 1, worker_index: int = 0,
+                 core_budget: int = 0, interop_threads: int = 1,
+                 pin_cpus: bool = False) -> RuntimePlan:
+    """
+    Split a core budget evenly between worker processes.
+    
+    Args:
+        device (str): Configured device (see ``resolve_device``)
+        workers (int): Worker processes sharing the budget
+        worker_index (int): This worker's position, used to pick its CPUs
+        core_budget (int): Cores for all workers together (0 = every available core)
+        interop_threads (int): Threads for running independent ops in parallel
+        pin_cpus (bool): Restrict the worker to its own slice of CPUs
+    
+    Returns:
+        RuntimePlan: Device, thread counts and (when pinning) CPU ids for the worker
+    """
+    cores = available_cores()
+    budget = min(core_budget, len(cores)) if core_budget > 0 else len(cores)
+    workers = max(1, workers)
+    threads = max(1, budget // workers)
+    
+    cpu_ids = None
+    if pin_cpus:
+        start = (worker_index * threads) % len(cores)
+        cpu_ids = [cores[(start + i) % len(cores)] for i in range(threads)]
+    
+    return RuntimePlan(
+        device=resolve_device(device),
+        threads=threads,
+        interop_threads=max(1, min(interop_threads, threads)),
+        cpu_ids=cpu_ids
+    )
+
+
+def apply_runtime(plan: RuntimePlan) -> RuntimePlan:
+    """
+    Apply a runtime plan to the current process.
+    
+    Call it before models are loaded: the environment variables only affect
+    thread pools that have not started yet, and torch rejects inter-op
+    changes after its first parallel op.
+    
+    Args:
+        plan (RuntimePlan): Plan from ``plan_runtime``
+    
+    Returns:
+        RuntimePlan: The same plan
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(plan.threads)
+    
+    if plan.cpu_ids and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, plan.cpu_ids)
+    
+    # Only configure torch if it is installed; importing it here keeps the
+    # environment variables above ahead of its OpenMP initialization
+    if "torch" in sys.modules or _torch_installed():
+        import torch
+        
+        torch.set_num_threads(plan.threads)
+        try:
+            torch.set_num_interop_threads(plan.interop_threads)
+        except RuntimeError:
+            logger.debug("torch inter-op threads already fixed for this process")
+    
+    logger.info(f"⚙️  Runtime: device={plan.device}, threads={plan.threads}, "
+                f"interop={plan.interop_threads}"
+                + (f", cpus={plan.cpu_ids}" if plan.cpu_ids else ""))
+    return plan
+
+
+def configure_runtime(models_config, workers: int = 1, worker_index: int = 0) -> RuntimePlan:
+    """
+    Plan and apply runtime resources from the model configuration.
+    
+    Args:
+        models_config (ModelConfig): Device, core budget and pinning settings
+        workers (int): Worker processes sharing the core budget
+        worker_index (int): This worker's position
+    
+    Returns:
+        RuntimePlan: The applied plan
+    """
+    return apply_runtime(plan_runtime(
+        device=models_config.device,
+        workers=workers,
+        worker_index=worker_index,
+        core_budget=models_config.cpu_cores,
+        interop_threads=models_config.interop_threads,
+        pin_cpus=models_config.pin_cpus
+    ))
+
+
+def _torch_installed() -> bool:
+    from importlib.util import find_spec
+    return find_spec("torch") is not None
@@ -4,9 +4,14 @@ Test Configuration and Fixtures
 Common test utilities and fixtures for the test suite.
 """
 
+import sys
+
 import pytest
 from pathlib import Path
 
+# Make the project root importable (``src``, ``config``) regardless of how pytest is invoked
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 
 @pytest.fixture
 def sample_audio_file():
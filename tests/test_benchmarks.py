@@ -0,0 +1,63 @@
+"""
+Tests for the Benchmark Harness
+"""
+
+import pytest
+
+from benchmarks.harness import BenchmarkResult, compare, load_baseline, measure, save_baseline
+from benchmarks.synthetic import generate_transcript
+
+
+def _result(name="stage.asr", latency=1.0, throughput=1.0, rtf=0.1, rss=100.0):
+    return BenchmarkResult(name=name, latency_s=latency, latency_p95_s=latency,
+                           throughput=throughput, rtf=rtf, peak_rss_mb=rss, repeat=3)
+
+
+class TestHarness:
+    """Test cases for measurement and regression checks."""
+    
+    def test_measure(self):
+        """Test latency, throughput, RTF and memory bookkeeping."""
+        calls = []
+        result = measure("case", lambda: calls.append(b"x" * 10_000_000), repeat=4, warmup=2,
+                         items=10, audio_seconds=30.0)
+        
+        assert len(calls) == 6
+        assert result.throughput == pytest.approx(10 / result.latency_s)
+        assert result.rtf == pytest.approx(result.latency_s / 30.0)
+        # Only what the case itself allocated, not the RSS it started with
+        assert 50 < result.peak_rss_mb < result.extra["peak_rss_total_mb"]
+    
+    def test_regressions_beyond_threshold(self, tmp_path):
+        """Test that slower, hungrier or lower-throughput runs are flagged."""
+        path = tmp_path / "baseline.json"
+        save_baseline(str(path), [_result()], {"duration": 30})
+        baseline = load_baseline(str(path))
+        
+        assert compare([_result(latency=1.1, rtf=0.11)], baseline, threshold=0.2) == []
+        
+        regressions = compare([_result(latency=1.5, throughput=0.5, rss=200.0)], baseline, 0.2)
+        assert {r["metric"] for r in regressions} == {"latency_s", "throughput", "peak_rss_mb"}
+        
+        # Improvements and unknown cases are never regressions
+        assert compare([_result(latency=0.1), _result(name="new")], baseline, 0.2) == []
+    
+    def test_synthetic_transcript_is_deterministic(self):
+        """Test that synthetic transcripts depend only on the seed."""
+        assert generate_transcript(200, seed=1) == generate_transcript(200, seed=1)
+        assert generate_transcript(200, seed=1) != generate_transcript(200, seed=2)
+        assert len(generate_transcript(200).split()) >= 200
+    
+    def test_synthetic_audio(self, tmp_path):
+        """Test synthetic audio length and WAV output."""
+        pytest.importorskip("numpy")
+        import wave
+        from benchmarks.synthetic import generate_speech_like_audio, write_audio
+        
+        audio = generate_speech_like_audio(2.0, sample_rate=16000)
+        path = write_audio(audio, str(tmp_path / "speech.wav"))
+        
+        assert len(audio) == 32000
+        assert abs(audio).max() <= 1.0
+        with wave.open(path, "rb") as f:
+            assert f.getnframes() == 32000
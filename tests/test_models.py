@@ -0,0 +1,264 @@
+"""
+Tests for the Model Manager
+"""
+
+import json
+import struct
+import tarfile
+from array import array
+
+import pytest
+
+from src.models import bundle, model_manager
+from src.models.language_routing import LanguageRouter
+from src.models.latency_budget import LatencyBudgetSelector, LatencyProfile
+from src.models.model_manager import ModelManager
+from src.models.weight_cache import DTYPES, WeightCache, read_safetensors_header, write_safetensors
+
+
+@pytest.fixture
+def fake_rss(monkeypatch):
+    """Simulated process RSS: a base footprint plus every model still cached."""
+    sizes = {}
+    
+    def rss(manager):
+        return int((100 + sum(sizes[key] for key in manager.loaded_models)) * 1e6)
+    
+    def install(manager):
+        monkeypatch.setattr(model_manager, "current_rss_bytes", lambda: rss(manager))
+        monkeypatch.setattr(model_manager, "_release_memory", lambda: None)
+        return sizes
+    
+    return install
+
+
+class TestModelManager:
+    """Test cases for ModelManager class."""
+    
+    def test_lru_eviction_within_budget(self, fake_rss):
+        """Test that loading over the budget evicts the least recently used model."""
+        manager = ModelManager(memory_budget_mb=1000)
+        sizes = fake_rss(manager)
+        sizes.update({"whisper:base": 400, "summarizer:a": 400, "classifier:b": 400})
+        
+        for key in ("whisper:base", "summarizer:a"):
+            manager._load(key, lambda key=key: key)
+        manager._load("whisper:base", lambda: "reloaded")  # cache hit refreshes recency
+        manager.model_memory_mb["classifier:b"] = 400
+        manager._load("classifier:b", lambda: "classifier:b")
+        
+        assert list(manager.loaded_models) == ["whisper:base", "classifier:b"]
+        assert manager.loaded_models["whisper:base"] == "whisper:base"
+        assert manager.evictions == 1
+    
+    def test_unlimited_budget_keeps_everything(self, fake_rss):
+        """Test that without a budget nothing is evicted."""
+        manager = ModelManager()
+        sizes = fake_rss(manager)
+        sizes.update({"whisper:base": 4000, "summarizer:a": 4000})
+        
+        manager._load("whisper:base", lambda: 1)
+        manager._load("summarizer:a", lambda: 2)
+        
+        assert list(manager.loaded_models) == ["whisper:base", "summarizer:a"]
+        manager.unload_model("whisper")
+        assert list(manager.loaded_models) == ["summarizer:a"]
+        assert manager.get_model_info()["evictions"] == 0
+
+
+class TestWeightCache:
+    """Test cases for the safetensors weight cache."""
+    
+    def test_safetensors_layout_is_aligned(self, tmp_path):
+        """Test the file layout: every tensor starts aligned for its dtype."""
+        path = tmp_path / "weights.safetensors"
+        write_safetensors(str(path), [
+            ("mask", "U8", [3], bytes([1, 0, 1])),
+            ("scale", "F32", [2], array("f", [0.5, 2.0])),
+            ("ids", "I64", [2], array("q", [7, 9])),
+            ("half", "F16", [1], b"\x00\x3c"),
+        ], metadata={"builder": "test"})
+        
+        header, data_start = read_safetensors_header(str(path))
+        assert header.pop("__metadata__") == {"builder": "test"}
+        assert data_start % 8 == 0
+        for info in header.values():
+            begin = info["data_offsets"][0]
+            assert (data_start + begin) % DTYPES[info["dtype"]][0] == 0
+        
+        raw = path.read_bytes()
+        begin, end = header["scale"]["data_offsets"]
+        assert struct.unpack("<2f", raw[data_start + begin:data_start + end]) == (0.5, 2.0)
+        begin, end = header["ids"]["data_offsets"]
+        assert struct.unpack("<2q", raw[data_start + begin:data_start + end]) == (7, 9)
+        assert not list(tmp_path.glob(".*.tmp"))
+    
+    def test_missing_or_stale_copies_are_reconverted(self, tmp_path):
+        """Test that only current-format copies are loaded."""
+        cache = WeightCache(str(tmp_path))
+        assert cache.path("summarizer:facebook/bart-large-cnn").name == \
+            "summarizer--facebook--bart-large-cnn.safetensors"
+        assert cache.load("whisper:base") is None
+        
+        pytest.importorskip("torch")
+        write_safetensors(str(cache.path("whisper:base")), [("w", "F32", [1], array("f", [1.0]))],
+                          metadata={"format_version": "0", "builder": "whisper"})
+        assert cache.load("whisper:base") is None
+    
+    def test_mapped_tensors_share_the_file(self, tmp_path):
+        """Test that mapped tensors read the file and never write to it."""
+        torch = pytest.importorskip("torch")
+        from src.models.weight_cache import map_safetensors
+        
+        path = tmp_path / "weights.safetensors"
+        write_safetensors(str(path), [("w", "F32", [2, 2], array("f", [1.0, 2.0, 3.0, 4.0]))])
+        before = path.read_bytes()
+        
+        tensors, _ = map_safetensors(str(path))
+        assert tensors["w"].tolist() == [[1.0, 2.0], [3.0, 4.0]]
+        tensors["w"].mul_(10)
+        assert tensors["w"][1, 1].item() == 40.0
+        assert path.read_bytes() == before
+        assert tensors["w"].dtype == torch.float32
+
+
+class TestModelBundle:
+    """Test cases for offline model bundles."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        root = tmp_path / "cache"
+        (root / "whisper").mkdir(parents=True)
+        (root / "whisper" / "base.pt").write_bytes(b"w" * 5000)
+        (root / "transformers" / "org--model").mkdir(parents=True)
+        (root / "transformers" / "org--model" / "config.json").write_text("{}")
+        return root
+    
+    def test_pack_verify_unpack_round_trip(self, cache, tmp_path):
+        """Test that an unpacked bundle reproduces the cache and verifies."""
+        files = ["whisper/base.pt", "transformers/org--model/config.json"]
+        manifest = bundle.pack(str(cache), files, str(tmp_path / "models.bundle"),
+                               models={"whisper_model_size": "base"}, workers=2)
+        assert [entry["path"] for entry in manifest["files"]] == sorted(files)
+        assert bundle.read_manifest(str(tmp_path / "models.bundle"))["models"] == {"whisper_model_size": "base"}
+        assert bundle.verify(str(tmp_path / "models.bundle"))["failures"] == []
+        
+        target = tmp_path / "node"
+        report = bundle.unpack(str(tmp_path / "models.bundle"), str(target), workers=2)
+        assert report["failures"] == [] and report["bytes"] == 5002
+        assert (target / "whisper" / "base.pt").read_bytes() == b"w" * 5000
+        assert json.loads((target / bundle.INSTALLED_MANIFEST).read_text())["files"] == manifest["files"]
+        
+        (target / "whisper" / "base.pt").write_bytes(b"x" * 5000)
+        failures = bundle.verify(str(target))["failures"]
+        assert [failure["path"] for failure in failures] == ["whisper/base.pt"]
+    
+    def test_corrupt_files_are_never_installed(self, cache, tmp_path):
+        """Test that a damaged bundle fails verification and leaves no partial files."""
+        path = tmp_path / "models.bundle"
+        bundle.pack(str(cache), ["whisper/base.pt"], str(path))
+        with tarfile.open(path) as tar:
+            offset = tar.getmember("whisper/base.pt").offset_data
+        with open(path, "r+b") as f:
+            f.seek(offset + 100)
+            f.write(b"?")
+        
+        assert [failure["path"] for failure in bundle.verify(str(path))["failures"]] == ["whisper/base.pt"]
+        target = tmp_path / "node"
+        report = bundle.unpack(str(path), str(target))
+        assert len(report["failures"]) == 1
+        assert list((target / "whisper").iterdir()) == []
+        assert not (target / bundle.INSTALLED_MANIFEST).exists()
+    
+    def test_unsafe_paths_and_offline_misses_are_rejected(self, cache, tmp_path):
+        """Test path traversal and downloads in offline mode are refused."""
+        with pytest.raises(ValueError):
+            bundle.pack(str(cache), ["../outside"], str(tmp_path / "models.bundle"))
+        
+        manager = ModelManager(cache_dir=str(cache), offline=True)
+        assert manager.local_model_dir("org/model") == cache / "transformers" / "org--model"
+        pytest.importorskip("transformers")
+        with pytest.raises(FileNotFoundError):
+            manager.load_summarizer_model("org/missing")
+
+
+class TestLatencyBudget:
+    """Test cases for latency-budget model selection."""
+    
+    def test_largest_configuration_within_budget(self):
+        """Test that Whisper size is maximized first, then the summarizer."""
+        profile = LatencyProfile(hardware="test")
+        for size, rtf in (("tiny", 0.1), ("base", 0.2), ("small", 0.5)):
+            profile.observe("asr", size, rtf * 100, 100.0)
+        profile.observe("summarize", "distilbart", 5.0, 100.0)
+        profile.observe("summarize", "bart", 20.0, 100.0)
+        profile.observe("other", "default", 0.0, 100.0)
+        selector = LatencyBudgetSelector(profile, ["tiny", "base", "small"], ["distilbart", "bart"], headroom=1.0)
+        
+        choice = selector.select(100.0, 40.0)
+        assert (choice["whisper_model_size"], choice["summarizer_model"]) == ("base", "bart")
+        assert choice["predicted_seconds"] == pytest.approx(40.0)
+        assert choice["measured"] and choice["fits"]
+        
+        choice = selector.select(100.0, 10.0)
+        assert (choice["whisper_model_size"], choice["summarizer_model"]) == ("tiny", "distilbart")
+        assert not choice["fits"]
+    
+    def test_models_not_resident_are_charged_their_load(self):
+        """Test that a candidate that would have to be loaded costs its measured load time."""
+        profile = LatencyProfile(hardware="test")
+        for size, rtf in (("tiny", 0.1), ("base", 0.2)):
+            profile.observe("asr", size, rtf * 100, 100.0)
+        profile.observe("summarize", "bart", 0.0, 100.0)
+        profile.observe("other", "default", 0.0, 100.0)
+        profile.observe_load("whisper:base", 15.0)
+        profile.observe_load("summarizer:bart", 0.0)
+        resident = {"whisper:tiny", "summarizer:bart"}
+        selector = LatencyBudgetSelector(profile, ["tiny", "base"], ["bart"], headroom=1.0,
+                                         is_loaded=resident.__contains__)
+        
+        # base alone would fit in 25 s, but not once it has to be loaded
+        choice = selector.select(100.0, 25.0)
+        assert choice["whisper_model_size"] == "tiny"
+        assert selector.predict(100.0, "base", "bart") == (pytest.approx(35.0), True)
+        
+        resident.add("whisper:base")
+        assert selector.select(100.0, 25.0)["whisper_model_size"] == "base"
+    
+    def test_profile_is_kept_per_machine(self, tmp_path):
+        """Test moving averages, persistence and priors for unmeasured hardware."""
+        path = str(tmp_path / "profile.json")
+        profile = LatencyProfile(path, hardware="machine-a")
+        profile.observe("asr", "small", 10.0, 10.0)
+        profile.observe("asr", "small", 20.0, 10.0)
+        profile.save_if_due()
+        assert not (tmp_path / "profile.json").exists()
+        profile.save_if_due(interval=0)
+        
+        rtf, measured = LatencyProfile(path, hardware="machine-a").rtf("asr", "small")
+        assert measured and rtf == pytest.approx(1.3)
+        rtf, measured = LatencyProfile(path, hardware="machine-b").rtf("asr", "small.en")
+        assert not measured and rtf == LatencyProfile(hardware="x").rtf("asr", "small")[0]
+
+
+class TestLanguageRouter:
+    """Test cases for language-aware model routing."""
+    
+    def test_route(self):
+        """Test English-only checkpoints, multilingual fallbacks and skipped text stages."""
+        router = LanguageRouter(summarizer_languages="en", classifier_languages="en,de")
+        
+        english = router.route("en", 0.97, "small", "tiny")
+        assert (english["whisper_model_size"], english["first_pass_size"]) == ("small.en", "tiny.en")
+        assert english["skipped"] == []
+        assert router.route("EN", None, "large")["whisper_model_size"] == "large"
+        
+        german = router.route("de", 0.9, "base.en")
+        assert german["whisper_model_size"] == "base"
+        assert (german["summarize"], german["classify"], german["skipped"]) == (False, True, ["summarize"])
+        
+        # An unsure detection keeps the multilingual model and every stage
+        unsure = router.route("en", 0.3, "base")
+        assert (unsure["language"], unsure["whisper_model_size"], unsure["skipped"]) == (None, "base", [])
+        assert LanguageRouter("*", "*").route("ja", 0.99, "base")["skipped"] == []
+
@@ -0,0 +1,508 @@
+"""
+Tests for the Audio Processing Pipeline
+"""
+
+import json
+from array import array
+
+import pytest
+
+from config.settings import AppConfig
+from src.pipeline import AudioProcessingPipeline
+from src.utils.admission import AdmissionController
+from src.text_processing.summarizer import TextSummarizer
+from src.text_processing.topic_classifier import TopicClassifier
+from src.utils.metrics import get_registry
+from src.utils.results_sink import JSONLResultsSink
+
+
+class FakeAudioHandler:
+    """Decodes every file to two seconds of silence."""
+    
+    def load_audio_file(self, file_path):
+        return [0.0] * 32000, 16000
+    
+    def load_audio_bytes(self, data, name="<buffer>"):
+        return [0.0] * 16000 * len(data), 16000
+
+
+class FakeModelComponent:
+    """Records model loads and releases in a shared event log."""
+    
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+    
+    def load_model(self):
+        self.events.append(f"load {self.name}")
+    
+    def release_model(self):
+        self.events.append(f"release {self.name}")
+
+
+class FakeSpeechToText(FakeModelComponent):
+    def transcribe_audio(self, audio_data, language=None):
+        return self.transcribe_segments(audio_data, language)["text"]
+    
+    def transcribe_segments(self, audio_data, language=None):
+        text = "We talked about the quarterly budget and hiring plans for next year."
+        return {"text": text, "language": "en", "segments": [{"start": 0.0, "end": 2.0, "text": text}]}
+
+
+class FakeSummarizer(FakeModelComponent):
+    def summarize_text(self, text, max_length=150, min_length=50):
+        return "Budget and hiring discussion."
+    
+    def summarize_texts(self, texts, max_length=150, min_length=50):
+        self.events.append(f"summarize {len(texts)} texts")
+        return [self.summarize_text(text) for text in texts]
+
+
+class FakeClassifier(FakeModelComponent):
+    def classify_topic(self, text, custom_topics=None):
+        return {"label": "business", "confidence": 0.9, "all_scores": {"business": 0.9}}
+    
+    def classify_segments(self, segments, custom_topics=None):
+        timeline = [{"start": s["start"], "end": s["end"], "label": "business", "confidence": 0.9}
+                    for s in segments]
+        return dict(self.classify_topic(""), timeline=timeline)
+
+
+class GrowingAudioHandler:
+    """
+    Decodes files registered as ``(seconds, offset)`` at 100 Hz; each sample
+    holds its absolute position plus the offset, so prefixes decode identically.
+    """
+    
+    sample_rate = 100
+    
+    def __init__(self):
+        self.files = {}
+    
+    def load_audio_file(self, file_path, start=0.0, duration=None):
+        seconds, offset = self.files[file_path]
+        end = seconds if duration is None else min(seconds, start + duration)
+        first, last = int(start * self.sample_rate), int(end * self.sample_rate)
+        return array("f", (offset + i for i in range(first, last))), self.sample_rate
+
+
+class SegmentingSpeechToText(FakeModelComponent):
+    """Emits one segment per two seconds of audio, naming its first sample."""
+    
+    def __init__(self, name, events):
+        super().__init__(name, events)
+        self.received = []
+    
+    def transcribe_segments(self, audio_data, language=None):
+        seconds = len(audio_data) / GrowingAudioHandler.sample_rate
+        self.received.append(seconds)
+        segments = [{"start": float(t), "end": float(min(t + 2, seconds)),
+                     "text": f"Sample {int(audio_data[t * 100])} covers the money plans."}
+                    for t in range(0, int(seconds), 2)]
+        return {"text": " ".join(s["text"] for s in segments), "language": "en", "segments": segments}
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """Pipeline wired to stand-in components and a temporary results index."""
+    config = AppConfig()
+    config.storage.results_db = str(tmp_path / "results.db")
+    
+    pipeline = AudioProcessingPipeline(config)
+    pipeline.audio_handler = FakeAudioHandler()
+    pipeline.events = []
+    pipeline.speech_to_text = FakeSpeechToText("asr", pipeline.events)
+    pipeline.summarizer = FakeSummarizer("summarizer", pipeline.events)
+    pipeline.classifier = FakeClassifier("classifier", pipeline.events)
+    pipeline._models_loaded = True
+    return pipeline
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    """Directory with a few (content-free) audio files."""
+    directory = tmp_path / "input"
+    directory.mkdir()
+    for name in ("a.wav", "b.wav", "c.mp3"):
+        (directory / name).write_bytes(b"")
+    return directory
+
+
+class TestAudioProcessingPipeline:
+    """Test cases for AudioProcessingPipeline class."""
+    
+    def test_stage_metrics(self, pipeline, audio_dir, tmp_path):
+        """Test per-stage timings, audio duration and RTF in the results."""
+        output = tmp_path / "out" / "a_results.json"
+        results = pipeline.process_audio_file(str(audio_dir / "a.wav"), str(output))
+        pipeline.flush_results()
+        
+        metrics = results["metrics"]
+        assert set(metrics["stages"]) >= {"decode", "asr", "summarize", "classify"}
+        assert metrics["audio_duration"] == pytest.approx(2.0)
+        assert metrics["rtf"] == pytest.approx(results["processing_time"] / 2.0)
+        saved = json.loads(output.read_text(encoding="utf-8"))
+        assert saved["topic"]["label"] == "business"
+        assert saved["topic_timeline"] == [{"start": 0.0, "end": 2.0, "label": "business", "confidence": 0.9}]
+        
+        exported = get_registry().to_prometheus()
+        assert 'acs_stage_wall_seconds_count{stage="asr"}' in exported
+        assert "acs_audio_seconds_total" in exported
+    
+    def test_cached_features_skip_decoding(self, pipeline, audio_dir, tmp_path):
+        """Test that a file whose features are cached is transcribed without decoding it again."""
+        np = pytest.importorskip("numpy")
+        from src.audio_processing.features import PADDING_FRAMES, FeatureCache, LogMelFeatures
+        
+        decoded = []
+        load_audio_file = pipeline.audio_handler.load_audio_file
+        pipeline.audio_handler.load_audio_file = lambda path: decoded.append(path) or load_audio_file(path)
+        pipeline.feature_cache = FeatureCache(
+            str(tmp_path / "features"),
+            compute=lambda audio, n_mels: np.zeros((n_mels, len(audio) // 160 + PADDING_FRAMES), np.float32)
+        )
+        received = []
+        transcribe_segments = pipeline.speech_to_text.transcribe_segments
+        pipeline.speech_to_text.transcribe_segments = lambda audio, language=None: (
+            received.append(audio) or transcribe_segments(audio, language)
+        )
+        pipeline.speech_to_text.model_size = "base"
+        pipeline.speech_to_text.first_pass_size = None
+        
+        audio_file = str(audio_dir / "a.wav")
+        first = pipeline.process_audio_file(audio_file, str(tmp_path / "first.json"))
+        second = pipeline.process_audio_file(audio_file, str(tmp_path / "second.json"))
+        
+        assert decoded == [audio_file]
+        assert all(isinstance(features, LogMelFeatures) for features in received)
+        assert received[1].audio is None
+        assert second["metrics"]["audio_duration"] == first["metrics"]["audio_duration"] == pytest.approx(2.0)
+        assert "decode" not in second["metrics"]["stages"]
+    
+    def test_in_memory_upload_reports_progress(self, pipeline):
+        """Test that encoded bytes are processed without a file and every stage is reported."""
+        events = []
+        results = pipeline.process_audio_bytes(b"abc", "upload.mp3",
+                                               progress=lambda event, name, entry: events.append((event, name)))
+        
+        assert results["audio_file"] == "upload.mp3"
+        assert results["metrics"]["audio_duration"] == pytest.approx(3.0)
+        assert events == [("start", "decode"), ("end", "decode"), ("start", "asr"), ("end", "asr"),
+                          ("start", "summarize"), ("end", "summarize"),
+                          ("start", "classify"), ("end", "classify")]
+    
+    def test_batch_streams_results(self, pipeline, audio_dir, tmp_path):
+        """Test that batch results go to JSONL and the summary keeps counters only."""
+        summary = pipeline.batch_process(str(audio_dir), str(tmp_path / "out"))
+        
+        assert summary["processed"] == 3
+        assert "files" not in summary
+        assert summary["metrics"]["audio_duration"] == pytest.approx(6.0)
+        
+        records = list(JSONLResultsSink.read(summary["results_path"]))
+        assert sorted(r["file"].rsplit("/", 1)[-1] for r in records) == ["a.wav", "b.wav", "c.mp3"]
+        assert pipeline.results_store.count() == 3
+    
+    def test_low_memory_loads_models_per_stage(self, pipeline, audio_dir):
+        """Test that a memory budget loads each model only for its own stage."""
+        pipeline.config.models.memory_budget_mb = 512
+        results = pipeline.process_audio_file(str(audio_dir / "a.wav"))
+        
+        assert pipeline.events == [
+            "load asr", "release asr",
+            "load summarizer", "release summarizer",
+            "load classifier", "release classifier"
+        ]
+        assert results["metrics"]["peak_rss_mb"] > 0
+        assert results["metrics"]["stages"]["asr"]["peak_rss_mb"] > 0
+    
+    def test_stagewise_batch(self, pipeline, audio_dir, tmp_path):
+        """Test that a stage-wise batch loads each model once and isolates failures."""
+        pipeline.config.models.memory_budget_mb = 512
+        pipeline.config.models.stagewise_batch = True
+        
+        transcribe = pipeline.speech_to_text.transcribe_segments
+        calls = []
+        
+        def flaky_transcribe(audio_data, language=None):
+            calls.append(audio_data)
+            if len(calls) == 2:
+                raise RuntimeError("decoder exploded")
+            return transcribe(audio_data, language)
+        
+        pipeline.speech_to_text.transcribe_segments = flaky_transcribe
+        
+        summary = pipeline.batch_process(str(audio_dir), str(tmp_path / "out"))
+        
+        assert pipeline.events == [
+            "load asr", "release asr",
+            "load summarizer", "summarize 2 texts", "release summarizer",
+            "load classifier", "release classifier"
+        ]
+        assert summary["processed"] == 2
+        assert summary["failed"] == 1
+        assert "decoder exploded" in summary["failures"][0]["error"]
+        assert summary["metrics"]["audio_duration"] == pytest.approx(4.0)
+        assert summary["metrics"]["peak_rss_mb"] > 0
+        
+        records = list(JSONLResultsSink.read(summary["results_path"]))
+        assert sorted(r["status"] for r in records) == ["failed", "success", "success"]
+        assert len(list((tmp_path / "out").glob("*_results.json"))) == 2
+    
+    def test_stagewise_batch_applies_deadline(self, pipeline, audio_dir, tmp_path):
+        """Test that a stage-wise batch still selects models per file for the configured deadline."""
+        from src.models.latency_budget import LatencyBudgetSelector, LatencyProfile
+        
+        pipeline.config.models.memory_budget_mb = 512
+        pipeline.config.models.stagewise_batch = True
+        pipeline.config.models.deadline_seconds = 1.0
+        
+        profile = LatencyProfile(hardware="test")
+        profile.observe("asr", "base", 2.0, 2.0)
+        profile.observe("summarize", "bart", 0.2, 2.0)
+        pipeline.latency_profile = profile
+        pipeline.latency_selector = LatencyBudgetSelector(profile, ["tiny", "base"], ["bart"], headroom=1.0)
+        pipeline.speech_to_text.model_size = "base"
+        pipeline.summarizer.model_name = "bart"
+        pipeline._asr_variants[("tiny", None)] = FakeSpeechToText("asr-tiny", pipeline.events)
+        pipeline._asr_variants[("tiny", None)].model_size = "tiny"
+        
+        summary = pipeline.batch_process(str(audio_dir), str(tmp_path / "out"))
+        
+        assert summary["processed"] == 3
+        for path in (tmp_path / "out").glob("*_results.json"):
+            selection = json.loads(path.read_text())["model_selection"]
+            assert selection["deadline_seconds"] == 1.0
+            assert selection["whisper_model_size"] == "tiny"
+        assert pipeline.events.count("load asr-tiny") == 1
+    
+    def test_stagewise_batch_releases_variants_and_admits(self, pipeline, audio_dir, tmp_path):
+        """Test that per-file model variants are loaded and released and decoding is admitted."""
+        pipeline.config.models.memory_budget_mb = 512
+        pipeline.config.models.stagewise_batch = True
+        tiny = FakeSpeechToText("asr-tiny", pipeline.events)
+        pipeline._speech_to_text_for = lambda results: (
+            pipeline.speech_to_text if results["audio_file"].endswith("a.wav") else tiny
+        )
+        
+        pipeline.admission = AdmissionController(max_audio_seconds=10)
+        acquire, admitted = pipeline.admission.acquire, []
+        pipeline.admission.acquire = lambda seconds, name="", block=True: (
+            admitted.append(name) or acquire(seconds, name, block)
+        )
+        pipeline.estimate_audio_seconds = lambda file_path=None, data=None: 2.0
+        
+        summary = pipeline.batch_process(str(audio_dir), str(tmp_path / "out"))
+        
+        assert summary["processed"] == 3
+        # Each Whisper variant is released before another one is loaded
+        asr_events = pipeline.events[:pipeline.events.index("load summarizer")]
+        assert {"load asr", "load asr-tiny"} <= set(asr_events)
+        assert [event.split()[1] for event in asr_events[::2]] == [event.split()[1] for event in asr_events[1::2]]
+        assert all(event.startswith("load") for event in asr_events[::2])
+        assert len(admitted) == 3
+        assert pipeline.admission.snapshot()["audio_seconds"] == 0
+    
+    def test_stagewise_summaries_per_summarizer_extract_once(self, pipeline, audio_dir, tmp_path):
+        """Test that each selected summarizer is loaded and released and a failed batch does not extract again."""
+        pipeline.config.models.memory_budget_mb = 512
+        pipeline.config.models.stagewise_batch = True
+        small = FakeSummarizer("summarizer-small", pipeline.events)
+        pipeline._summarizer_for = lambda results: (
+            small if results["audio_file"].endswith("c.mp3") else pipeline.summarizer
+        )
+        
+        def broken_batch(texts, max_length=150, min_length=50):
+            raise RuntimeError("batch exploded")
+        
+        pipeline.summarizer.summarize_texts = broken_batch
+        extracted = []
+        
+        class CountingExtractor:
+            def compress(self, text):
+                extracted.append(text)
+                return text
+        
+        pipeline.extractor = CountingExtractor()
+        
+        summary = pipeline.batch_process(str(audio_dir), str(tmp_path / "out"))
+        
+        assert summary["processed"] == 3
+        assert len(extracted) == 3
+        assert "load summarizer-small" in pipeline.events
+        assert "release summarizer-small" in pipeline.events
+        assert pipeline.events[-2:] == ["load classifier", "release classifier"]
+    
+    def test_incremental_transcribes_only_the_tail(self, pipeline, tmp_path):
+        """Test that a grown recording reuses its prefix and a changed one starts over."""
+        handler = GrowingAudioHandler()
+        pipeline.audio_handler = handler
+        pipeline.speech_to_text = SegmentingSpeechToText("asr", pipeline.events)
+        pipeline.summarizer = TextSummarizer()
+        pipeline.summarizer.summarizer = lambda texts, max_length, min_length, **kwargs: [
+            {"summary_text": " ".join(text.split()[:12])} for text in texts
+        ]
+        pipeline.classifier = TopicClassifier()
+        pipeline.classifier.classifier = lambda texts, candidate_labels, **kwargs: [
+            {"labels": list(candidate_labels), "scores": [1.0] + [0.0] * (len(candidate_labels) - 1)}
+            for _ in texts
+        ]
+        pipeline.config.storage.incremental_state_dir = str(tmp_path / "state")
+        
+        recording = tmp_path / "meeting.wav"
+        recording.write_bytes(b"")
+        path = str(recording)
+        
+        handler.files[path] = (60.0, 0)
+        first = pipeline.process_incremental(path, "meeting")
+        assert first["incremental"]["reset"] is True
+        
+        handler.files[path] = (100.0, 0)
+        grown = pipeline.process_incremental(path, "meeting")
+        
+        # The first run held back segments ending within 5 s of its end
+        assert pipeline.speech_to_text.received == [60.0, 46.0]
+        assert grown["incremental"] == {"source_id": "meeting", "reset": False,
+                                        "reused_seconds": 54.0, "new_seconds": 46.0}
+        assert [s["start"] for s in grown["segments"]] == [float(t) for t in range(0, 100, 2)]
+        assert grown["segments"][30]["text"].startswith("Sample 6000 ")
+        assert grown["metrics"]["audio_duration"] == pytest.approx(100.0)
+        assert grown["summary"]
+        assert len(grown["topic_timeline"]) >= 2
+        
+        handler.files[path] = (100.0, 7)
+        replaced = pipeline.process_incremental(path, "meeting")
+        assert replaced["incremental"]["reset"] is True
+        assert pipeline.speech_to_text.received[-1] == 100.0
+        
+        pipeline.config.processing.normalize_transcript = True
+        renormalized = pipeline.process_incremental(path, "meeting")
+        assert renormalized["incremental"]["reset"] is True
+    
+    def test_incremental_short_recording_is_verified(self, pipeline, tmp_path):
+        """Test that a recording shorter than one block is not taken as the prefix of any file."""
+        handler = GrowingAudioHandler()
+        pipeline.audio_handler = handler
+        pipeline.speech_to_text = SegmentingSpeechToText("asr", pipeline.events)
+        pipeline.summarizer = TextSummarizer()
+        pipeline.summarizer.summarizer = lambda texts, max_length, min_length, **kwargs: [
+            {"summary_text": " ".join(text.split()[:12])} for text in texts
+        ]
+        pipeline.classifier = TopicClassifier()
+        pipeline.classifier.classifier = lambda texts, candidate_labels, **kwargs: [
+            {"labels": list(candidate_labels), "scores": [1.0] + [0.0] * (len(candidate_labels) - 1)}
+            for _ in texts
+        ]
+        pipeline.config.storage.incremental_state_dir = str(tmp_path / "state")
+        
+        recording = tmp_path / "memo.wav"
+        recording.write_bytes(b"")
+        path = str(recording)
+        
+        handler.files[path] = (8.0, 0)
+        assert pipeline.process_incremental(path, "memo")["incremental"]["reset"] is True
+        
+        handler.files[path] = (30.0, 0)
+        grown = pipeline.process_incremental(path, "memo")
+        assert grown["incremental"]["reset"] is False
+        
+        handler.files[path] = (8.0, 0)
+        pipeline.process_incremental(path, "memo")
+        handler.files[path] = (30.0, 5)
+        unrelated = pipeline.process_incremental(path, "memo")
+        assert unrelated["incremental"]["reset"] is True
+        assert pipeline.speech_to_text.received[-1] == 30.0
+    
+    def test_deadline_selects_models_per_file(self, pipeline, audio_dir):
+        """Test that a deadline picks the largest fitting Whisper size and records the choice."""
+        from src.models.latency_budget import LatencyBudgetSelector, LatencyProfile
+        
+        profile = LatencyProfile(hardware="test")
+        profile.observe("asr", "base", 2.0, 2.0)
+        profile.observe("summarize", "bart", 0.2, 2.0)
+        pipeline.latency_profile = profile
+        pipeline.latency_selector = LatencyBudgetSelector(profile, ["tiny", "base"], ["bart"], headroom=1.0)
+        pipeline.speech_to_text.model_size = "base"
+        pipeline.summarizer.model_name = "bart"
+        pipeline._asr_variants[("tiny", None)] = FakeSpeechToText("asr-tiny", pipeline.events)
+        pipeline._asr_variants[("tiny", None)].model_size = "tiny"
+        
+        relaxed = pipeline.process_audio_file(str(audio_dir / "a.wav"), deadline=60.0)
+        tight = pipeline.process_audio_file(str(audio_dir / "b.wav"), deadline=1.0)
+        
+        assert relaxed["model_selection"]["whisper_model_size"] == "base"
+        assert tight["model_selection"]["whisper_model_size"] == "tiny"
+        assert tight["model_selection"]["fits"] is True
+        assert tight["model_selection"]["met_deadline"] is True
+        assert "select" in tight["metrics"]["stages"]
+        assert profile.entries["asr"]["tiny"]["samples"] == 1
+        assert profile.entries["asr"]["base"]["samples"] == 2
+    
+    def test_language_routing(self, pipeline, audio_dir):
+        """Test that detected English uses the .en checkpoint and other languages skip English-only models."""
+        from src.models.language_routing import LanguageRouter
+        
+        class FakeDetector(FakeModelComponent):
+            language = "en"
+            
+            def detect_language(self, audio_data):
+                return self.language, 0.95
+        
+        class RecordingSpeechToText(FakeSpeechToText):
+            def transcribe_segments(self, audio_data, language=None):
+                self.events.append(f"{self.name} {language}")
+                return super().transcribe_segments(audio_data, language)
+        
+        pipeline.config.models.route_language = True
+        pipeline.language_router = LanguageRouter()
+        pipeline.speech_to_text = RecordingSpeechToText("asr-multi", pipeline.events)
+        pipeline.speech_to_text.model_size = "base"
+        pipeline.summarizer.model_name = "bart-large-cnn"
+        pipeline.classifier.model_name = "bart-large-mnli"
+        detector = pipeline._asr_variants[("tiny", None)] = FakeDetector("detect", pipeline.events)
+        pipeline._asr_variants[("base.en", None)] = RecordingSpeechToText("asr-en", pipeline.events)
+        
+        english = pipeline.process_audio_file(str(audio_dir / "a.wav"))
+        assert english["language_routing"]["whisper_model_size"] == "base.en"
+        assert "asr-en en" in pipeline.events
+        assert english["summary"] and english["topic"]["label"] == "business"
+        assert "language" in english["metrics"]["stages"]
+        
+        detector.language = "de"
+        german = pipeline.process_audio_file(str(audio_dir / "b.wav"))
+        assert german["language_routing"]["whisper_model_size"] == "base"
+        assert german["language_routing"]["skipped"] == ["summarize", "classify"]
+        assert "asr-multi de" in pipeline.events
+        assert (german["summary"], german["topic"]) == ("", {})
+        assert "summarize" not in german["metrics"]["stages"]
+        
+        # A hint skips detection
+        pipeline.events.clear()
+        hinted = pipeline.process_audio_file(str(audio_dir / "a.wav"), language="en")
+        assert hinted["language_routing"]["source"] == "hint"
+        assert pipeline.events == ["asr-en en"]
+    
+    def test_duplicate_recording_reuses_results(self, pipeline, audio_dir, tmp_path):
+        """Test that an acoustically identical file skips the models and points at the original."""
+        np = pytest.importorskip("numpy")
+        audio = np.random.default_rng(0).standard_normal(16000 * 12).astype(np.float32)
+        pipeline.audio_handler.load_audio_file = lambda file_path: (audio * 0.5, 16000)
+        pipeline.config.storage.fingerprint_db = str(tmp_path / "fingerprints.db")
+        
+        transcribe = pipeline.speech_to_text.transcribe_segments
+        transcribed = []
+        
+        def counting_transcribe(audio_data, language=None):
+            transcribed.append(audio_data)
+            return transcribe(audio_data, language)
+        
+        pipeline.speech_to_text.transcribe_segments = counting_transcribe
+        
+        first = pipeline.process_audio_file(str(audio_dir / "a.wav"))
+        copy = pipeline.process_audio_file(str(audio_dir / "c.mp3"))
+        
+        assert len(transcribed) == 1
+        assert copy["duplicate_of"]["audio_file"] == str(audio_dir / "a.wav")
+        assert copy["summary"] == first["summary"]
+        assert copy["topic"] == first["topic"]
+        assert "fingerprint" in copy["metrics"]["stages"]
@@ -0,0 +1,176 @@
+"""
+Tests for Service Module
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from config.settings import AppConfig
+from src.service.coordinator import Coordinator
+from src.service.protocol import parse_address, send_request
+from src.service import worker as worker_module
+from src.service.worker import Worker, run_workers
+from src.service.zygote import WarmWorkerDaemon, request_daemon, submit_job
+from src.utils.results_sink import JSONLResultsSink
+
+
+class FakePipeline:
+    """Stand-in pipeline that records the files it processed."""
+    
+    def __init__(self, delay: float = 0.0, fail_on: str = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.processed = []
+        self.loads = 0
+    
+    def load_models(self):
+        self.loads += 1
+    
+    def process_audio_file(self, file_path, output_path=None):
+        time.sleep(self.delay)
+        if self.fail_on and file_path.endswith(self.fail_on):
+            raise RuntimeError("decode failed")
+        self.processed.append(file_path)
+        return {"audio_file": file_path, "status": "completed"}
+    
+    def flush_results(self, timeout=None):
+        return True
+
+
+class TestProtocol:
+    """Test cases for the wire protocol helpers."""
+    
+    def test_parse_address(self):
+        """Test TCP and Unix address parsing."""
+        import socket
+        
+        assert parse_address("127.0.0.1:9000") == (socket.AF_INET, ("127.0.0.1", 9000))
+        assert parse_address(":9000") == (socket.AF_INET, ("127.0.0.1", 9000))
+        assert parse_address("unix:/tmp/c.sock") == (socket.AF_UNIX, "/tmp/c.sock")
+
+
+class TestCoordinator:
+    """Test cases for the Coordinator class."""
+    
+    def test_workers_share_batch(self, tmp_path):
+        """Test that several workers drain the queue exactly once."""
+        files = [f"call_{i}.wav" for i in range(12)]
+        coordinator = Coordinator(files, str(tmp_path), heartbeat_timeout=5.0)
+        address = f"unix:{tmp_path / 'coordinator.sock'}"
+        coordinator.start(address)
+        
+        pipelines = [FakePipeline(delay=0.01, fail_on="call_3.wav") for _ in range(3)]
+        workers = [Worker(address, pipeline=p, worker_id=f"w{i}") for i, p in enumerate(pipelines)]
+        threads = [threading.Thread(target=w.run) for w in workers]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+        finally:
+            coordinator.stop()
+        
+        summary = coordinator.summary()
+        processed = sorted(f for p in pipelines for f in p.processed)
+        assert processed == sorted(f for f in files if f != "call_3.wav")
+        assert summary["processed"] == 11
+        assert summary["failed"] == 1
+        assert [f["file"] for f in summary["failures"]] == ["call_3.wav"]
+        assert len(list(JSONLResultsSink.read(summary["results_path"]))) == 12
+        assert all(p.loads == 1 for p in pipelines)
+        assert all(w.finished for w in workers)
+    
+    def test_single_worker_outcome_is_returned(self, monkeypatch):
+        """Test that a lost coordinator or a crash fails a one-process run."""
+        worker = Worker("unix:/nonexistent", pipeline=FakePipeline())
+        worker._request = lambda message, retries=None: None
+        worker.run()
+        assert not worker.finished
+        
+        monkeypatch.setattr(worker_module, "_run_worker_process", lambda *args: 1)
+        assert run_workers("unix:/nonexistent", count=1) == 1
+        
+        def crash(*args):
+            raise RuntimeError("models failed to load")
+        
+        monkeypatch.setattr(worker_module, "_run_worker_process", crash)
+        assert run_workers("unix:/nonexistent", count=1) == 1
+    
+    def test_expired_lease_is_reassigned(self, tmp_path):
+        """Test that a lease without heartbeats goes back to the queue."""
+        coordinator = Coordinator(["a.wav"], str(tmp_path), heartbeat_timeout=0.05)
+        
+        first = coordinator.handle({"op": "lease", "worker": "dead"})
+        assert first["lease"]["file"] == "a.wav"
+        time.sleep(0.1)
+        
+        second = coordinator.handle({"op": "lease", "worker": "alive"})
+        assert second["lease"]["file"] == "a.wav"
+        
+        stale = coordinator.handle({"op": "complete", "worker": "dead",
+                                    "lease_id": first["lease"]["lease_id"], "status": "success"})
+        assert not stale["ok"]
+        
+        coordinator.handle({"op": "complete", "worker": "alive",
+                            "lease_id": second["lease"]["lease_id"], "status": "success"})
+        assert coordinator.done
+        assert coordinator.summary()["reassigned"] == 1
+    
+    def test_status_over_tcp(self, tmp_path):
+        """Test a status request over a TCP socket."""
+        coordinator = Coordinator(["a.wav", "b.wav"], str(tmp_path))
+        coordinator.start("127.0.0.1:0")
+        try:
+            host, port = coordinator._server.server_address
+            response = send_request(f"{host}:{port}", {"op": "status"})
+        finally:
+            coordinator.stop()
+        
+        assert response["status"]["pending"] == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="the daemon forks a child per job")
+class TestWarmWorkerDaemon:
+    """Test cases for the warm worker daemon and its client."""
+    
+    def test_jobs_run_in_forked_children(self, tmp_path):
+        """Test that jobs run in children of a daemon that loaded models once."""
+        config = AppConfig()
+        pipeline = FakePipeline(fail_on="broken.wav")
+        daemon = WarmWorkerDaemon(config, socket_path=str(tmp_path / "zygote.sock"),
+                                  pipeline=pipeline)
+        thread = threading.Thread(target=daemon.serve, daemon=True)
+        thread.start()
+        assert daemon.ready.wait(5)
+        
+        try:
+            results = [submit_job(config, f"call_{i}.wav", socket_path=daemon.socket_path)
+                       for i in range(3)]
+            with pytest.raises(RuntimeError, match="decode failed"):
+                submit_job(config, "broken.wav", socket_path=daemon.socket_path)
+            
+            other = AppConfig()
+            other.models.whisper_model_size = "small"
+            assert submit_job(other, "call_0.wav", socket_path=daemon.socket_path) is None
+            other = AppConfig()
+            other.storage.results_db = str(tmp_path / "elsewhere.db")
+            assert submit_job(other, "call_0.wav", socket_path=daemon.socket_path) is None
+            assert request_daemon("status", socket_path=daemon.socket_path)["forking"]
+        finally:
+            request_daemon("shutdown", socket_path=daemon.socket_path)
+            thread.join(timeout=10)
+        
+        assert [r["audio_file"] for r in results] == [os.path.abspath(f"call_{i}.wav") for i in range(3)]
+        # The work happened in forked children, never in the daemon process
+        assert pipeline.processed == []
+        assert pipeline.loads == 1
+        assert daemon.stats == {"completed": 3, "failed": 1, "rejected": 2}
+        assert sorted(daemon._free_slots) == list(range(daemon.max_children))
+        assert not os.path.exists(daemon.socket_path)
+    
+    def test_without_daemon_caller_processes_itself(self, tmp_path):
+        """Test that the client reports a missing daemon instead of failing."""
+        assert submit_job(AppConfig(), "call.wav", socket_path=str(tmp_path / "none.sock")) is None
@@ -0,0 +1,322 @@
+"""
+Tests for Utilities Module
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from src.utils.admission import AdmissionController, AdmissionRejected
+from src.utils.jobs import JobRunner
+from src.utils.metrics import MetricsRegistry, StageTimer
+from src.utils.prediction_cache import PredictionCache
+from src.utils.result_writer import ResultWriter
+from src.utils.results_sink import JSONLResultsSink
+from src.utils.results_store import ResultsStore
+
+
+class TestJSONLResultsSink:
+    """Test cases for JSONLResultsSink class."""
+    
+    def test_records_visible_while_open(self, tmp_path):
+        """Test that each record is flushed before the sink is closed."""
+        path = tmp_path / "batch_results.jsonl"
+        
+        with JSONLResultsSink(str(path)) as sink:
+            sink.write({"file": "a.wav", "status": "success"})
+            assert [r["file"] for r in JSONLResultsSink.read(str(path))] == ["a.wav"]
+            sink.write({"file": "b.wav", "status": "failed", "error": "boom"})
+        
+        assert sink.records_written == 2
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    
+    def test_appends_and_skips_partial_line(self, tmp_path):
+        """Test appending across runs and skipping an unterminated line."""
+        path = tmp_path / "batch_results.jsonl"
+        path.write_text(json.dumps({"file": "old.wav"}) + "\n" + '{"file": "par', encoding="utf-8")
+        assert list(JSONLResultsSink.read(str(path))) == [{"file": "old.wav"}]
+        
+        with JSONLResultsSink(str(path)) as sink:
+            sink.write({"file": "new.wav"})
+        
+        assert list(JSONLResultsSink.read(str(path))) == [{"file": "old.wav"}, {"file": "new.wav"}]
+        
+        path.write_text('{"file": "par', encoding="utf-8")
+        with JSONLResultsSink(str(path)) as sink:
+            sink.write({"file": "only.wav"})
+        assert list(JSONLResultsSink.read(str(path))) == [{"file": "only.wav"}]
+
+
+class TestResultWriter:
+    """Test cases for the background result writer."""
+    
+    def test_writes_atomically_in_order(self, tmp_path):
+        """Test that files appear complete, later versions win and callbacks follow the write."""
+        writer = ResultWriter(max_pending=4)
+        indexed = []
+        results = {"audio_file": "a.wav", "timestamp": "t", "transcript": "héllo",
+                   "summary": "s", "topic": {"label": "business", "confidence": 0.5}}
+        
+        writer.submit(str(tmp_path / "out" / "a.json"), dict(results, summary="first"))
+        writer.submit(str(tmp_path / "out" / "a.json"), results,
+                      on_written=lambda: indexed.append((tmp_path / "out" / "a.json").exists()))
+        writer.submit(str(tmp_path / "out" / "a.txt"), results)
+        assert writer.flush(timeout=5)
+        
+        assert json.loads((tmp_path / "out" / "a.json").read_text(encoding="utf-8")) == results
+        assert "Primary Topic: business" in (tmp_path / "out" / "a.txt").read_text(encoding="utf-8")
+        assert indexed == [True]
+        assert writer.stats["written"] == 3
+        assert not list((tmp_path / "out").glob(".*.tmp"))
+        writer.close()
+    
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        """Test that a result that cannot be serialized never replaces the old file."""
+        path = tmp_path / "a.json"
+        path.write_text('{"old": true}', encoding="utf-8")
+        writer = ResultWriter()
+        
+        writer.submit(str(path), {"bad": object()})
+        writer.close()
+        
+        assert json.loads(path.read_text(encoding="utf-8")) == {"old": True}
+        assert writer.stats["failed"] == 1
+        assert not list(tmp_path.glob(".*.tmp"))
+
+
+class TestAdmissionController:
+    """Test cases for admission by in-flight audio."""
+    
+    def test_waits_in_order_until_audio_fits(self):
+        """Test that queued jobs start first in, first out as audio is released."""
+        controller = AdmissionController(max_audio_seconds=100)
+        first = controller.acquire(60, "first")
+        started, threads = [], []
+        
+        for name, seconds in (("large", 60), ("small", 10)):
+            thread = threading.Thread(target=lambda n=name, s=seconds: started.append((n, controller.acquire(s, n))))
+            thread.start()
+            threads.append(thread)
+            while controller.snapshot()["waiting"] < len(threads):
+                time.sleep(0.001)
+        
+        # The small job would fit, but it is behind the large one
+        assert started == []
+        controller.release(first)
+        for thread in threads:
+            thread.join(timeout=5)
+        assert [name for name, _ in started] == ["large", "small"]
+        assert controller.snapshot()["audio_seconds"] == 70
+        
+        # A job larger than the limit still runs once nothing else does
+        for _, ticket in started:
+            controller.release(ticket)
+        controller.release(controller.acquire(500, "huge"))
+    
+    def test_rejects_when_queue_is_full_or_wait_times_out(self):
+        """Test the bounded queue and the wait timeout."""
+        controller = AdmissionController(max_audio_mb=10, max_waiting=0)
+        ticket = controller.acquire(120, "two minutes")  # 7.7 MB decoded
+        assert controller.acquire(60, "one minute", block=False) is None
+        with pytest.raises(AdmissionRejected):
+            controller.acquire(60, "one minute")
+        
+        controller = AdmissionController(max_audio_mb=10, max_waiting=1, wait_timeout=0.05)
+        ticket = controller.acquire(120, "two minutes")
+        with pytest.raises(AdmissionRejected):
+            controller.acquire(60, "one minute")
+        assert controller.snapshot()["waiting"] == 0
+        controller.release(ticket)
+        assert controller.snapshot()["rejected"] == 1
+
+
+class TestResultsStore:
+    """Test cases for ResultsStore class."""
+    
+    @staticmethod
+    def _results(name, transcript, topic, timestamp):
+        return {
+            "audio_file": f"data/input_audio/{name}.wav",
+            "timestamp": timestamp,
+            "transcript": transcript,
+            "summary": transcript[:40],
+            "topic": {"label": topic, "confidence": 0.9},
+            "processing_time": 1.5,
+            "status": "completed"
+        }
+    
+    def test_full_text_search_with_filters(self, tmp_path):
+        """Test ranked search combined with topic and date filters."""
+        store = ResultsStore(str(tmp_path / "results.db"))
+        store.add_many([
+            (self._results("a", "The customer asked for refunds twice", "finance", "2024-01-09T10:00:00"), None),
+            (self._results("b", "A refund was mentioned once in passing about sports", "sports", "2024-01-10T10:00:00"), None),
+            (self._results("c", "Weather forecast for the weekend", "news", "2024-01-11T10:00:00"), None),
+            (self._results("d", "Refunds refunds refunds policy review", "finance", "2023-12-01T10:00:00"), None),
+        ])
+        
+        matches = store.search("refund")
+        assert {m["audio_file"] for m in matches} == {
+            "data/input_audio/a.wav", "data/input_audio/b.wav", "data/input_audio/d.wav"
+        }
+        assert "[" in matches[0]["snippet"]
+        
+        recent_finance = store.search("refund", topic="finance", since="2024-01-08")
+        assert [m["audio_file"] for m in recent_finance] == ["data/input_audio/a.wav"]
+        
+        assert [m["audio_file"] for m in store.search(topic="news")] == ["data/input_audio/c.wav"]
+        assert store.search('refund"s:') is not None
+    
+    def test_reindexing_replaces_entry(self, tmp_path):
+        """Test that re-processing a file replaces its indexed entry."""
+        store = ResultsStore(str(tmp_path / "results.db"))
+        store.add(self._results("a", "first version about budgets", "business", "2024-01-01T00:00:00"))
+        store.add(self._results("a", "second version about holidays", "travel", "2024-01-02T00:00:00"))
+        
+        assert store.count() == 1
+        assert store.search("budgets") == []
+        assert store.get("data/input_audio/a.wav")["topic"] == "travel"
+
+
+class TestPredictionCache:
+    """Test cases for PredictionCache class."""
+    
+    def test_bounded_cache_prunes_in_batches(self, tmp_path):
+        """Test that the oldest entries are dropped once a tenth of the limit has been written."""
+        cache = PredictionCache(str(tmp_path / "cache.db"), max_entries=100)
+        for i in range(105):
+            cache.put_many([(f"key-{i}", i)])
+        assert cache.count() == 105
+        
+        cache.put_many([(f"key-{i}", i) for i in range(105, 110)])
+        assert cache.count() == 100
+        assert cache.get_many(["key-9", "key-10", "key-109"]) == {"key-10": 10, "key-109": 109}
+        
+        # Opening the file with a lower limit prunes right away
+        assert PredictionCache(str(tmp_path / "cache.db"), max_entries=20).count() == 20
+        cache.close()
+
+
+class TestJobRunner:
+    """Test cases for background pipeline jobs."""
+    
+    def test_progress_and_results(self):
+        """Test that jobs report their current stage while running and keep results or errors."""
+        release = threading.Event()
+        
+        class SteppingPipeline:
+            def process_audio_bytes(self, data, name, progress=None):
+                progress("start", "decode", {})
+                progress("end", "decode", {"wall_time": 0.1})
+                progress("start", "asr", {})
+                release.wait(5)
+                if not data:
+                    raise RuntimeError("empty upload")
+                progress("end", "asr", {"wall_time": 1.0})
+                return {"audio_file": name, "summary": "ok"}
+        
+        runner = JobRunner(SteppingPipeline(), max_workers=2)
+        job = runner.submit_bytes(b"audio", "call.wav")
+        broken = runner.submit_bytes(b"", "empty.wav")
+        
+        for _ in range(500):
+            if job.snapshot()["stage"] == "asr":
+                break
+            threading.Event().wait(0.01)
+        running = job.snapshot()
+        assert running["status"] == "running"
+        assert running["progress"] == 0.25
+        
+        release.set()
+        runner.shutdown()
+        
+        finished = job.snapshot()
+        assert finished["status"] == "completed"
+        assert finished["progress"] == 1.0
+        assert finished["result"] == {"audio_file": "call.wav", "summary": "ok"}
+        assert broken.snapshot()["error"] == "empty upload"
+        assert [j.name for j in runner.jobs()] == ["call.wav", "empty.wav"]
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry and StageTimer."""
+    
+    def test_prometheus_export(self, tmp_path):
+        """Test counters, gauges and histograms in the text format."""
+        registry = MetricsRegistry(prefix="test")
+        registry.inc("files_total", labels={"status": "success"}, help_text="Files")
+        registry.inc("files_total", labels={"status": "success"})
+        registry.set("queue_depth", 4)
+        registry.observe("latency_seconds", 0.3, buckets=(0.1, 0.5, 1.0))
+        
+        text = registry.to_prometheus()
+        
+        assert "# HELP test_files_total Files" in text
+        assert 'test_files_total{status="success"} 2' in text
+        assert "test_queue_depth 4" in text
+        assert 'test_latency_seconds_bucket{le="0.1"} 0' in text
+        assert 'test_latency_seconds_bucket{le="0.5"} 1' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 1' in text
+        
+        registry.write_textfile(str(tmp_path / "metrics.prom"))
+        assert (tmp_path / "metrics.prom").read_text(encoding="utf-8") == text
+    
+    def test_http_endpoint(self):
+        """Test serving metrics over HTTP."""
+        from urllib.request import urlopen
+        
+        registry = MetricsRegistry(prefix="test")
+        registry.inc("requests_total")
+        server = registry.start_http_server(0)
+        try:
+            port = server.server_address[1]
+            body = urlopen(f"http://127.0.0.1:{port}/metrics").read().decode("utf-8")
+        finally:
+            server.shutdown()
+        
+        assert "test_requests_total 1" in body
+    
+    def test_stage_timer_accumulates(self):
+        """Test that repeated stages accumulate wall and CPU time."""
+        stages = StageTimer()
+        for _ in range(2):
+            with stages.stage("asr"):
+                sum(range(10000))
+        
+        assert stages.stages["asr"]["wall_time"] > 0
+        assert stages.total_wall_time == stages.stages["asr"]["wall_time"]
+
+
+class TestRuntime:
+    """Test cases for runtime resource planning."""
+    
+    def test_core_budget_split_between_workers(self, monkeypatch):
+        """Test that workers share the core budget without overlapping CPUs."""
+        from src.utils import runtime
+        
+        monkeypatch.setattr(runtime, "available_cores", lambda: list(range(8)))
+        plans = [
+            runtime.plan_runtime(device="cpu", workers=3, worker_index=i, core_budget=6, pin_cpus=True)
+            for i in range(3)
+        ]
+        
+        assert [plan.threads for plan in plans] == [2, 2, 2]
+        assert [plan.cpu_ids for plan in plans] == [[0, 1], [2, 3], [4, 5]]
+        assert runtime.plan_runtime(device="cpu", workers=16).threads == 1
+        assert runtime.plan_runtime(device="cpu").cpu_ids is None
+    
+    def test_apply_sets_thread_env(self, monkeypatch):
+        """Test that applying a plan exports the BLAS/OpenMP thread counts."""
+        from src.utils import runtime
+        
+        for name in runtime.THREAD_ENV_VARS:
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setattr(runtime, "_torch_installed", lambda: False)
+        monkeypatch.delitem(sys.modules, "torch", raising=False)
+        
+        runtime.apply_runtime(runtime.RuntimePlan(device="cpu", threads=3, interop_threads=1))
+        assert all(os.environ[name] == "3" for name in runtime.THREAD_ENV_VARS)